@@ -1,7 +1,10 @@
 from .pipeline import Pipeline, pipeline, pipe
+from .async_pipeline import AsyncPipeline, apipe
+from .typed import TypedPipeline, pipe_array
 from .placeholder import Placeholder
 from .utils import square, increment, half
 from .errors import PipelineError
+from .executors import register_executor, get_executor, warm_executor, shutdown_executors
 try:
     from . import native_go
 except ImportError:
@@ -10,16 +13,19 @@ except ImportError:
 from .backends import (
     enable_cpp_backend, disable_cpp_backend, use_cpp_backend, is_cpp_available, 
     set_rust_threshold, set_zig_threshold, is_zig_available,
-    set_go_threshold, is_go_available
+    set_go_threshold, is_go_available,
+    freeze, thaw, set_conversion_cache_size, clear_conversion_cache
 )
 
 _ = Placeholder()
 
 # Make pipe the primary entry point
 __all__ = [
-    'pipe', 'Pipeline', 'pipeline', 'Placeholder', '_', 
+    'pipe', 'Pipeline', 'pipeline', 'Placeholder', '_', 'apipe', 'AsyncPipeline', 'pipe_array', 'TypedPipeline',
     'square', 'increment', 'half', 'PipelineError',
+    'register_executor', 'get_executor', 'warm_executor', 'shutdown_executors',
     'enable_cpp_backend', 'disable_cpp_backend', 'use_cpp_backend', 'is_cpp_available',
     'set_rust_threshold', 'set_zig_threshold', 'is_zig_available',
-    'set_go_threshold', 'is_go_available'
+    'set_go_threshold', 'is_go_available',
+    'freeze', 'thaw', 'set_conversion_cache_size', 'clear_conversion_cache'
 ]
@@ -0,0 +1,293 @@
+"""
+Mergeable aggregation states.
+
+An aggregate state summarizes part of a dataset so that the states of
+disjoint parts can be merged into the state of their concatenation. That
+is what lets an aggregation run per partition (in parallel, or chunk by
+chunk over a stream) and still give the result a single pass would.
+
+Every state supports:
+
+* ``add(value)`` - fold in one element;
+* ``merge(other)`` - fold in the state of the elements that follow;
+* ``result()`` - the aggregate's value;
+* ``from_iterable(data)`` - the state of a whole partition, computed in
+  bulk where a builtin can do it.
+"""
+
+from functools import reduce
+import operator
+from collections.abc import Iterable
+from typing import Any, Callable, Optional, Union
+
+from .expr import Arg, BINARY_OPERATORS, BinOp
+from .placeholder import Placeholder
+from .statistics import merge_moments, moments
+
+class Aggregate:
+    """Base class of mergeable aggregation states."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> 'Aggregate':
+        """State of all elements of data."""
+        state = cls()
+        for value in data:
+            state.add(value)
+        return state
+
+    def add(self, value: Any) -> None:
+        """Fold one element into the state."""
+        raise NotImplementedError
+
+    def merge(self, other: 'Aggregate') -> 'Aggregate':
+        """Fold in the state of the elements following this state's; returns self."""
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        """The value of the aggregate."""
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class Sum(Aggregate):
+    """Sum of the elements; 0 when there are none."""
+
+    __slots__ = ('total',)
+
+    def __init__(self, total: Any = 0):
+        self.total = total
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> 'Sum':
+        return cls(sum(data))
+
+    def add(self, value: Any) -> None:
+        self.total += value
+
+    def merge(self, other: 'Sum') -> 'Sum':
+        self.total += other.total
+        return self
+
+    def result(self) -> Any:
+        return self.total
+
+class Count(Aggregate):
+    """Number of elements."""
+
+    __slots__ = ('count',)
+
+    def __init__(self, count: int = 0):
+        self.count = count
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> 'Count':
+        if hasattr(data, '__len__'):
+            return cls(len(data))
+        return super().from_iterable(data)
+
+    def add(self, value: Any) -> None:
+        self.count += 1
+
+    def merge(self, other: 'Count') -> 'Count':
+        self.count += other.count
+        return self
+
+    def result(self) -> int:
+        return self.count
+
+class _Extremum(Aggregate):
+    """Shared implementation of Min and Max; None when there are no elements."""
+
+    __slots__ = ('value', 'empty')
+
+    # Picks the winner of two values: min or max
+    _select: Callable[..., Any]
+
+    def __init__(self, value: Any = None, empty: bool = True):
+        self.value = value
+        self.empty = empty
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> '_Extremum':
+        missing = object()
+        value = cls._select(data, default=missing)
+        return cls() if value is missing else cls(value, False)
+
+    def add(self, value: Any) -> None:
+        self.value = value if self.empty else type(self)._select(self.value, value)
+        self.empty = False
+
+    def merge(self, other: '_Extremum') -> '_Extremum':
+        if not other.empty:
+            self.add(other.value)
+        return self
+
+    def result(self) -> Any:
+        return None if self.empty else self.value
+
+class Min(_Extremum):
+    """Smallest element; None when there are none."""
+
+    __slots__ = ()
+    _select = min
+
+class Max(_Extremum):
+    """Largest element; None when there are none."""
+
+    __slots__ = ()
+    _select = max
+
+class Mean(Aggregate):
+    """Arithmetic mean of the elements."""
+
+    __slots__ = ('count', 'total')
+
+    def __init__(self, count: int = 0, total: Any = 0):
+        self.count = count
+        self.total = total
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> 'Mean':
+        values = data if hasattr(data, '__len__') else list(data)
+        return cls(len(values), sum(values))
+
+    def add(self, value: Any) -> None:
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: 'Mean') -> 'Mean':
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def result(self) -> float:
+        if self.count == 0:
+            raise ValueError("mean() requires at least one data point")
+        return self.total / self.count
+
+class Variance(Aggregate):
+    """Population variance of the elements, from a numerically stable running mean."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        # Sum of squared deviations from the mean
+        self.m2 = m2
+
+    @classmethod
+    def from_iterable(cls, data: Iterable[Any]) -> 'Variance':
+        return cls(*moments(data))
+
+    def add(self, value: Any) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'Variance') -> 'Variance':
+        self.count, self.mean, self.m2 = merge_moments((self.count, self.mean, self.m2),
+                                                       (other.count, other.mean, other.m2))
+        return self
+
+    def result(self) -> float:
+        if self.count < 2:
+            raise ValueError("variance() requires at least two data points")
+        return self.m2 / self.count
+
+    def stdev(self) -> float:
+        """Population standard deviation."""
+        return self.result() ** 0.5
+
+class Fold:
+    """A custom accumulator: step(acc, value) folds in each element, finish(acc) gives the result.
+
+    Folds are not mergeable, so they only run where the elements arrive in
+    order, as in Pipeline.aggregate().
+    """
+
+    __slots__ = ('acc', 'step', 'finish')
+
+    def __init__(self, acc: Any, step: Callable[[Any, Any], Any], finish: Optional[Callable[[Any], Any]] = None):
+        self.acc = acc
+        self.step = step
+        self.finish = finish
+
+    def add_all(self, data: Iterable[Any]) -> None:
+        """Fold in every element of data, in order."""
+        self.acc = reduce(self.step, data, self.acc)
+
+    def result(self) -> Any:
+        return self.finish(self.acc) if self.finish is not None else self.acc
+
+    def __repr__(self) -> str:
+        return f"Fold(acc={self.acc!r})"
+
+# Builtins accepted in place of the aggregate classes they compute
+_BUILTIN_AGGREGATES = ((sum, Sum), (len, Count), (min, Min), (max, Max))
+
+def aggregate_factory(spec: Any) -> Optional[Callable[[], Union[Aggregate, Fold]]]:
+    """Callable making a fresh empty state for an aggregate spec, or None if spec is not one.
+
+    A spec is an Aggregate subclass, one of the builtins sum, len, min and
+    max, or an (init, step[, finish]) tuple for a Fold; init is the starting
+    accumulator, or a zero-argument callable that makes one (like list) so
+    each run starts afresh.
+    """
+    if isinstance(spec, type) and issubclass(spec, Aggregate):
+        return spec
+    if isinstance(spec, tuple) and len(spec) in (2, 3):
+        init, step, finish = spec if len(spec) == 3 else spec + (None,)
+        if not callable(step) or (finish is not None and not callable(finish)):
+            return None
+        step = step.as_reducer() if isinstance(step, Placeholder) else step
+        finish = finish._func if isinstance(finish, Placeholder) else finish
+        return lambda: Fold(init() if callable(init) else init, step, finish)
+    return next((cls for builtin, cls in _BUILTIN_AGGREGATES if builtin is spec), None)
+
+def from_statistics(cls: type, count: int, stats: dict) -> Optional[Aggregate]:
+    """State of a partition from its batch statistics (sum, mean, min, max, stdev), or None if cls needs more."""
+    if cls is Sum:
+        return Sum(stats['sum'])
+    if cls is Count:
+        return Count(count)
+    if cls is Min:
+        return Min(stats['min'], False)
+    if cls is Max:
+        return Max(stats['max'], False)
+    if cls is Mean:
+        return Mean(count, stats['sum'])
+    if cls is Variance:
+        return Variance(count, stats['mean'], stats['stdev'] ** 2 * count)
+    return None
+
+# Aggregates from_statistics() builds
+STATISTICS_AGGREGATES = (Sum, Count, Min, Max, Mean, Variance)
+
+def merge_states(left: Aggregate, right: Aggregate) -> Aggregate:
+    """Combiner for aggregate states, usable wherever a two-argument combine is expected."""
+    return left.merge(right)
+
+# Reducer operators whose results can be combined with the operator itself
+_ASSOCIATIVE_SYMBOLS = ('+', '*', '&', '|', '^')
+
+_ASSOCIATIVE_FUNCTIONS = (min, max, operator.add, operator.mul, operator.and_, operator.or_, operator.xor)
+
+def infer_combiner(reducer: Any) -> Optional[Callable[[Any, Any], Any]]:
+    """Combiner for partial results of reducer, if reducer is a known associative operation.
+
+    Recognizes Placeholder reducers like _ + _ and _ * _, the builtins min
+    and max and the matching functions of the operator module.
+    """
+    if isinstance(reducer, Placeholder):
+        node = reducer._node
+        if (isinstance(node, BinOp) and node.op in _ASSOCIATIVE_SYMBOLS
+                and isinstance(node.left, Arg) and isinstance(node.right, Arg)):
+            return BINARY_OPERATORS[node.op]
+        return None
+    return reducer if reducer in _ASSOCIATIVE_FUNCTIONS else None
@@ -0,0 +1,329 @@
+"""
+Asynchronous pipelines for code running on an asyncio event loop.
+
+apipe() starts an AsyncPipeline from an async iterable, an awaitable or any
+value pipe() accepts. Element-wise stages (map, filter, take, ...) stream
+through the event loop and accept coroutine functions as well as plain
+callables; plain callables run inline. amap() keeps several calls in
+flight at once. Every other Pipeline method (sort,
+sum, group_by, ...) is recorded on a synchronous segment that runs over
+the collected elements. A segment is moved to a worker thread when a native
+backend may take one of its stages, or when it waits on a worker pool, so
+large native calls do not block the event loop.
+
+Results are consumed with ``await p.aget()``, ``await p.to_list()`` or
+``async for x in p``.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+import inspect
+from typing import Any, Callable, Optional, Union
+
+from .backends import get_backend
+from .errors import PipelineError
+from .pipeline import Pipeline
+from .plan import Stage, size_hint
+
+# Suffixes of the Pipeline methods that name their backend explicitly
+_BACKEND_SUFFIXES = ('_cpp', '_zig', '_go', '_rust')
+
+# Synchronous stages that block while a worker pool runs
+_POOL_OPS = ('par_map', 'par_reduce')
+
+# Unwraps Placeholders, dictionary and string templates like Pipeline methods do
+_unwrap = Pipeline()._unwrap
+
+def _aiterate(value: Any, operation: str) -> AsyncIterator[Any]:
+    """Async iterator over the elements of an async or sync iterable."""
+    if isinstance(value, AsyncIterable):
+        return value.__aiter__()
+    if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
+        return _from_iterable(value)
+    raise PipelineError(f"{operation}() can only be used on iterables (excluding str/bytes).")
+
+async def _from_iterable(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in iterable:
+        yield item
+
+async def _aclose(iterator: Any) -> None:
+    """Close an async generator that was left suspended, running its cleanup."""
+    aclose = getattr(iterator, 'aclose', None)
+    if aclose is not None:
+        await aclose()
+
+async def _collect(value: Any) -> Any:
+    """The elements of an async iterable as a list; other values unchanged."""
+    if isinstance(value, AsyncIterable):
+        return [item async for item in value]
+    return value
+
+async def _resolve(result: Any) -> Any:
+    return await result if inspect.isawaitable(result) else result
+
+def _start(loop: asyncio.AbstractEventLoop, result: Any) -> asyncio.Future:
+    """Future for the result of a call: a task running it if it is awaitable, else already done."""
+    if inspect.isawaitable(result):
+        return asyncio.ensure_future(result)
+    future = loop.create_future()
+    future.set_result(result)
+    return future
+
+def _needs_thread(pipeline: Pipeline, value: Any) -> bool:
+    """Check if running pipeline over value could block the event loop in native code or on a pool."""
+    size = size_hint(value)
+    backend = get_backend()
+    for stage in pipeline._stages:
+        if stage.op in _POOL_OPS:
+            return True
+        if not stage.hints.get('backends'):
+            continue
+        operation = stage.op
+        for suffix in _BACKEND_SUFFIXES:
+            if operation.endswith(suffix):
+                operation = operation[:-len(suffix)]
+        if backend.may_accelerate(operation, size):
+            return True
+    return False
+
+def _run_materialized(pipeline: Pipeline, value: Any) -> Any:
+    """Run pipeline over value in a worker thread, including the lazy stages at its end."""
+    result = pipeline(value)
+    return list(result) if isinstance(result, Iterator) else result
+
+class AsyncPipeline:
+    """
+    A pipeline whose source and stages may be asynchronous.
+
+    Stages are recorded like on Pipeline and run when the result is awaited
+    with aget() or iterated with async for. A pipeline whose source is an
+    awaitable can only be run once, since the awaitable is consumed.
+    """
+
+    def __init__(self, source: Any = None, _stages: tuple = ()):
+        # _source is awaited (if awaitable) and fed to the first stage
+        self._source = source
+        # _stages holds Stage objects; hints['mode'] tells how each runs:
+        # 'stream' stages map an async iterator to an async iterator, 'value'
+        # stages take the whole (collected) value and 'sync' stages are a
+        # Pipeline run over the collected value
+        self._stages = _stages
+
+    def __repr__(self) -> str:
+        plan = ' -> '.join(repr(stage) for stage in self._stages) or 'identity'
+        return f"AsyncPipeline(source={self._source!r}, stages={plan})"
+
+    def __getattr__(self, name: str) -> Callable[..., 'AsyncPipeline']:
+        """Record any other Pipeline method on the trailing synchronous segment."""
+        if name.startswith('_') or not callable(getattr(Pipeline, name, None)):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        def _record(*args: Any, **kwargs: Any) -> 'AsyncPipeline':
+            stages = self._stages
+            if stages and stages[-1].hints['mode'] == 'sync':
+                segment, stages = stages[-1].func, stages[:-1]
+            else:
+                segment = Pipeline()
+            segment = getattr(segment, name)(*args, **kwargs)
+            if not isinstance(segment, Pipeline):
+                raise PipelineError(f"{name}() runs a synchronous pipeline; await aget() or to_list() instead")
+            stage = Stage('sync', segment, (segment,), hints={'mode': 'sync'})
+            return AsyncPipeline(self._source, _stages=stages + (stage,))
+        return _record
+
+    @property
+    def stages(self) -> tuple:
+        """The recorded stages in execution order; synchronous segments appear as 'sync' stages."""
+        return self._stages
+
+    def _add_stage(self, op: str, func: Callable[[Any], Any], *args: Any,
+                   fn: Optional[Callable[..., Any]] = None, mode: str = 'stream') -> 'AsyncPipeline':
+        """Return a new AsyncPipeline with one more stage appended."""
+        return AsyncPipeline(self._source, _stages=self._stages + (Stage(op, func, args, fn, {'mode': mode}),))
+
+    async def _run(self) -> Any:
+        """Run the stages; streams come out as async iterators."""
+        value = await _resolve(self._source)
+        for stage in self._stages:
+            mode = stage.hints['mode']
+            if mode == 'stream':
+                value = stage.func(_aiterate(value, stage.op))
+            elif mode == 'value':
+                value = await _resolve(stage.func(await _collect(value)))
+            else:
+                value = await _collect(value)
+                if _needs_thread(stage.func, value):
+                    loop = asyncio.get_running_loop()
+                    # The loop's default pool, which par_map and par_reduce never borrow:
+                    # a segment waiting on a shared pool must not hold one of its threads
+                    value = await loop.run_in_executor(None, _run_materialized, stage.func, value)
+                else:
+                    value = stage.func(value)
+        return value
+
+    async def aget(self) -> Any:
+        """Run the pipeline and return its value; async streams are collected into a list."""
+        return await _collect(await self._run())
+
+    async def to_list(self) -> list:
+        """Run the pipeline and return its elements as a list."""
+        value = await self.aget()
+        if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
+            return list(value)
+        return [value]
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        value = await self._run()
+        if isinstance(value, AsyncIterable):
+            iterator = value.__aiter__()
+            try:
+                async for item in iterator:
+                    yield item
+            finally:
+                await _aclose(iterator)
+        elif isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
+            for item in value:
+                yield item
+        else:
+            raise PipelineError(f"async for needs a pipeline producing an iterable, got {type(value).__name__}")
+
+    def then(self, func: Callable[[Any], Any]) -> 'AsyncPipeline':
+        """Apply func, which may be a coroutine function, to the whole value; streams are collected first."""
+        executable = _unwrap(func)
+        return self._add_stage('then', executable, func, fn=executable, mode='value')
+
+    def map(self, func: Callable[[Any], Any]) -> 'AsyncPipeline':
+        """Map a function or coroutine function over elements, one at a time."""
+        executable = _unwrap(func)
+        async def _map_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            async for item in source:
+                yield await _resolve(executable(item))
+        return self._add_stage('map', _map_func, func, fn=executable)
+
+    def amap(self, func: Callable[[Any], Any], concurrency: int = 64, ordered: bool = False,
+             rate: Optional[Union[int, float]] = None) -> 'AsyncPipeline':
+        """Map a coroutine function over elements with up to concurrency calls in flight.
+
+        With ordered=False results are yielded as calls complete; with
+        ordered=True they come out in input order, buffering at most
+        concurrency results. rate limits how many calls start per second.
+        Upstream elements are only pulled when a call can start, so a slow
+        consumer holds back the source; when the consumer stops early the
+        calls still in flight are cancelled.
+        """
+        if type(concurrency) is not int or concurrency < 1:
+            raise PipelineError(f"concurrency must be a positive int, got {concurrency!r}")
+        if rate is not None and (not isinstance(rate, (int, float)) or isinstance(rate, bool) or rate <= 0):
+            raise PipelineError(f"rate must be a positive number of calls per second, got {rate!r}")
+        executable = _unwrap(func)
+        interval = 1 / rate if rate is not None else 0.0
+        async def _amap_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            loop = asyncio.get_running_loop()
+            pending: deque[asyncio.Future] = deque()
+            next_start = loop.time()
+            exhausted = False
+            try:
+                while True:
+                    # Start calls while slots are free; wait is the time until the rate allows the next one
+                    wait = None
+                    while not exhausted and len(pending) < concurrency:
+                        if interval and next_start > loop.time():
+                            wait = next_start - loop.time()
+                            break
+                        try:
+                            item = await source.__anext__()
+                        except StopAsyncIteration:
+                            exhausted = True
+                            break
+                        next_start = loop.time() + interval
+                        pending.append(_start(loop, executable(item)))
+                    if not pending:
+                        if exhausted:
+                            return
+                        await asyncio.sleep(wait)
+                        continue
+                    if ordered:
+                        # The reorder buffer is the queue of started calls, at most concurrency long
+                        if not pending[0].done():
+                            await asyncio.wait((pending[0],), timeout=wait)
+                        while pending and pending[0].done():
+                            yield pending.popleft().result()
+                    else:
+                        done, _not_done = await asyncio.wait(pending, timeout=wait,
+                                                             return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            pending.remove(task)
+                        for task in done:
+                            yield task.result()
+            finally:
+                # Reached on exhaustion, errors and when the consumer stops early
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+                await _aclose(source)
+        return self._add_stage('amap', _amap_func, func, concurrency, ordered, rate, fn=executable)
+
+    def filter(self, predicate: Callable[[Any], Any]) -> 'AsyncPipeline':
+        """Keep elements for which the predicate, which may be a coroutine function, is true."""
+        executable = _unwrap(predicate)
+        async def _filter_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            async for item in source:
+                if await _resolve(executable(item)):
+                    yield item
+        return self._add_stage('filter', _filter_func, predicate, fn=executable)
+
+    def take(self, n: int) -> 'AsyncPipeline':
+        """Take the first n elements; the upstream stream is closed once they are out."""
+        async def _take_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            try:
+                remaining = n
+                if remaining <= 0:
+                    return
+                async for item in source:
+                    yield item
+                    remaining -= 1
+                    if remaining == 0:
+                        return
+            finally:
+                await _aclose(source)
+        return self._add_stage('take', _take_func, n)
+
+    def skip(self, n: int) -> 'AsyncPipeline':
+        """Skip the first n elements."""
+        async def _skip_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            index = 0
+            async for item in source:
+                if index >= n:
+                    yield item
+                index += 1
+        return self._add_stage('skip', _skip_func, n)
+
+    def take_while(self, predicate: Callable[[Any], Any]) -> 'AsyncPipeline':
+        """Take elements as long as the predicate, which may be a coroutine function, is true."""
+        executable = _unwrap(predicate)
+        async def _take_while_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            try:
+                async for item in source:
+                    if not await _resolve(executable(item)):
+                        return
+                    yield item
+            finally:
+                await _aclose(source)
+        return self._add_stage('take_while', _take_while_func, predicate, fn=executable)
+
+    def skip_while(self, predicate: Callable[[Any], Any]) -> 'AsyncPipeline':
+        """Skip elements as long as the predicate, which may be a coroutine function, is true."""
+        executable = _unwrap(predicate)
+        async def _skip_while_func(source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+            skipping = True
+            async for item in source:
+                if skipping and await _resolve(executable(item)):
+                    continue
+                skipping = False
+                yield item
+        return self._add_stage('skip_while', _skip_while_func, predicate, fn=executable)
+
+def apipe(source: Any) -> AsyncPipeline:
+    """Creates a new AsyncPipeline from an async iterable, an awaitable or a plain value."""
+    return AsyncPipeline(source)
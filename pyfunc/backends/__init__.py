@@ -8,6 +8,7 @@ while maintaining full compatibility with the Python API.
 from .python_backend import PythonBackend
 from .cpp_backend import CppBackend, is_cpp_available
 from .backend_selector import BackendSelector
+from .conversion_cache import conversion_cache
 
 # Global backend selector
 _backend_selector = BackendSelector()
@@ -52,6 +53,25 @@ def is_go_available():
     except ImportError:
         return False
 
+def freeze(data: list) -> list:
+    """Let the native backends reuse conversions of a list until it is thawed; returns the list.
+
+    The list is kept alive until thaw() is called on it.
+    """
+    return conversion_cache.freeze(data)
+
+def thaw(data: list):
+    """Stop reusing conversions of a frozen list, e.g. before changing it in place."""
+    conversion_cache.thaw(data)
+
+def set_conversion_cache_size(max_bytes: int = 64 * 1024 * 1024):
+    """Set the memory cap of cached conversions (default: 64 MiB); 0 disables the cache."""
+    conversion_cache.resize(max_bytes)
+
+def clear_conversion_cache():
+    """Drop every cached conversion."""
+    conversion_cache.clear()
+
 def get_backend():
     """Get the current backend selector."""
     return _backend_selector
@@ -69,5 +89,9 @@ __all__ = [
     'set_rust_threshold',
     'set_zig_threshold',
     'set_go_threshold',
+    'freeze',
+    'thaw',
+    'set_conversion_cache_size',
+    'clear_conversion_cache',
     'get_backend'
 ]
\ No newline at end of file
@@ -2,9 +2,26 @@
 Backend selection logic for PyFunc operations.
 """
 
+import operator
 from typing import Any, Callable, Optional, Union, List
 from ..placeholder import Placeholder
 
+# Operations each native backend implements
+_CPP_OPERATIONS = ('map', 'filter', 'reduce', 'sum', 'min', 'max', 'count')
+_ZIG_OPERATIONS = ('sum', 'mean', 'min', 'max', 'stdev', 'map_multiply', 'map_add', 'map_power')
+_RUST_OPERATIONS = ('median', 'stdev')
+_GO_OPERATIONS = ('bitwise_and', 'bitwise_or', 'bitwise_xor', 'bitwise_not', 'left_shift', 'right_shift')
+
+def _data_size(data: Any) -> int:
+    """Length of data, or the size estimate of lazy pipeline stages; 0 if unknown."""
+    estimate = getattr(data, 'estimated_size', None)
+    if type(estimate) is int:
+        return estimate
+    try:
+        return operator.length_hint(data)
+    except Exception:
+        return 0
+
 class BackendSelector:
     """Selects the appropriate backend for pipeline operations."""
     
@@ -18,6 +35,7 @@ class BackendSelector:
         self._cpp_backend = None
         self._zig_backend = None
         self._go_backend = None
+        self._rust_available = None
     
     def enable_cpp(self, threshold: int = 10000):
         """Enable C++ backend with size threshold."""
@@ -63,13 +81,25 @@ class BackendSelector:
         self.rust_threshold = threshold
         print(f"🦀 Rust backend threshold set to {threshold}")
     
+    @property
+    def rust_available(self) -> bool:
+        """Check if the compiled Rust extension can be imported."""
+        if self._rust_available is None:
+            try:
+                from .. import native_rust
+                # Without the compiled extension the source directory imports as an empty namespace package
+                self._rust_available = hasattr(native_rust, 'median')
+            except ImportError:
+                self._rust_available = False
+        return self._rust_available
+    
     def should_use_rust(self, data: Any, operation: str) -> bool:
         """Determine if Rust backend should be used for statistical operations."""
-        if operation not in ['median', 'stdev']:
+        if operation not in _RUST_OPERATIONS or not self.rust_available:
             return False
         
         try:
-            data_size = len(data) if hasattr(data, '__len__') else 0
+            data_size = _data_size(data)
             return data_size >= self.rust_threshold
         except:
             return False
@@ -97,12 +127,11 @@ class BackendSelector:
             return False
         
         # Zig specializes in mathematical operations
-        zig_operations = ['sum', 'mean', 'min', 'max', 'stdev', 'map_multiply', 'map_add', 'map_power']
-        if operation not in zig_operations:
+        if operation not in _ZIG_OPERATIONS:
             return False
         
         try:
-            data_size = len(data) if hasattr(data, '__len__') else 0
+            data_size = _data_size(data)
             return data_size >= self.zig_threshold
         except:
             return False
@@ -130,12 +159,11 @@ class BackendSelector:
             return False
         
         # Go specializes in bitwise operations
-        go_operations = ['bitwise_and', 'bitwise_or', 'bitwise_xor', 'bitwise_not', 'left_shift', 'right_shift']
-        if operation not in go_operations:
+        if operation not in _GO_OPERATIONS:
             return False
         
         try:
-            data_size = len(data) if hasattr(data, '__len__') else 0
+            data_size = _data_size(data)
             return data_size >= self.go_threshold
         except:
             return False
@@ -167,7 +195,7 @@ class BackendSelector:
         
         # Check data size
         try:
-            data_size = len(data) if hasattr(data, '__len__') else 0
+            data_size = _data_size(data)
             if data_size < self.cpp_threshold:
                 return False
         except:
@@ -183,6 +211,67 @@ class BackendSelector:
         
         return True
     
+    def may_accelerate(self, operation: str, size: int = -1, func: Any = None) -> bool:
+        """Check if any native backend could run the operation.
+
+        Backends decide by input size and need a contiguous buffer, so callers
+        only materialize a stream when this returns True. A known (or
+        estimated) size is checked against each backend's threshold; -1
+        means the size is unknown. func, when given, must be one the C++
+        backend can compile.
+        """
+        def fits(threshold: int) -> bool:
+            return size < 0 or size >= threshold
+
+        if (self.cpp_enabled and self._cpp_backend is not None and operation in _CPP_OPERATIONS
+                and fits(self.cpp_threshold)
+                and (func is None or self._cpp_backend.supports_operation(operation, func))):
+            return True
+        if self._zig_backend is not None and operation in _ZIG_OPERATIONS and fits(self.zig_threshold):
+            return True
+        if operation in _RUST_OPERATIONS and self.rust_available and fits(self.rust_threshold):
+            return True
+        return self._go_backend is not None and operation in _GO_OPERATIONS and fits(self.go_threshold)
+    
+    def chunk_kernel(self, operation: str, *args: Any, size: int = -1) -> Optional[Callable[[list], Any]]:
+        """Native kernel running operation on one chunk of a stream, or None if no backend could.
+
+        Used with the helpers in .streaming. size is the stream's size hint (-1
+        if unknown). The kernel returns NotImplemented for chunks no backend
+        accepts (too small, unsupported types). 'moments' returns (count, mean,
+        sum of squared deviations) so partial results merge exactly; args are
+        the function for map/filter and the operand for bitwise operations.
+        """
+        if operation in ('sum', 'min', 'max'):
+            def _aggregate_chunk(chunk: list) -> Any:
+                if operation == 'sum' and self.should_use_zig(chunk, 'sum'):
+                    return self._zig_backend.sum(chunk)
+                if self.should_use_cpp(chunk, operation):
+                    return getattr(self._cpp_backend, operation)(chunk)
+                return NotImplemented
+            return _aggregate_chunk if self.may_accelerate(operation, size) else None
+        if operation == 'moments':
+            def _moments_chunk(chunk: list) -> Any:
+                if not self.should_use_zig(chunk, 'stdev'):
+                    return NotImplemented
+                stats = self._zig_backend.batch_statistics(chunk)
+                return len(chunk), stats['mean'], stats['stdev'] ** 2 * len(chunk)
+            return _moments_chunk if self._zig_backend is not None and (size < 0 or size >= self.zig_threshold) else None
+        if operation in ('map', 'filter'):
+            func = args[0]
+            def _elementwise_chunk(chunk: list) -> Any:
+                if self.should_use_cpp(chunk, operation, func):
+                    return getattr(self._cpp_backend, operation)(chunk, func)
+                return NotImplemented
+            return _elementwise_chunk if self.may_accelerate(operation, size, func) else None
+        if operation in _GO_OPERATIONS:
+            def _bitwise_chunk(chunk: list) -> Any:
+                if self.should_use_go(chunk, operation):
+                    return getattr(self._go_backend, operation)(chunk, *args)
+                return NotImplemented
+            return _bitwise_chunk if self.may_accelerate(operation, size) else None
+        return None
+
     def execute_map(self, data: Any, func: Callable) -> Any:
         """Execute map operation with appropriate backend."""
         if self.should_use_cpp(data, 'map', func):
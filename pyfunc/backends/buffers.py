@@ -0,0 +1,117 @@
+"""
+Zero-copy access to numeric buffers for the native backends.
+
+Native kernels used to receive their input as a Python list copied into a
+ctypes array (or a std::vector / Vec), and handed results back one boxed
+element at a time. Inputs that implement the buffer protocol with
+one-dimensional, C-contiguous numeric data (array.array, memoryview,
+bytearray, NumPy arrays) now reach the kernels by address: a buffer that
+already holds the kernel's element type is used in place, any other
+numeric buffer is converted in a single copy. Element-wise kernels write
+into a new typed array, which is returned as such for buffer inputs and as
+a list for list inputs.
+
+Lists and tuples are converted through the conversion cache
+(conversion_cache.py), so aggregating the same tuple or frozen list again
+reuses the typed array built the first time.
+"""
+
+import array
+import ctypes
+from collections.abc import Iterable
+from typing import Any, Optional, Union
+
+from .conversion_cache import conversion_cache
+
+# memoryview formats (struct/array type codes) of one-dimensional numeric buffers
+NUMERIC_FORMATS = frozenset('bBhHiIlLqQfd')
+
+INTEGER_FORMATS = frozenset('bBhHiIlLqQ')
+
+_UNSIGNED_FORMATS = frozenset('BHILQ')
+
+# ctypes element type of each array type code the kernels take
+_CTYPES = {'d': ctypes.c_double, 'i': ctypes.c_int32, 'q': ctypes.c_int64, 'Q': ctypes.c_uint64}
+
+def numeric_view(data: Any) -> Optional[memoryview]:
+    """A flat memoryview of data if it is a contiguous one-dimensional numeric buffer, else None."""
+    if isinstance(data, (str, bytes)):
+        return None
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return None
+    if view.ndim == 1 and view.c_contiguous and view.format in NUMERIC_FORMATS:
+        return view
+    return None
+
+def _kind(format: str) -> str:
+    if format in INTEGER_FORMATS:
+        return 'u' if format in _UNSIGNED_FORMATS else 'i'
+    return 'f'
+
+def holds(view: memoryview, typecode: str) -> bool:
+    """Check if the elements of view are stored exactly as typecode elements."""
+    return _kind(view.format) == _kind(typecode) and view.itemsize == array.array(typecode).itemsize
+
+def is_integral(data: Any) -> bool:
+    """Check if data is an integer buffer or a sequence of ints."""
+    view = numeric_view(data)
+    if view is not None:
+        return view.format in INTEGER_FORMATS
+    return all(isinstance(x, int) for x in data)
+
+def typed_copy(data: Iterable[Any], typecode: str) -> array.array:
+    """A new array of typecode elements holding the values of data, for kernels that write in place.
+
+    A buffer of that element type is copied as one block; other buffers and
+    lists are converted element by element (to float for 'd' and 'f', to int otherwise).
+    """
+    view = numeric_view(data)
+    if view is not None:
+        if holds(view, typecode):
+            values = array.array(typecode)
+            values.frombytes(view.cast('B'))
+            return values
+        return array.array(typecode, view)
+    convert = float if typecode in 'df' else int
+    return array.array(typecode, map(convert, data))
+
+def as_ctypes(data: Iterable[Any], typecode: str) -> ctypes.Array:
+    """ctypes array of typecode elements holding data, for kernels that only read it.
+
+    A writable buffer of that element type is used in place and a read-only
+    one copied as a block; anything else goes through typed_copy(), or the
+    conversion cache for lists and tuples. The ctypes array keeps data alive
+    while it is in use.
+    """
+    ctype = _CTYPES[typecode]
+    view = numeric_view(data)
+    if view is not None and holds(view, typecode):
+        if view.readonly:
+            return (ctype * len(view)).from_buffer_copy(view)
+        return (ctype * len(view)).from_buffer(view)
+    values = typed_copy(data, typecode) if view is not None else conversion_cache.get(data, typecode, typed_copy)
+    return (ctype * len(values)).from_buffer(values)
+
+def float64_buffer(data: Any) -> Optional[Union[memoryview, array.array]]:
+    """data as a contiguous float64 buffer if it is a numeric buffer or a cached sequence, else None.
+
+    float64 buffers come back as a view of the same memory; other numeric
+    buffers are converted once, and tuples or frozen lists the conversion
+    cache takes are converted once per cache entry.
+    """
+    view = numeric_view(data)
+    if view is None:
+        if conversion_cache.cacheable(data):
+            return conversion_cache.get(data, 'd', typed_copy)
+        return None
+    return view if holds(view, 'd') else typed_copy(view, 'd')
+
+def new_array(typecode: str, length: int) -> array.array:
+    """A zero-filled array of length typecode elements, for kernels to write results into."""
+    return array.array(typecode, [0]) * length
+
+def typed_result(data: Any, values: array.array) -> Union[array.array, list]:
+    """Result of an element-wise kernel over data: the typed array for buffer inputs, a list otherwise."""
+    return values if numeric_view(data) is not None else values.tolist()
@@ -0,0 +1,177 @@
+"""
+Cache of converted native buffers for repeated operations on the same data.
+
+A list or tuple reaches the native kernels as a typed array built from its
+elements, one unboxing per element. When the same sequence is aggregated
+several times in a row (``sum()``, ``mean_zig()``, ``min()``, ``max()``,
+``stdev()`` on one series), the conversion is done once and the typed
+array reused.
+
+Entries are keyed by the identity of the sequence and hold a reference to
+it, since lists and tuples cannot be weakly referenced. An entry's size is
+its typed arrays plus the sequence and the element objects it keeps alive
+(estimated from a sample); the total is capped and the least recently used
+entries are evicted first.
+Tuples are cached automatically. Lists can change in place, so only lists
+passed to freeze() are cached, and every lookup checks that the list still
+has its length and the same elements at a sample of positions; a list that
+no longer matches is converted again. The cache keeps a frozen list alive
+until thaw() is called, so thaw() must be called once a frozen list is
+going to be changed or is no longer needed.
+"""
+
+from collections import OrderedDict
+import array
+import sys
+import threading
+from typing import Any, Callable
+
+from ..errors import PipelineError
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Shorter sequences convert faster than an entry is worth keeping
+MIN_CACHED_ITEMS = 1024
+
+# Number of elements compared when checking a frozen list for changes
+_SAMPLES = 32
+
+def _sample(data: list) -> tuple:
+    """Elements of data at evenly spaced positions, always including the last one."""
+    if not data:
+        return ()
+    step = max(1, len(data) // _SAMPLES)
+    return tuple(data[i] for i in range(0, len(data), step)) + (data[-1],)
+
+class _Entry:
+    """The typed arrays converted from one sequence."""
+
+    __slots__ = ('source', 'length', 'sample', 'arrays', 'nbytes')
+
+    def __init__(self, source: Any):
+        self.source = source
+        self.length = len(source)
+        elements = _sample(source)
+        self.sample = elements if isinstance(source, list) else ()
+        self.arrays: dict[str, array.array] = {}
+        # The reference keeps the sequence and its elements alive, so their size counts too
+        self.nbytes = sys.getsizeof(source)
+        if elements:
+            self.nbytes += self.length * sum(map(sys.getsizeof, elements)) // len(elements)
+
+    def matches(self, data: Any) -> bool:
+        """Check if data is still the sequence the arrays were converted from."""
+        if self.source is not data:
+            return False
+        if isinstance(data, tuple):
+            return True
+        return len(data) == self.length and all(a is b for a, b in zip(_sample(data), self.sample))
+
+class ConversionCache:
+    """LRU cache of typed arrays converted from lists and tuples, capped at max_bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, min_items: int = MIN_CACHED_ITEMS):
+        self.max_bytes = max_bytes
+        self.min_items = min_items
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._frozen: dict[int, list] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held by the cache."""
+        return self._bytes
+
+    def freeze(self, data: list) -> list:
+        """Let the cache keep conversions of a list; the list is returned unchanged.
+
+        The cache holds the list until thaw(data) is called, whether or not
+        a conversion of it is still cached.
+        """
+        if not isinstance(data, list):
+            raise PipelineError(f"freeze() takes a list, got {type(data).__name__}; tuples are cached without it")
+        with self._lock:
+            self._frozen[id(data)] = data
+        return data
+
+    def thaw(self, data: list) -> None:
+        """Stop caching conversions of a frozen list and drop the ones held."""
+        with self._lock:
+            if self._frozen.get(id(data)) is data:
+                del self._frozen[id(data)]
+            self._discard(id(data))
+
+    def cacheable(self, data: Any) -> bool:
+        """Check if conversions of data go through the cache."""
+        if self.max_bytes <= 0:
+            return False
+        if type(data) is tuple:
+            return len(data) >= self.min_items
+        return type(data) is list and len(data) >= self.min_items and self._frozen.get(id(data)) is data
+
+    def get(self, data: Any, typecode: str, convert: Callable[[Any, str], array.array]) -> array.array:
+        """Typed array of typecode elements converted from data, by convert(data, typecode) on a miss.
+
+        The array is shared with later callers and must not be written to.
+        """
+        if not self.cacheable(data):
+            return convert(data, typecode)
+        key = id(data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.matches(data):
+                values = entry.arrays.get(typecode)
+                if values is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return values
+            else:
+                self._discard(key)
+        values = convert(data, typecode)
+        with self._lock:
+            self.misses += 1
+            self._store(key, data, typecode, values)
+        return values
+
+    def clear(self) -> None:
+        """Drop every entry; frozen lists stay frozen."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the size cap, evicting entries beyond it; 0 disables the cache."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _store(self, key: int, data: Any, typecode: str, values: array.array) -> None:
+        entry = self._entries.get(key)
+        if entry is None or not entry.matches(data):
+            self._discard(key)
+            entry = self._entries[key] = _Entry(data)
+            self._bytes += entry.nbytes
+        if typecode not in entry.arrays:
+            entry.arrays[typecode] = values
+            size = values.itemsize * len(values)
+            entry.nbytes += size
+            self._bytes += size
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _discard(self, key: int) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            del self._entries[key]
+            self._bytes -= entry.nbytes
+
+    def _evict(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            _key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+
+# The cache the native backends convert lists and tuples through
+conversion_cache = ConversionCache()
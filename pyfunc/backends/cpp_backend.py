@@ -1,11 +1,51 @@
 """
 C++ backend interface for PyFunc operations.
+
+Lists are converted to std::vector by pybind11. Contiguous numeric buffers
+(array.array, memoryview, NumPy arrays) go to the *_buffer entry points
+instead, which read float64 data in place with the GIL released; map and
+filter over float buffers write into a new array.array('d').
 """
 
+import array
 from typing import Any, Callable, Generator, Optional, Union, List
 from collections.abc import Iterable
 from ..placeholder import Placeholder
 from ..errors import PipelineError
+from ..expr import Arg, BinOp, Const, simplify
+from .buffers import INTEGER_FORMATS, float64_buffer, is_integral, new_array, numeric_view
+
+# Native operation names for binary operators, see Operation::Operation in native/operations.cpp
+_NATIVE_OPS = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div',
+               '>': 'gt', '<': 'lt', '>=': 'ge', '<=': 'le', '==': 'eq', '!=': 'ne'}
+
+# Operators that can be written with the constant on the right: 3 < _ is _ > 3
+_MIRRORED_OPS = {'+': '+', '*': '*', '>': '<', '<': '>', '>=': '<=', '<=': '>=', '==': '==', '!=': '!='}
+
+# Operators implemented by the native map, filter and reduce kernels
+_KERNEL_OPS = {'map': ('+', '-', '*', '/'), 'filter': ('>', '<', '>=', '<=', '==', '!='),
+               'reduce': ('+', '-', '*', '/')}
+
+def _is_native_number(node: Any) -> bool:
+    """Check if node is a constant the native side represents exactly as a double."""
+    if not isinstance(node, Const) or type(node.value) not in (int, float):
+        return False
+    return type(node.value) is float or abs(node.value) <= 2 ** 53
+
+def _lower_expression(node: Any, operation: str) -> Optional[str]:
+    """Lower an expression tree to a native op code like 'mul_2', or None if it has no exact equivalent."""
+    if not isinstance(node, BinOp) or node.op not in _KERNEL_OPS.get(operation, ()):
+        return None
+    if operation == 'reduce':
+        # _ op _ : the accumulator on the left, the next element on the right
+        if isinstance(node.left, Arg) and isinstance(node.right, Arg):
+            return f"{_NATIVE_OPS[node.op]}_0"
+        return None
+    if isinstance(node.left, Arg) and _is_native_number(node.right):
+        return f"{_NATIVE_OPS[node.op]}_{node.right.value!r}"
+    if isinstance(node.right, Arg) and _is_native_number(node.left) and node.op in _MIRRORED_OPS:
+        return f"{_NATIVE_OPS[_MIRRORED_OPS[node.op]]}_{node.left.value!r}"
+    return None
 
 def is_cpp_available() -> bool:
     """Check if C++ backend is available."""
@@ -39,7 +79,7 @@ class CppBackend:
         
         # For operations with functions, check if we can compile them
         if func is not None and operation in {'map', 'filter', 'reduce'}:
-            return self._can_compile_function(func)
+            return self._can_compile_function(func, operation)
         
         return True
     
@@ -48,6 +88,10 @@ class CppBackend:
         if not self._available:
             return False
         
+        # Numeric buffers are read directly
+        if numeric_view(data) is not None:
+            return True
+        
         # Support numeric iterables
         if isinstance(data, (list, tuple)):
             if not data:  # Empty
@@ -57,145 +101,99 @@ class CppBackend:
         
         return False
     
-    def _can_compile_function(self, func: Any) -> bool:
+    def _can_compile_function(self, func: Any, operation: str = 'map') -> bool:
         """Check if function can be compiled to C++."""
         if isinstance(func, Placeholder):
             # Check if placeholder represents a simple operation
-            return self._is_simple_placeholder(func)
+            return self._is_simple_placeholder(func, operation)
         
         # For now, only support placeholders
         return False
     
-    def _is_simple_placeholder(self, placeholder: Placeholder) -> bool:
+    def _is_simple_placeholder(self, placeholder: Placeholder, operation: str = 'map') -> bool:
         """Check if placeholder represents a simple arithmetic operation."""
-        # This is a simplified check - in reality, we'd analyze the operation tree
-        # For now, assume simple binary operations are supported
-        return hasattr(placeholder, '_op_func') and placeholder._op_func is not None
+        return _lower_expression(simplify(placeholder._node), operation) is not None
     
-    def _compile_placeholder(self, placeholder: Placeholder) -> str:
+    def _compile_placeholder(self, placeholder: Placeholder, operation: str = 'map') -> str:
         """Convert placeholder to C++ operation code."""
         if not isinstance(placeholder, Placeholder):
             raise PipelineError("Can only compile Placeholder objects")
         
-        # Check if this is a binary operation placeholder
-        if hasattr(placeholder, '_op_func') and placeholder._op_func is not None:
-            op_func = placeholder._op_func
-            other = placeholder._other_operand
-            
-            # Test the operation with sample values to determine the type
-            try:
-                # Test with sample values to identify the operation
-                test_result_1 = op_func(10, 5)
-                test_result_2 = op_func(0, 1)
-                
-                # Identify operation by testing results
-                if op_func(5, 3) == 8:  # Addition
-                    return f"add_{other}"
-                elif op_func(5, 3) == 2:  # Subtraction
-                    return f"sub_{other}"
-                elif op_func(5, 3) == 15:  # Multiplication
-                    return f"mul_{other}"
-                elif op_func(6, 3) == 2:  # Division
-                    return f"div_{other}"
-                elif op_func(5, 3) == True:  # Greater than
-                    return f"gt_{other}"
-                elif op_func(3, 5) == True:  # Less than
-                    return f"lt_{other}"
-                elif op_func(5, 5) == True:  # Greater than or equal
-                    return f"ge_{other}"
-                elif op_func(3, 3) == True:  # Less than or equal
-                    return f"le_{other}"
-                elif op_func(5, 5) == True and op_func(5, 3) == False:  # Equal
-                    return f"eq_{other}"
-                elif op_func(5, 3) == True and op_func(5, 5) == False:  # Not equal
-                    return f"ne_{other}"
-            except:
-                pass
-            
-            # Fallback: try to analyze the lambda source if possible
-            import inspect
-            try:
-                source = inspect.getsource(op_func)
-                if '+' in source:
-                    return f"add_{other}"
-                elif '*' in source:
-                    return f"mul_{other}"
-                elif '>' in source and '=' not in source:
-                    return f"gt_{other}"
-                elif '<' in source and '=' not in source:
-                    return f"lt_{other}"
-                elif '>=' in source:
-                    return f"ge_{other}"
-                elif '<=' in source:
-                    return f"le_{other}"
-                elif '==' in source:
-                    return f"eq_{other}"
-                elif '!=' in source:
-                    return f"ne_{other}"
-                elif '-' in source:
-                    return f"sub_{other}"
-                elif '/' in source:
-                    return f"div_{other}"
-            except:
-                pass
-        
-        return "identity"  # Fallback
+        op_code = _lower_expression(simplify(placeholder._node), operation)
+        if op_code is None:
+            raise PipelineError(f"Placeholder {placeholder!r} cannot be compiled to a C++ {operation} operation")
+        return op_code
     
-    def map(self, data: Any, func: Callable) -> Generator[Any, None, None]:
-        """Map function over data using C++ backend."""
+    def _float_buffer(self, data: Any) -> Optional[Any]:
+        """float64 buffer of a float buffer input; map and filter leave int buffers to the list path, which keeps ints."""
+        view = numeric_view(data)
+        if view is None or view.format in INTEGER_FORMATS:
+            return None
+        return float64_buffer(view)
+    
+    def map(self, data: Any, func: Callable) -> Union[Generator[Any, None, None], array.array]:
+        """Map function over data using C++ backend; float buffers give an array.array('d')."""
         if not self._available:
             raise PipelineError("C++ backend not available")
         
         if isinstance(func, Placeholder):
             op_code = self._compile_placeholder(func)
+            buffer = self._float_buffer(data)
+            if buffer is not None:
+                result = new_array('d', len(buffer))
+                self._native.map_buffer(buffer, op_code, result)
+                return result
+            
             # Convert to list for C++ processing
             data_list = list(data) if not isinstance(data, list) else data
-            
-            # Determine if input data is all integers
-            all_ints = all(isinstance(x, int) for x in data_list)
-            
-            # Call C++ implementation
-            result = self._native.map_operation(data_list, op_code)
-            
-            # Convert back to appropriate types
-            for item in result:
-                if all_ints and item.is_integer():
-                    yield int(item)
-                else:
-                    yield item
+            return self._restore_ints(data_list, self._native.map_operation(data_list, op_code))
         else:
             raise PipelineError("C++ backend currently only supports Placeholder functions")
     
-    def filter(self, data: Any, predicate: Callable) -> Generator[Any, None, None]:
-        """Filter data using C++ backend."""
+    def filter(self, data: Any, predicate: Callable) -> Union[Generator[Any, None, None], array.array]:
+        """Filter data using C++ backend; float buffers give an array.array('d')."""
         if not self._available:
             raise PipelineError("C++ backend not available")
         
         if isinstance(predicate, Placeholder):
-            op_code = self._compile_placeholder(predicate)
-            data_list = list(data) if not isinstance(data, list) else data
-            
-            # Determine if input data is all integers
-            all_ints = all(isinstance(x, int) for x in data_list)
-            
-            result = self._native.filter_operation(data_list, op_code)
+            op_code = self._compile_placeholder(predicate, 'filter')
+            buffer = self._float_buffer(data)
+            if buffer is not None:
+                result = new_array('d', len(buffer))
+                kept = self._native.filter_buffer(buffer, op_code, result)
+                del result[kept:]
+                return result
             
-            # Convert back to appropriate types
-            for item in result:
-                if all_ints and item.is_integer():
-                    yield int(item)
-                else:
-                    yield item
+            data_list = list(data) if not isinstance(data, list) else data
+            return self._restore_ints(data_list, self._native.filter_operation(data_list, op_code))
         else:
             raise PipelineError("C++ backend currently only supports Placeholder predicates")
     
+    def _restore_ints(self, data_list: list, result: List[float]) -> Generator[Any, None, None]:
+        """Yield native results, as ints again where the input was all ints."""
+        # Determine if input data is all integers
+        all_ints = all(isinstance(x, int) for x in data_list)
+        
+        # Convert back to appropriate types
+        for item in result:
+            if all_ints and item.is_integer():
+                yield int(item)
+            else:
+                yield item
+    
     def reduce(self, data: Any, func: Callable, initializer: Optional[Any] = None) -> Any:
         """Reduce data using C++ backend."""
         if not self._available:
             raise PipelineError("C++ backend not available")
         
         if isinstance(func, Placeholder):
-            op_code = self._compile_placeholder(func)
+            op_code = self._compile_placeholder(func, 'reduce')
+            buffer = float64_buffer(data)
+            if buffer is not None:
+                if initializer is None:
+                    return self._native.reduce_buffer(buffer, op_code)
+                return self._native.reduce_buffer_with_init(buffer, op_code, initializer)
+            
             data_list = list(data) if not isinstance(data, list) else data
             
             if initializer is None:
@@ -210,12 +208,16 @@ class CppBackend:
         if not self._available:
             raise PipelineError("C++ backend not available")
         
-        data_list = list(data) if not isinstance(data, list) else data
-        
-        # Determine if input data is all integers
-        all_ints = all(isinstance(x, int) for x in data_list)
-        
-        result = self._native.sum_operation(data_list)
+        buffer = float64_buffer(data)
+        if buffer is not None:
+            all_ints = is_integral(data)
+            result = self._native.sum_buffer(buffer)
+        else:
+            data_list = list(data) if not isinstance(data, list) else data
+            
+            # Determine if input data is all integers
+            all_ints = is_integral(data_list)
+            result = self._native.sum_operation(data_list)
         
         # Convert back to int if input was all ints and result is a whole number
         if all_ints and result.is_integer():
@@ -227,6 +229,10 @@ class CppBackend:
         if not self._available:
             raise PipelineError("C++ backend not available")
         
+        buffer = float64_buffer(data)
+        if buffer is not None:
+            return self._native.min_buffer(buffer)
+        
         data_list = list(data) if not isinstance(data, list) else data
         return self._native.min_operation(data_list)
     
@@ -235,6 +241,10 @@ class CppBackend:
         if not self._available:
             raise PipelineError("C++ backend not available")
         
+        buffer = float64_buffer(data)
+        if buffer is not None:
+            return self._native.max_buffer(buffer)
+        
         data_list = list(data) if not isinstance(data, list) else data
         return self._native.max_operation(data_list)
     
@@ -243,5 +253,9 @@ class CppBackend:
         if not self._available:
             raise PipelineError("C++ backend not available")
         
+        # A buffer knows its length without crossing into C++
+        if numeric_view(data) is not None:
+            return len(data)
+        
         data_list = list(data) if not isinstance(data, list) else data
-        return self._native.count_operation(data_list)
\ No newline at end of file
+        return self._native.count_operation(data_list)
@@ -1,13 +1,20 @@
 """
 Go backend interface for PyFunc bitwise operations.
+
+Besides lists, every operation accepts contiguous integer buffers
+(array.array, memoryview, NumPy arrays); results come back as an
+array.array of C ints for buffer inputs.
 """
 
+import array
 import ctypes
 import os
 import platform
 from typing import Any, List, Union
 from collections.abc import Iterable
 
+from .buffers import INTEGER_FORMATS, as_ctypes, numeric_view, typed_copy, typed_result
+
 def is_go_available() -> bool:
     """Check if Go backend is available."""
     try:
@@ -108,6 +115,11 @@ class GoBackend:
         if not self._available:
             return False
         
+        # Integer buffers are read directly
+        view = numeric_view(data)
+        if view is not None:
+            return view.format in INTEGER_FORMATS
+        
         # Check if it's an iterable of integers
         if not isinstance(data, Iterable) or isinstance(data, (str, bytes)):
             return False
@@ -125,61 +137,35 @@ class GoBackend:
             return False
     
     def _to_int_array(self, data: List[int]) -> ctypes.Array:
-        """Convert Python list to ctypes int array."""
-        int_data = [int(x) for x in data]
-        array_type = ctypes.c_int * len(int_data)
-        return array_type(*int_data)
+        """ctypes int array over data; C int buffers are used without copying."""
+        return as_ctypes(data, 'i')
     
-    def bitwise_and(self, data: List[int], operand: int) -> List[int]:
+    def _run_in_place(self, kernel: Any, data: List[int], *args: int) -> Union[List[int], array.array]:
+        """Run an in-place kernel on a C int copy of data, so the caller's buffer is left unchanged."""
+        values = typed_copy(data, 'i')
+        kernel(self._to_int_array(values), len(values), *args)
+        return typed_result(data, values)
+    
+    def bitwise_and(self, data: List[int], operand: int) -> Union[List[int], array.array]:
         """Perform bitwise AND using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.bitwise_and_go(int_array, len(data), operand)
-        return [int_array[i] for i in range(len(data))]
+        return self._run_in_place(self._lib.bitwise_and_go, data, operand)
     
-    def bitwise_or(self, data: List[int], operand: int) -> List[int]:
+    def bitwise_or(self, data: List[int], operand: int) -> Union[List[int], array.array]:
         """Perform bitwise OR using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.bitwise_or_go(int_array, len(data), operand)
-        return [int_array[i] for i in range(len(data))]
+        return self._run_in_place(self._lib.bitwise_or_go, data, operand)
     
-    def bitwise_xor(self, data: List[int], operand: int) -> List[int]:
+    def bitwise_xor(self, data: List[int], operand: int) -> Union[List[int], array.array]:
         """Perform bitwise XOR using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.bitwise_xor_go(int_array, len(data), operand)
-        return [int_array[i] for i in range(len(data))]
+        return self._run_in_place(self._lib.bitwise_xor_go, data, operand)
     
-    def bitwise_not(self, data: List[int]) -> List[int]:
+    def bitwise_not(self, data: List[int]) -> Union[List[int], array.array]:
         """Perform bitwise NOT using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.bitwise_not_go(int_array, len(data))
-        return [int_array[i] for i in range(len(data))]
+        return self._run_in_place(self._lib.bitwise_not_go, data)
     
-    def left_shift(self, data: List[int], bits: int) -> List[int]:
+    def left_shift(self, data: List[int], bits: int) -> Union[List[int], array.array]:
         """Perform left shift using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.left_shift_go(int_array, len(data), bits)
-        return [int_array[i] for i in range(len(data))]
+        return self._run_in_place(self._lib.left_shift_go, data, bits)
     
-    def right_shift(self, data: List[int], bits: int) -> List[int]:
+    def right_shift(self, data: List[int], bits: int) -> Union[List[int], array.array]:
         """Perform right shift using Go backend."""
-        if not data:
-            return []
-        
-        int_array = self._to_int_array(data)
-        self._lib.right_shift_go(int_array, len(data), bits)
-        return [int_array[i] for i in range(len(data))]
\ No newline at end of file
+        return self._run_in_place(self._lib.right_shift_go, data, bits)
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Chunked dispatch of streams into native kernels.
+
+Native backends work on a contiguous buffer, which used to mean copying a
+whole stream into a list first. The helpers here pull a stream in
+fixed-size chunks into one reused list instead. Each chunk goes to a native
+kernel when a backend accepts it, and to Python otherwise. Per-chunk
+results are merged (reductions) or streamed back (element-wise operations),
+so memory stays bounded by a single chunk whatever the length of the
+stream.
+"""
+
+from collections.abc import Iterable
+import itertools
+from typing import Any, Callable, Generator, Optional
+
+# Elements pulled from the stream per native call
+CHUNK_SIZE = 64 * 1024
+
+# Marks "no partial result yet", since None can be a valid partial
+_EMPTY = object()
+
+def iter_chunks(iterable: Iterable[Any], chunk_size: int = CHUNK_SIZE) -> Generator[list, None, None]:
+    """Yield successive chunks of the stream as one reused list.
+
+    The same list object is refilled for every chunk: consumers must be done
+    with a chunk before asking for the next one.
+    """
+    iterator = iter(iterable)
+    buffer: list = []
+    while True:
+        buffer[:] = itertools.islice(iterator, chunk_size)
+        if not buffer:
+            return
+        yield buffer
+
+def _run_chunk(native: Optional[Callable[[list], Any]], fallback: Callable[[list], Any], chunk: list) -> Any:
+    """Run native on a chunk, or fallback if there is no kernel or it declines the chunk."""
+    if native is not None:
+        try:
+            result = native(chunk)
+            if result is not NotImplemented:
+                return result
+        except Exception:
+            # Fall back to Python for this chunk
+            pass
+    return fallback(chunk)
+
+def fold_chunks(iterable: Iterable[Any], native: Optional[Callable[[list], Any]],
+                fallback: Callable[[list], Any], merge: Callable[[Any, Any], Any],
+                default: Any = None, chunk_size: int = CHUNK_SIZE) -> Any:
+    """Reduce a stream chunk by chunk and merge the partial results; default if it is empty.
+
+    native(chunk) returns a partial result, or NotImplemented (or raises) to
+    leave the chunk to fallback(chunk), which must return the same kind of
+    partial. merge must be associative.
+    """
+    partial = _EMPTY
+    for chunk in iter_chunks(iterable, chunk_size):
+        result = _run_chunk(native, fallback, chunk)
+        partial = result if partial is _EMPTY else merge(partial, result)
+    return default if partial is _EMPTY else partial
+
+def map_chunks(iterable: Iterable[Any], native: Optional[Callable[[list], Iterable[Any]]],
+               fallback: Callable[[list], Iterable[Any]],
+               chunk_size: int = CHUNK_SIZE) -> Generator[Any, None, None]:
+    """Run an element-wise operation chunk by chunk, streaming the outputs back in order."""
+    def _materialized(kernel: Callable[[list], Iterable[Any]]) -> Callable[[list], list]:
+        # Native kernels may be generators; run them to completion while the chunk is intact
+        return lambda chunk: list(kernel(chunk))
+
+    native_kernel = _materialized(native) if native is not None else None
+    for chunk in iter_chunks(iterable, chunk_size):
+        yield from _run_chunk(native_kernel, fallback, chunk)
@@ -1,13 +1,25 @@
 """
 Zig backend interface for PyFunc mathematical operations.
+
+Besides lists, every operation accepts contiguous numeric buffers
+(array.array, memoryview, NumPy arrays): float64 data is passed to the
+kernels in place, and element-wise results come back as array.array for
+buffer inputs.
 """
 
+import array
 import ctypes
 import os
 import platform
 from typing import Any, List, Union
 from collections.abc import Iterable
 
+from .buffers import as_ctypes, holds, is_integral, numeric_view, typed_copy, typed_result
+
+# int64/uint64 kernels; libraries built before they were added lack them
+_INT64_KERNELS = ('zig_sum_i64', 'zig_sum_u64', 'zig_min_i64', 'zig_max_i64', 'zig_min_u64', 'zig_max_u64',
+                  'zig_map_add_i64', 'zig_map_multiply_i64')
+
 def is_zig_available() -> bool:
     """Check if Zig backend is available."""
     try:
@@ -116,6 +128,22 @@ class ZigBackend:
         
         self._lib.zig_batch_basic_f64.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.c_size_t, ctypes.POINTER(ctypes.c_double)]
         self._lib.zig_batch_basic_f64.restype = None
+        
+        # Integer operations; without them only int32 sums run natively
+        self._has_int64 = all(hasattr(self._lib, name) for name in _INT64_KERNELS)
+        if self._has_int64:
+            for suffix, ctype in (('i64', ctypes.c_int64), ('u64', ctypes.c_uint64)):
+                total = getattr(self._lib, f'zig_sum_{suffix}')
+                total.argtypes = [ctypes.POINTER(ctype), ctypes.c_size_t, ctypes.POINTER(ctypes.c_bool)]
+                total.restype = ctype
+                for name in ('min', 'max'):
+                    extremum = getattr(self._lib, f'zig_{name}_{suffix}')
+                    extremum.argtypes = [ctypes.POINTER(ctype), ctypes.c_size_t]
+                    extremum.restype = ctype
+            for name in ('add', 'multiply'):
+                mapped = getattr(self._lib, f'zig_map_{name}_i64')
+                mapped.argtypes = [ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t, ctypes.c_int64]
+                mapped.restype = ctypes.c_bool
     
     def supports_operation(self, operation: str, data_type: type = None) -> bool:
         """Check if operation is supported by Zig backend."""
@@ -135,6 +163,10 @@ class ZigBackend:
         if not self._available:
             return False
         
+        # Numeric buffers are read directly
+        if numeric_view(data) is not None:
+            return True
+        
         # Check if it's a numeric iterable
         if not isinstance(data, Iterable) or isinstance(data, (str, bytes)):
             return False
@@ -154,32 +186,62 @@ class ZigBackend:
             return False
     
     def _to_float_array(self, data: List[Union[int, float]]) -> ctypes.Array:
-        """Convert Python list to ctypes float array."""
-        float_data = [float(x) for x in data]
-        array_type = ctypes.c_double * len(float_data)
-        return array_type(*float_data)
+        """ctypes double array over data; float64 buffers are used without copying."""
+        return as_ctypes(data, 'd')
     
     def _to_int_array(self, data: List[int]) -> ctypes.Array:
-        """Convert Python list to ctypes int array."""
-        array_type = ctypes.c_int32 * len(data)
-        return array_type(*data)
+        """ctypes int32 array over data; int32 buffers are used without copying."""
+        return as_ctypes(data, 'i')
+    
+    def _map_in_place(self, kernel: Any, data: List[Union[int, float]], operand: float) -> Any:
+        """Run an in-place kernel on a float64 copy of data, so the caller's buffer is left unchanged."""
+        values = typed_copy(data, 'd')
+        kernel(self._to_float_array(values), len(values), operand)
+        return typed_result(data, values)
+    
+    def _int64_typecode(self, data: List[int]) -> str:
+        """'Q' for uint64 buffers, which go to the u64 kernels in place; 'q' for other integers."""
+        view = numeric_view(data)
+        return 'Q' if view is not None and holds(view, 'Q') else 'q'
+    
+    def _map_int64(self, kernel: Any, data: List[int], operand: int) -> Union[List[int], array.array]:
+        """Run an in-place int64 kernel on a copy of data; OverflowError if a result does not fit."""
+        values = typed_copy(data, 'q')
+        if kernel(as_ctypes(values, 'q'), len(values), operand):
+            raise OverflowError("integer result does not fit in 64 bits")
+        return typed_result(data, values)
+    
+    def _takes_int64(self, data: List[Union[int, float]], operand: Any = 0) -> bool:
+        """Check if data and operand can go to the int64 kernels."""
+        return self._has_int64 and type(operand) is int and is_integral(data)
     
     def sum(self, data: List[Union[int, float]]) -> Union[int, float]:
         """Calculate sum using Zig backend."""
-        if not data:
+        if len(data) == 0:
             return 0
         
-        # Try integer sum first if all elements are integers
-        if all(isinstance(x, int) for x in data):
-            int_array = self._to_int_array(data)
-            return self._lib.zig_sum_i32(int_array, len(data))
-        else:
+        if not is_integral(data):
             float_array = self._to_float_array(data)
             return self._lib.zig_sum_f64(float_array, len(data))
+        
+        # int32 buffers are summed in place into an int64 total; so is everything else when
+        # the library has no int64 kernels, and values beyond int32 raise OverflowError
+        view = numeric_view(data)
+        if not self._has_int64 or (view is not None and holds(view, 'i')):
+            int_array = self._to_int_array(data)
+            return self._lib.zig_sum_i32(int_array, len(data))
+        
+        typecode = self._int64_typecode(data)
+        kernel = self._lib.zig_sum_u64 if typecode == 'Q' else self._lib.zig_sum_i64
+        overflow = ctypes.c_bool()
+        total = kernel(as_ctypes(data, typecode), len(data), ctypes.byref(overflow))
+        if overflow.value:
+            raise OverflowError("integer sum does not fit in 64 bits")
+        return total
     
     def mean(self, data: List[Union[int, float]]) -> float:
         """Calculate mean using Zig backend."""
-        if not data:
+        if len(data) == 0:
             return 0.0
         
         float_array = self._to_float_array(data)
@@ -187,17 +249,27 @@ class ZigBackend:
     
     def min(self, data: List[Union[int, float]]) -> Union[int, float]:
         """Calculate minimum using Zig backend."""
-        if not data:
+        if len(data) == 0:
             raise ValueError("min() arg is an empty sequence")
         
+        if self._takes_int64(data):
+            typecode = self._int64_typecode(data)
+            kernel = self._lib.zig_min_u64 if typecode == 'Q' else self._lib.zig_min_i64
+            return kernel(as_ctypes(data, typecode), len(data))
+        
         float_array = self._to_float_array(data)
         return self._lib.zig_min_f64(float_array, len(data))
     
     def max(self, data: List[Union[int, float]]) -> Union[int, float]:
         """Calculate maximum using Zig backend."""
-        if not data:
+        if len(data) == 0:
             raise ValueError("max() arg is an empty sequence")
         
+        if self._takes_int64(data):
+            typecode = self._int64_typecode(data)
+            kernel = self._lib.zig_max_u64 if typecode == 'Q' else self._lib.zig_max_i64
+            return kernel(as_ctypes(data, typecode), len(data))
+        
         float_array = self._to_float_array(data)
         return self._lib.zig_max_f64(float_array, len(data))
     
@@ -209,39 +281,28 @@ class ZigBackend:
         float_array = self._to_float_array(data)
         return self._lib.zig_std_dev_f64(float_array, len(data))
     
-    def map_multiply(self, data: List[Union[int, float]], multiplier: float) -> List[float]:
-        """Multiply all elements by a constant using Zig backend."""
-        if not data:
-            return []
-        
-        float_array = self._to_float_array(data)
-        self._lib.zig_map_multiply_f64(float_array, len(data), multiplier)
-        return [float_array[i] for i in range(len(data))]
+    def map_multiply(self, data: List[Union[int, float]], multiplier: float) -> Union[List[float], array.array]:
+        """Multiply all elements by a constant using Zig backend; integers times an int stay int64."""
+        if self._takes_int64(data, multiplier):
+            return self._map_int64(self._lib.zig_map_multiply_i64, data, multiplier)
+        return self._map_in_place(self._lib.zig_map_multiply_f64, data, multiplier)
     
-    def map_add(self, data: List[Union[int, float]], addend: float) -> List[float]:
-        """Add a constant to all elements using Zig backend."""
-        if not data:
-            return []
-        
-        float_array = self._to_float_array(data)
-        self._lib.zig_map_add_f64(float_array, len(data), addend)
-        return [float_array[i] for i in range(len(data))]
+    def map_add(self, data: List[Union[int, float]], addend: float) -> Union[List[float], array.array]:
+        """Add a constant to all elements using Zig backend; integers plus an int stay int64."""
+        if self._takes_int64(data, addend):
+            return self._map_int64(self._lib.zig_map_add_i64, data, addend)
+        return self._map_in_place(self._lib.zig_map_add_f64, data, addend)
     
-    def map_power(self, data: List[Union[int, float]], exponent: float) -> List[float]:
+    def map_power(self, data: List[Union[int, float]], exponent: float) -> Union[List[float], array.array]:
         """Raise all elements to a power using Zig backend."""
-        if not data:
-            return []
-        
-        float_array = self._to_float_array(data)
-        self._lib.zig_map_power_f64(float_array, len(data), exponent)
-        return [float_array[i] for i in range(len(data))]
+        return self._map_in_place(self._lib.zig_map_power_f64, data, exponent)
     
     def dot_product(self, a: List[Union[int, float]], b: List[Union[int, float]]) -> float:
         """Calculate dot product of two vectors using Zig backend."""
         if len(a) != len(b):
             raise ValueError("Vectors must have the same length")
         
-        if not a:
+        if len(a) == 0:
             return 0.0
         
         array_a = self._to_float_array(a)
@@ -250,7 +311,7 @@ class ZigBackend:
     
     def vector_magnitude(self, data: List[Union[int, float]]) -> float:
         """Calculate vector magnitude using Zig backend."""
-        if not data:
+        if len(data) == 0:
             return 0.0
         
         float_array = self._to_float_array(data)
@@ -258,7 +319,7 @@ class ZigBackend:
     
     def batch_statistics(self, data: List[Union[int, float]]) -> dict:
         """Calculate multiple statistics in one FFI call."""
-        if not data:
+        if len(data) == 0:
             return {'sum': 0.0, 'mean': 0.0, 'min': 0.0, 'max': 0.0, 'stdev': 0.0}
         
         float_array = self._to_float_array(data)
@@ -275,7 +336,7 @@ class ZigBackend:
     
     def batch_basic(self, data: List[Union[int, float]]) -> dict:
         """Calculate basic statistics in one FFI call."""
-        if not data:
+        if len(data) == 0:
             return {'sum': 0.0, 'mean': 0.0, 'min': 0.0, 'max': 0.0}
         
         float_array = self._to_float_array(data)
@@ -0,0 +1,126 @@
+"""
+Source code generation for PyFunc pipelines.
+
+Pipeline.compile() turns a stage list into the text of one Python
+function, with Placeholder expressions inlined and runs of element-wise
+stages merged into a single generator loop. The text is compiled with
+exec once and cached, so pipelines with the same shape share code.
+"""
+
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from .backends import get_backend
+from .expr import Bindings, simplify
+from .placeholder import Placeholder
+from .plan import Stage, execute, is_fusable
+
+def _inline(stage: Stage, arg: str, bindings: Bindings) -> str:
+    """Source applying the stage's callable to arg, inlining Placeholder expressions."""
+    func = stage.args[0] if stage.args else None
+    if isinstance(func, Placeholder):
+        return simplify(func._node).source(arg, bindings)
+    return f"{bindings.bind(stage.fn, '_f')}({arg})"
+
+def _loop_source(name: str, run: tuple, bindings: Bindings) -> List[str]:
+    """Generate a generator function running element-wise stages in one loop."""
+    setup: list[str] = []
+    body: list[str] = []
+    limit: Optional[int] = None
+    for i, stage in enumerate(run):
+        if stage.op == 'map':
+            body.append(f"x = {_inline(stage, 'x', bindings)}")
+        elif stage.op == 'filter':
+            body.append(f"if not {_inline(stage, 'x', bindings)}: continue")
+        elif stage.op == 'take_while':
+            body.append(f"if not {_inline(stage, 'x', bindings)}: return")
+        elif stage.op == 'skip_while':
+            setup.append(f"_skipping{i} = True")
+            body.append(f"if _skipping{i}:")
+            body.append(f"    if {_inline(stage, 'x', bindings)}: continue")
+            body.append(f"    _skipping{i} = False")
+        elif stage.op == 'skip':
+            setup.append(f"_skipped{i} = 0")
+            body.append(f"if _skipped{i} < {stage.args[0]}:")
+            body.append(f"    _skipped{i} += 1")
+            body.append(f"    continue")
+        else:
+            # 'take' only ever ends a loop, see _split_runs
+            limit = max(stage.args[0], 0)
+    lines = [f"def {name}(it):"]
+    lines += [f"    {line}" for line in setup]
+    if limit == 0:
+        lines.append(f"    return")
+    if limit is not None:
+        lines.append(f"    _taken = 0")
+    lines.append(f"    for x in it:")
+    lines += [f"        {line}" for line in body]
+    lines.append(f"        yield x")
+    if limit is not None:
+        lines.append(f"        _taken += 1")
+        lines.append(f"        if _taken >= {limit}: return")
+    return lines
+
+def _split_runs(stages: tuple) -> list:
+    """Group stages into fusable runs (tuples) and single stages; a run ends after each take."""
+    groups: list = []
+    run: list[Stage] = []
+    for stage in stages:
+        if is_fusable(stage):
+            run.append(stage)
+            if stage.op == 'take':
+                groups.append(tuple(run))
+                run = []
+            continue
+        if run:
+            groups.append(tuple(run))
+            run = []
+        groups.append(stage)
+    if run:
+        groups.append(tuple(run))
+    return groups
+
+def generate(stages: tuple) -> Tuple[str, List[str], List[Any]]:
+    """Generate the source of a factory building the compiled pipeline function."""
+    bindings = Bindings()
+    iterable = bindings.bind(Iterable, '_g')
+    helpers: list[str] = []
+    body: list[str] = []
+    loops = 0
+    for group in _split_runs(stages):
+        if isinstance(group, Stage):
+            if group.op == 'apply' and isinstance(group.args[0], Placeholder):
+                body.append(f"value = {simplify(group.args[0]._node).source('value', bindings)}")
+            else:
+                body.append(f"value = {bindings.bind(group.func, '_s')}(value)")
+            continue
+        loop = f"_loop{loops}"
+        loops += 1
+        helpers.extend(_loop_source(loop, group, bindings))
+        condition = f"isinstance(value, {iterable}) and not isinstance(value, (str, bytes))"
+        if 'cpp' in group[0].hints.get('backends', ()):
+            condition += f" and not {bindings.bind(get_backend, '_g')}().cpp_enabled"
+        fallback = f"{bindings.bind(execute, '_g')}({bindings.bind(group, '_r')}, value)"
+        body.append(f"value = {loop}(value) if {condition} else {fallback}")
+    lines = [f"def _factory({', '.join(bindings.names)}):"]
+    lines += [f"    {line}" for line in helpers]
+    lines.append("    def _compiled(value):")
+    lines += [f"        {line}" for line in body]
+    lines.append("        return value")
+    lines.append("    return _compiled")
+    return '\n'.join(lines), bindings.names, bindings.values
+
+@lru_cache(maxsize=256)
+def _factory_from_source(source: str) -> Callable[..., Callable[[Any], Any]]:
+    """Compile generated source once; pipelines with the same shape share the code object."""
+    namespace: dict[str, Any] = {}
+    exec(compile(source, '<pyfunc-compiled>', 'exec'), namespace)
+    return namespace['_factory']
+
+def compile_stages(stages: tuple) -> Callable[[Any], Any]:
+    """Compile a stage list into a single plain Python function."""
+    source, _names, values = generate(stages)
+    compiled = _factory_from_source(source)(*values)
+    compiled.__pyfunc_source__ = source
+    return compiled
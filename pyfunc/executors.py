@@ -0,0 +1,166 @@
+"""
+Process-wide registry of warm, reusable worker pools.
+
+Parallel stages borrow their pool from here instead of starting and
+tearing one down on every run, so worker start-up (a new interpreter per
+process worker, importing pyfunc, loading the native libraries) is paid
+once per pool rather than once per pipeline.
+
+Pools are named. register_executor() declares a pool; it is started on
+first use. par_map()/par_reduce() with executor='name' run on a named pool;
+without one they share a default pool per mode and worker count. Every
+process worker imports pyfunc and loads the available native backends
+before it takes work, then runs the pool's initializer, if any.
+
+Pools are shut down at interpreter exit. A forked child starts with an
+empty set of live pools, since the parent's worker threads and processes
+do not exist in it; registrations carry over.
+"""
+
+import atexit
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .errors import PipelineError
+
+EXECUTION_MODES = ('thread', 'process')
+
+# Seconds warm_executor() waits for busy threads to join in
+_WARM_TIMEOUT = 1.0
+
+def default_workers() -> int:
+    """Number of workers used when none is given."""
+    return os.cpu_count() or 1
+
+class ExecutorConfig:
+    """How a registered pool is created."""
+
+    __slots__ = ('mode', 'max_workers', 'initializer', 'initargs', 'mp_context')
+
+    def __init__(self, mode: str, max_workers: int, initializer: Optional[Callable[..., Any]] = None,
+                 initargs: tuple = (), mp_context: Any = None):
+        self.mode = mode
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.mp_context = mp_context
+
+    def __repr__(self) -> str:
+        return f"ExecutorConfig(mode={self.mode!r}, max_workers={self.max_workers})"
+
+_lock = threading.Lock()
+_configs: Dict[str, ExecutorConfig] = {}
+_pools: Dict[str, Executor] = {}
+
+def _init_worker(initializer: Optional[Callable[..., Any]], initargs: tuple) -> None:
+    """Worker initializer: load the native backends, then run the pool's own initializer."""
+    from .backends import get_backend
+    backend = get_backend()
+    # The properties load each library once per process
+    for attribute in ('cpp_backend', 'zig_backend', 'go_backend', 'rust_available'):
+        getattr(backend, attribute)
+    if initializer is not None:
+        initializer(*initargs)
+
+def make_executor(mode: str, workers: int, initializer: Optional[Callable[..., Any]] = None,
+                  initargs: tuple = (), mp_context: Any = None) -> Executor:
+    """Create a new pool for an execution mode."""
+    if mode == 'process':
+        return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                   initializer=_init_worker, initargs=(initializer, initargs))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pyfunc',
+                              initializer=initializer, initargs=initargs)
+
+def register_executor(name: str, mode: str = 'thread', max_workers: Optional[int] = None,
+                      initializer: Optional[Callable[..., Any]] = None, initargs: tuple = (),
+                      mp_context: Any = None) -> None:
+    """Declare a named pool, started on first use.
+
+    initializer(*initargs) runs once in every worker. mp_context selects the
+    multiprocessing start method of process pools. Registering a name again
+    replaces the pool; the old one finishes its running work and shuts down.
+    """
+    if mode not in EXECUTION_MODES:
+        raise PipelineError(f"Unknown execution mode {mode!r}; expected one of {', '.join(EXECUTION_MODES)}")
+    if max_workers is not None and (type(max_workers) is not int or max_workers < 1):
+        raise PipelineError(f"max_workers must be a positive int, got {max_workers!r}")
+    config = ExecutorConfig(mode, max_workers or default_workers(), initializer, initargs, mp_context)
+    with _lock:
+        _configs[name] = config
+        old = _pools.pop(name, None)
+    if old is not None:
+        old.shutdown(wait=False)
+
+def executor_config(name: str) -> ExecutorConfig:
+    """The configuration of a registered pool."""
+    try:
+        return _configs[name]
+    except KeyError:
+        raise PipelineError(f"No executor named {name!r}; register it with register_executor()") from None
+
+def get_executor(name: str) -> Executor:
+    """The live pool registered as name, started (or restarted after a crash) if needed.
+
+    The pool is shared: callers cancel their own futures but never shut it
+    down.
+    """
+    with _lock:
+        pool = _pools.get(name)
+        # A process pool whose worker died refuses new work
+        if pool is None or getattr(pool, '_broken', False):
+            config = executor_config(name)
+            pool = make_executor(config.mode, config.max_workers, config.initializer, config.initargs,
+                                 config.mp_context)
+            _pools[name] = pool
+        return pool
+
+def shared_executor(mode: str, workers: int) -> Executor:
+    """The default pool for a mode and worker count, registered on first use."""
+    name = f"{mode}-{workers}"
+    if name not in _configs:
+        with _lock:
+            _configs.setdefault(name, ExecutorConfig(mode, workers))
+    return get_executor(name)
+
+def warm_executor(name: str) -> None:
+    """Start every worker of a pool now rather than on its first tasks."""
+    pool = get_executor(name)
+    config = executor_config(name)
+    barrier = threading.Barrier(config.max_workers) if config.mode == 'thread' else None
+    futures = [pool.submit(_wait_at, barrier) for _i in range(config.max_workers)]
+    for future in futures:
+        future.result()
+
+def _wait_at(barrier: Optional[threading.Barrier]) -> None:
+    # Thread pools only add a thread when none is idle, so the tasks wait for each other;
+    # threads busy with other work cannot join, hence the timeout
+    if barrier is not None:
+        try:
+            barrier.wait(_WARM_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down every live pool; registrations stay and pools restart on next use."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        if sys.version_info >= (3, 9):
+            pool.shutdown(wait=wait, cancel_futures=True)
+        else:
+            # cancel_futures is new in 3.9; queued tasks still run before the pool stops
+            pool.shutdown(wait=wait)
+
+def _forget_pools() -> None:
+    """In a forked child: drop the parent's pools, whose workers were not copied."""
+    global _lock
+    _lock = threading.Lock()
+    _pools.clear()
+
+atexit.register(shutdown_executors)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
@@ -0,0 +1,567 @@
+"""
+Expression trees for PyFunc placeholders.
+
+Every operation on a Placeholder builds a node instead of wrapping the
+previous closure. The tree can be evaluated, printed as Python source,
+compared structurally and lowered exactly onto native kernels.
+
+Nodes are immutable. Their ``key`` is a hashable structural description,
+so equal expressions share cache entries regardless of where they were
+built. ``dump()``/``load()`` convert a tree to and from plain nested
+tuples, which is what a pickled Placeholder carries.
+"""
+
+import keyword
+import math
+import operator
+from typing import Any, Callable, Dict, Optional
+
+# Binary operator symbols mapped to their Python implementations
+BINARY_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '//': operator.floordiv, '%': operator.mod, '**': operator.pow,
+    '&': operator.and_, '|': operator.or_, '^': operator.xor,
+    '<<': operator.lshift, '>>': operator.rshift,
+    '<': operator.lt, '<=': operator.le, '==': operator.eq,
+    '!=': operator.ne, '>': operator.gt, '>=': operator.ge,
+    'in': lambda a, b: a in b,
+}
+
+UNARY_OPERATORS: Dict[str, Callable[[Any], Any]] = {
+    '-': operator.neg, '+': operator.pos, '~': operator.invert,
+}
+
+class Bindings:
+    """Collects the runtime objects referenced by generated source."""
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.values: list[Any] = []
+
+    def bind(self, value: Any, prefix: str = '_c') -> str:
+        """Return the name under which value is visible to the generated code."""
+        name = f"{prefix}{len(self.names)}"
+        self.names.append(name)
+        self.values.append(value)
+        return name
+
+class _DisplayBindings(Bindings):
+    """Bindings that show objects by name, used for repr."""
+
+    def bind(self, value: Any, prefix: str = '_c') -> str:
+        return getattr(value, '__name__', None) or repr(value)
+
+def literal(value: Any) -> Optional[str]:
+    """Return source for constants that can be written inline."""
+    if value is None or type(value) in (bool, int, str, bytes):
+        return repr(value)
+    if type(value) is float and math.isfinite(value):
+        return repr(value)
+    return None
+
+class Node:
+    """Base class of expression nodes."""
+
+    __slots__ = ('_key',)
+
+    @property
+    def key(self) -> tuple:
+        """Hashable structural key; equal keys mean equal expressions."""
+        try:
+            return self._key
+        except AttributeError:
+            self._key = self._make_key()
+            return self._key
+
+    def _make_key(self) -> tuple:
+        raise NotImplementedError
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Node) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return self.source('_', _DisplayBindings())
+
+    def children(self) -> tuple:
+        """Sub-expressions of this node."""
+        return ()
+
+    def has_arg(self) -> bool:
+        """Check if the expression depends on its argument."""
+        return any(child.has_arg() for child in self.children())
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        """Build a one-argument callable computing the expression."""
+        raise NotImplementedError
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        """Generate Python source computing the expression from the variable arg."""
+        raise NotImplementedError
+
+    def substitute(self, arg: 'Node') -> 'Node':
+        """Replace the argument of the expression with another expression."""
+        raise NotImplementedError
+
+    def rebuild(self, children: tuple) -> 'Node':
+        """Build the same kind of node over new children (in children() order)."""
+        return self
+
+    def dump(self) -> tuple:
+        """Plain nested-tuple form of the expression, rebuilt by load()."""
+        raise NotImplementedError
+
+    def replace(self, mapping: dict) -> 'Node':
+        """Replace every sub-expression structurally equal to a key of mapping."""
+        if self in mapping:
+            return mapping[self]
+        return self.rebuild(tuple(child.replace(mapping) for child in self.children()))
+
+class Arg(Node):
+    """The value the expression is applied to."""
+
+    __slots__ = ()
+
+    def _make_key(self) -> tuple:
+        return ('arg',)
+
+    def has_arg(self) -> bool:
+        return True
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        return _identity
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        return arg
+
+    def substitute(self, arg: Node) -> Node:
+        return arg
+
+    def dump(self) -> tuple:
+        return ('arg',)
+
+class Const(Node):
+    """A constant captured when the expression was built."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def _make_key(self) -> tuple:
+        try:
+            hash(self.value)
+        except TypeError:
+            # Unhashable constants compare by identity; the node keeps them alive
+            return ('const', 'id', id(self.value))
+        # The type keeps 1, 1.0 and True apart
+        return ('const', type(self.value), self.value)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        value = self.value
+        return lambda x: value
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        text = literal(self.value)
+        return f"({text})" if text is not None else bindings.bind(self.value)
+
+    def substitute(self, arg: Node) -> Node:
+        return self
+
+    def dump(self) -> tuple:
+        return ('const', self.value)
+
+class BinOp(Node):
+    """A binary operator applied to two sub-expressions."""
+
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: str, left: Node, right: Node):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def _make_key(self) -> tuple:
+        return ('binop', self.op, self.left.key, self.right.key)
+
+    def children(self) -> tuple:
+        return (self.left, self.right)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        op = BINARY_OPERATORS[self.op]
+        left, right = self.left, self.right
+        if isinstance(left, Arg) and isinstance(right, Const):
+            value = right.value
+            return lambda x: op(x, value)
+        if isinstance(left, Const) and isinstance(right, Arg):
+            value = left.value
+            return lambda x: op(value, x)
+        left_func, right_func = left.evaluator(), right.evaluator()
+        return lambda x: op(left_func(x), right_func(x))
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        return f"({self.left.source(arg, bindings)} {self.op} {self.right.source(arg, bindings)})"
+
+    def substitute(self, arg: Node) -> Node:
+        return BinOp(self.op, self.left.substitute(arg), self.right.substitute(arg))
+
+    def rebuild(self, children: tuple) -> Node:
+        return BinOp(self.op, *children)
+
+    def dump(self) -> tuple:
+        return ('binop', self.op, self.left.dump(), self.right.dump())
+
+class UnaryOp(Node):
+    """A unary operator applied to a sub-expression."""
+
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op: str, operand: Node):
+        self.op = op
+        self.operand = operand
+
+    def _make_key(self) -> tuple:
+        return ('unary', self.op, self.operand.key)
+
+    def children(self) -> tuple:
+        return (self.operand,)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        op = UNARY_OPERATORS[self.op]
+        if isinstance(self.operand, Arg):
+            return op
+        operand = self.operand.evaluator()
+        return lambda x: op(operand(x))
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        return f"({self.op}{self.operand.source(arg, bindings)})"
+
+    def substitute(self, arg: Node) -> Node:
+        return UnaryOp(self.op, self.operand.substitute(arg))
+
+    def rebuild(self, children: tuple) -> Node:
+        return UnaryOp(self.op, children[0])
+
+    def dump(self) -> tuple:
+        return ('unary', self.op, self.operand.dump())
+
+class Attr(Node):
+    """Attribute access, like _.name."""
+
+    __slots__ = ('obj', 'name')
+
+    def __init__(self, obj: Node, name: str):
+        self.obj = obj
+        self.name = name
+
+    def _make_key(self) -> tuple:
+        return ('attr', self.obj.key, self.name)
+
+    def children(self) -> tuple:
+        return (self.obj,)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        name = self.name
+        path = _accessor_path(self)
+        if path is not None:
+            return _path_getter(path)
+        obj = self.obj.evaluator()
+        return lambda x: getattr(obj(x), name)
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        obj = self.obj.source(arg, bindings)
+        if self.name.isidentifier() and not keyword.iskeyword(self.name):
+            return f"{obj}.{self.name}"
+        return f"getattr({obj}, {self.name!r})"
+
+    def substitute(self, arg: Node) -> Node:
+        return Attr(self.obj.substitute(arg), self.name)
+
+    def rebuild(self, children: tuple) -> Node:
+        return Attr(children[0], self.name)
+
+    def dump(self) -> tuple:
+        return ('attr', self.obj.dump(), self.name)
+
+class Item(Node):
+    """Item access, like _['key']."""
+
+    __slots__ = ('obj', 'index')
+
+    def __init__(self, obj: Node, index: Node):
+        self.obj = obj
+        self.index = index
+
+    def _make_key(self) -> tuple:
+        return ('item', self.obj.key, self.index.key)
+
+    def children(self) -> tuple:
+        return (self.obj, self.index)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        path = _accessor_path(self)
+        if path is not None:
+            return _path_getter(path)
+        if isinstance(self.index, Const):
+            obj, index = self.obj.evaluator(), self.index.value
+            return lambda x: obj(x)[index]
+        obj, index_func = self.obj.evaluator(), self.index.evaluator()
+        return lambda x: obj(x)[index_func(x)]
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        return f"{self.obj.source(arg, bindings)}[{self.index.source(arg, bindings)}]"
+
+    def substitute(self, arg: Node) -> Node:
+        return Item(self.obj.substitute(arg), self.index.substitute(arg))
+
+    def rebuild(self, children: tuple) -> Node:
+        return Item(*children)
+
+    def dump(self) -> tuple:
+        return ('item', self.obj.dump(), self.index.dump())
+
+class Call(Node):
+    """A call of a sub-expression, like _.strip() or an opaque function."""
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func: Node, args: tuple = (), kwargs: tuple = ()):
+        self.func = func
+        # args is a tuple of nodes, kwargs a tuple of (name, node) pairs
+        self.args = args
+        self.kwargs = kwargs
+
+    def _make_key(self) -> tuple:
+        return ('call', self.func.key, tuple(a.key for a in self.args),
+                tuple((k, v.key) for k, v in self.kwargs))
+
+    def children(self) -> tuple:
+        return (self.func,) + self.args + tuple(v for _k, v in self.kwargs)
+
+    def evaluator(self) -> Callable[[Any], Any]:
+        if isinstance(self.func, Const) and not self.kwargs and len(self.args) == 1 and isinstance(self.args[0], Arg):
+            # A wrapped one-argument function is its own evaluator
+            return self.func.value
+        func = self.func.evaluator()
+        args = [a.evaluator() for a in self.args]
+        kwargs = [(k, v.evaluator()) for k, v in self.kwargs]
+        if not kwargs:
+            return lambda x: func(x)(*[a(x) for a in args])
+        return lambda x: func(x)(*[a(x) for a in args], **{k: v(x) for k, v in kwargs})
+
+    def source(self, arg: str, bindings: Bindings) -> str:
+        params = [a.source(arg, bindings) for a in self.args]
+        params += [f"{k}={v.source(arg, bindings)}" for k, v in self.kwargs]
+        return f"{self.func.source(arg, bindings)}({', '.join(params)})"
+
+    def substitute(self, arg: Node) -> Node:
+        return Call(self.func.substitute(arg), tuple(a.substitute(arg) for a in self.args),
+                    tuple((k, v.substitute(arg)) for k, v in self.kwargs))
+
+    def rebuild(self, children: tuple) -> Node:
+        args = children[1:1 + len(self.args)]
+        kwargs = tuple((k, v) for (k, _old), v in zip(self.kwargs, children[1 + len(self.args):]))
+        return Call(children[0], args, kwargs)
+
+    def dump(self) -> tuple:
+        return ('call', self.func.dump(), tuple(a.dump() for a in self.args),
+                tuple((k, v.dump()) for k, v in self.kwargs))
+
+def _identity(x: Any) -> Any:
+    return x
+
+def _accessor_path(node: Node) -> Optional[list]:
+    """Steps of an Attr/Item chain applied directly to the argument, like _.x['k'].y.
+
+    Each step is (is_item, key). Returns None if the chain starts elsewhere or
+    uses a computed index.
+    """
+    path = []
+    while not isinstance(node, Arg):
+        if isinstance(node, Attr):
+            path.append((False, node.name))
+        elif isinstance(node, Item) and isinstance(node.index, Const):
+            path.append((True, node.index.value))
+        else:
+            return None
+        node = node.obj
+    path.reverse()
+    return path
+
+def _path_getter(path: list) -> Callable[[Any], Any]:
+    """Build a single accessor for a chain of attribute and item lookups."""
+    if not any(is_item for is_item, _key in path) and all('.' not in name for _i, name in path):
+        # attrgetter resolves dotted names in C
+        return operator.attrgetter('.'.join(name for _i, name in path))
+    if all(is_item for is_item, _key in path):
+        keys = [key for _i, key in path]
+        if len(keys) == 1:
+            return operator.itemgetter(keys[0])
+        if len(keys) == 2:
+            first, second = keys
+            return lambda x: x[first][second]
+        if len(keys) == 3:
+            first, second, third = keys
+            return lambda x: x[first][second][third]
+
+    def getter(x: Any) -> Any:
+        for is_item, key in path:
+            x = x[key] if is_item else getattr(x, key)
+        return x
+    return getter
+
+# The argument node is shared; it carries no state
+ARG = Arg()
+
+def load(data: tuple) -> Node:
+    """Rebuild an expression from the form returned by Node.dump()."""
+    kind = data[0]
+    if kind == 'arg':
+        return ARG
+    if kind == 'const':
+        return Const(data[1])
+    if kind == 'binop':
+        return BinOp(data[1], load(data[2]), load(data[3]))
+    if kind == 'unary':
+        return UnaryOp(data[1], load(data[2]))
+    if kind == 'attr':
+        return Attr(load(data[1]), data[2])
+    if kind == 'item':
+        return Item(load(data[1]), load(data[2]))
+    if kind == 'call':
+        return Call(load(data[1]), tuple(load(a) for a in data[2]), tuple((k, load(v)) for k, v in data[3]))
+    raise ValueError(f"Unknown expression node kind {kind!r}")
+
+# ======================================================================
+# Simplification
+# ======================================================================
+#
+# simplify() folds constant sub-expressions, which is exact whatever the
+# argument turns out to be. Algebraic identities such as e + 0 -> e or
+# (e + 1) - 1 -> e only hold for some operand types: they would keep a bool
+# a bool, stop 'a' + 0 from raising and skip a float rounding. They are
+# applied only with integral=True, where the argument is known to be a
+# (non-bool) int, and only to sub-expressions that must then be ints too.
+
+
+_FOLDABLE_TYPES = (int, float, complex, bool, str, bytes, type(None))
+
+def simplify(node: Node, integral: bool = False) -> Node:
+    """Return an equivalent, smaller expression; node itself if nothing applies.
+
+    By default only constant sub-expressions are folded: a Placeholder in
+    Pipeline.map/filter/sort(key=)/group_by runs ``(_ * 2) * 3``, ``_ + 0``,
+    ``-(-_)`` and ``(_ + 1) - 1`` as written, since a Pipeline does not know
+    its element types. integral=True promises that the argument is always
+    an int (not a bool), which enables the arithmetic identities; typed
+    int64/uint64 pipelines pass it.
+    """
+    if isinstance(node, BinOp):
+        left, right = simplify(node.left, integral), simplify(node.right, integral)
+        return _simplify_binop(node if left is node.left and right is node.right else BinOp(node.op, left, right),
+                               integral)
+    if isinstance(node, UnaryOp):
+        operand = simplify(node.operand, integral)
+        return _simplify_unary(node if operand is node.operand else UnaryOp(node.op, operand), integral)
+    if isinstance(node, Attr):
+        obj = simplify(node.obj, integral)
+        return node if obj is node.obj else Attr(obj, node.name)
+    if isinstance(node, Item):
+        obj, index = simplify(node.obj, integral), simplify(node.index, integral)
+        return node if obj is node.obj and index is node.index else Item(obj, index)
+    if isinstance(node, Call):
+        func = simplify(node.func, integral)
+        args = tuple(simplify(a, integral) for a in node.args)
+        kwargs = tuple((k, simplify(v, integral)) for k, v in node.kwargs)
+        unchanged = (func is node.func and all(a is b for a, b in zip(args, node.args))
+                     and all(a[1] is b[1] for a, b in zip(kwargs, node.kwargs)))
+        return node if unchanged else Call(func, args, kwargs)
+    return node
+
+def _is_int(node: Node, *values: int) -> bool:
+    """Check if node is an int constant (optionally one of values); bools do not count."""
+    return isinstance(node, Const) and type(node.value) is int and (not values or node.value in values)
+
+# Operators that give an int for int operands
+_INTEGER_OPS = frozenset({'+', '-', '*', '//', '%', '&', '|', '^', '<<', '>>'})
+
+def _int_valued(node: Node) -> bool:
+    """Check if node always gives an int (not a bool) when the argument is an int."""
+    if isinstance(node, Arg):
+        return True
+    if isinstance(node, Const):
+        return type(node.value) is int
+    if isinstance(node, BinOp):
+        if node.op == '**':
+            # A negative exponent gives a float
+            return _int_valued(node.left) and _is_int(node.right) and node.right.value >= 0
+        return node.op in _INTEGER_OPS and _int_valued(node.left) and _int_valued(node.right)
+    if isinstance(node, UnaryOp):
+        return _int_valued(node.operand)
+    return False
+
+def _is_power_of_two(value: int) -> bool:
+    value = abs(value)
+    return value != 0 and value & (value - 1) == 0
+
+def _fold(op: Callable[..., Any], *operands: Const) -> Optional[Const]:
+    """Evaluate an operator over constants, or None if that is not safe to do ahead of time."""
+    if not all(type(c.value) in _FOLDABLE_TYPES for c in operands):
+        return None
+    try:
+        return Const(op(*(c.value for c in operands)))
+    except Exception:
+        # Leave the error to surface when the expression runs
+        return None
+
+def _bounded(op: str, left: Any, right: Any) -> bool:
+    """Check that folding a constant operation cannot build an arbitrarily large value."""
+    if op in ('**', '<<'):
+        return not isinstance(right, int) or abs(right) <= 64
+    if op == '*':
+        return not isinstance(left, (str, bytes)) and not isinstance(right, (str, bytes))
+    return True
+
+def _offset(node: Node, offset: int) -> Node:
+    """Build node + offset in canonical form."""
+    if offset == 0:
+        return node
+    return BinOp('+', node, Const(offset)) if offset > 0 else BinOp('-', node, Const(-offset))
+
+def _simplify_binop(node: BinOp, integral: bool) -> Node:
+    op, left, right = node.op, node.left, node.right
+    if isinstance(left, Const) and isinstance(right, Const):
+        folded = _fold(BINARY_OPERATORS[op], left, right) if _bounded(op, left.value, right.value) else None
+        return folded if folded is not None else node
+    if not integral:
+        return node
+    # Identities: e + 0, e - 0, e * 1, e ** 1, 0 + e, 1 * e
+    if ((op in ('+', '-') and _is_int(right, 0)) or (op in ('*', '**') and _is_int(right, 1))) and _int_valued(left):
+        return left
+    if ((op == '+' and _is_int(left, 0)) or (op == '*' and _is_int(left, 1))) and _int_valued(right):
+        return right
+    # Reassociation of int constants: (e + 1) - 1 -> e, (e * 2) * 3 -> e * 6
+    if isinstance(left, BinOp) and _is_int(left.right) and _is_int(right) and _int_valued(left.left):
+        inner, outer = left.right.value, right.value
+        if op in ('+', '-') and left.op in ('+', '-'):
+            offset = (inner if left.op == '+' else -inner) + (outer if op == '+' else -outer)
+            return _offset(left.left, offset)
+        if op == '*' and left.op == '*' and (_is_power_of_two(inner) or _is_power_of_two(outer)):
+            return _simplify_binop(BinOp('*', left.left, Const(inner * outer)), integral)
+    return node
+
+def _simplify_unary(node: UnaryOp, integral: bool) -> Node:
+    operand = node.operand
+    if isinstance(operand, Const):
+        folded = _fold(UNARY_OPERATORS[node.op], operand)
+        return folded if folded is not None else node
+    if not integral or not _int_valued(operand):
+        return node
+    if node.op == '+':
+        return operand
+    # -(-e) -> e, ~(~e) -> e
+    if isinstance(operand, UnaryOp) and operand.op == node.op and node.op in ('-', '~'):
+        return operand.operand
+    return node
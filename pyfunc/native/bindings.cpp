@@ -5,6 +5,24 @@
 
 namespace py = pybind11;
 
+// Request a one-dimensional, C-contiguous float64 buffer (array.array('d'), memoryview, NumPy array)
+static py::buffer_info float64_buffer(const py::buffer& data, bool writable = false) {
+    py::buffer_info info = data.request(writable);
+    if (info.ndim != 1 || info.format != py::format_descriptor<double>::format()
+            || (info.shape[0] > 1 && info.strides[0] != static_cast<py::ssize_t>(sizeof(double)))) {
+        throw py::type_error("expected a contiguous one-dimensional float64 buffer");
+    }
+    return info;
+}
+
+static const double* elements(const py::buffer_info& info) {
+    return static_cast<const double*>(info.ptr);
+}
+
+static size_t length(const py::buffer_info& info) {
+    return static_cast<size_t>(info.shape[0]);
+}
+
 PYBIND11_MODULE(pyfunc_native, m) {
     m.doc() = "PyFunc C++ backend for high-performance operations";
     
@@ -99,4 +117,62 @@ PYBIND11_MODULE(pyfunc_native, m) {
     m.def("count_operation", &pyfunc::Operations::count_operation,
           "Count elements in the data",
           py::arg("data"));
+    
+    // Buffer operations: float64 buffers are read in place, without the GIL
+    m.def("map_buffer", [](py::buffer data, const std::string& op_code, py::buffer out) {
+        py::buffer_info in = float64_buffer(data);
+        py::buffer_info result = float64_buffer(out, true);
+        if (length(result) < length(in)) {
+            throw py::value_error("output buffer is shorter than the input");
+        }
+        py::gil_scoped_release release;
+        pyfunc::Operations::map_into(elements(in), length(in), op_code, static_cast<double*>(result.ptr));
+    }, "Apply a map operation to a float64 buffer, writing the results into out",
+          py::arg("data"), py::arg("op_code"), py::arg("out"));
+    
+    m.def("filter_buffer", [](py::buffer data, const std::string& op_code, py::buffer out) {
+        py::buffer_info in = float64_buffer(data);
+        py::buffer_info result = float64_buffer(out, true);
+        if (length(result) < length(in)) {
+            throw py::value_error("output buffer is shorter than the input");
+        }
+        py::gil_scoped_release release;
+        return pyfunc::Operations::filter_into(elements(in), length(in), op_code, static_cast<double*>(result.ptr));
+    }, "Copy the elements of a float64 buffer passing a filter into out; returns how many were kept",
+          py::arg("data"), py::arg("op_code"), py::arg("out"));
+    
+    m.def("reduce_buffer", [](py::buffer data, const std::string& op_code) {
+        py::buffer_info in = float64_buffer(data);
+        py::gil_scoped_release release;
+        return pyfunc::Operations::reduce_span(elements(in), length(in), op_code);
+    }, "Apply a reduce operation to a float64 buffer",
+          py::arg("data"), py::arg("op_code"));
+    
+    m.def("reduce_buffer_with_init", [](py::buffer data, const std::string& op_code, double initializer) {
+        py::buffer_info in = float64_buffer(data);
+        py::gil_scoped_release release;
+        return pyfunc::Operations::reduce_span_with_init(elements(in), length(in), op_code, initializer);
+    }, "Apply a reduce operation with initial value to a float64 buffer",
+          py::arg("data"), py::arg("op_code"), py::arg("initializer"));
+    
+    m.def("sum_buffer", [](py::buffer data) {
+        py::buffer_info in = float64_buffer(data);
+        py::gil_scoped_release release;
+        return pyfunc::Operations::sum_span(elements(in), length(in));
+    }, "Sum the elements of a float64 buffer",
+          py::arg("data"));
+    
+    m.def("min_buffer", [](py::buffer data) {
+        py::buffer_info in = float64_buffer(data);
+        py::gil_scoped_release release;
+        return pyfunc::Operations::min_span(elements(in), length(in));
+    }, "Find the minimum element of a float64 buffer",
+          py::arg("data"));
+    
+    m.def("max_buffer", [](py::buffer data) {
+        py::buffer_info in = float64_buffer(data);
+        py::gil_scoped_release release;
+        return pyfunc::Operations::max_span(elements(in), length(in));
+    }, "Find the maximum element of a float64 buffer",
+          py::arg("data"));
 }
\ No newline at end of file
@@ -258,6 +258,68 @@ size_t Operations::count_operation(const NumberVector& data) {
     return data.size();
 }
 
+// Buffer operations
+void Operations::map_into(const double* data, size_t size, const std::string& op_code, double* out) {
+    Operation op(op_code);
+    auto map_func = create_map_function(op);
+    
+    for (size_t i = 0; i < size; ++i) {
+        out[i] = map_func(data[i]);
+    }
+}
+
+size_t Operations::filter_into(const double* data, size_t size, const std::string& op_code, double* out) {
+    Operation op(op_code);
+    auto filter_func = create_filter_function(op);
+    
+    size_t kept = 0;
+    for (size_t i = 0; i < size; ++i) {
+        if (filter_func(data[i])) {
+            out[kept++] = data[i];
+        }
+    }
+    
+    return kept;
+}
+
+double Operations::reduce_span(const double* data, size_t size, const std::string& op_code) {
+    if (size == 0) {
+        throw std::runtime_error("Cannot reduce empty sequence");
+    }
+    
+    return reduce_span_with_init(data + 1, size - 1, op_code, data[0]);
+}
+
+double Operations::reduce_span_with_init(const double* data, size_t size, const std::string& op_code, double init) {
+    Operation op(op_code);
+    auto reduce_func = create_reduce_function(op);
+    
+    double result = init;
+    for (size_t i = 0; i < size; ++i) {
+        result = reduce_func(result, data[i]);
+    }
+    
+    return result;
+}
+
+double Operations::sum_span(const double* data, size_t size) {
+    return std::accumulate(data, data + size, 0.0);
+}
+
+double Operations::min_span(const double* data, size_t size) {
+    if (size == 0) {
+        throw std::runtime_error("Cannot find min of empty sequence");
+    }
+    return *std::min_element(data, data + size);
+}
+
+double Operations::max_span(const double* data, size_t size) {
+    if (size == 0) {
+        throw std::runtime_error("Cannot find max of empty sequence");
+    }
+    return *std::max_element(data, data + size);
+}
+
 // Helper functions
 std::function<double(double)> Operations::create_map_function(const Operation& op) {
     switch (op.type) {
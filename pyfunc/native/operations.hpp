@@ -72,6 +72,15 @@ public:
     static double max_operation(const NumberVector& data);
     static size_t count_operation(const NumberVector& data);
     
+    // Contiguous buffer variants: data points to size doubles, read in place
+    static void map_into(const double* data, size_t size, const std::string& op_code, double* out);
+    static size_t filter_into(const double* data, size_t size, const std::string& op_code, double* out);
+    static double reduce_span(const double* data, size_t size, const std::string& op_code);
+    static double reduce_span_with_init(const double* data, size_t size, const std::string& op_code, double init);
+    static double sum_span(const double* data, size_t size);
+    static double min_span(const double* data, size_t size);
+    static double max_span(const double* data, size_t size);
+    
 private:
     // Helper functions
     static std::function<double(double)> create_map_function(const Operation& op);
@@ -1,36 +1,63 @@
+use pyo3::buffer::PyBuffer;
 use pyo3::prelude::*;
 use pyo3::wrap_pyfunction;
 
-#[pyfunction]
-fn median(mut data: Vec<f64>) -> PyResult<f64> {
-    if data.is_empty() {
-        return Err(pyo3::exceptions::PyValueError::new_err("median() arg is an empty sequence"));
+/// Runs `f` over the values of `data`. A contiguous float64 buffer (array.array('d'),
+/// memoryview, NumPy array) is read in place; any other sequence of numbers is copied
+/// into a Vec first.
+fn with_values<R>(data: &PyAny, f: impl FnOnce(&[f64]) -> PyResult<R>) -> PyResult<R> {
+    if let Ok(buffer) = PyBuffer::<f64>::get(data) {
+        if buffer.dimensions() == 1 && buffer.is_c_contiguous() {
+            let count = buffer.item_count();
+            let values: &[f64] = if count == 0 {
+                &[]
+            } else {
+                // The buffer stays exported, so its memory stays valid, until it is dropped after f returns
+                unsafe { std::slice::from_raw_parts(buffer.buf_ptr() as *const f64, count) }
+            };
+            return f(values);
+        }
     }
+    let values: Vec<f64> = data.extract()?;
+    f(&values)
+}
+
+#[pyfunction]
+fn median(data: &PyAny) -> PyResult<f64> {
+    with_values(data, |values| {
+        if values.is_empty() {
+            return Err(pyo3::exceptions::PyValueError::new_err("median() arg is an empty sequence"));
+        }
 
-    data.sort_by(|a, b| a.partial_cmp(b).unwrap());
+        // Sort a private copy; the caller's buffer is left untouched
+        let mut sorted = values.to_vec();
+        sorted.sort_by(|a, b| a.partial_cmp(b).unwrap());
 
-    let mid = data.len() / 2;
-    if data.len() % 2 == 0 {
-        Ok((data[mid - 1] + data[mid]) / 2.0)
-    } else {
-        Ok(data[mid])
-    }
+        let mid = sorted.len() / 2;
+        if sorted.len() % 2 == 0 {
+            Ok((sorted[mid - 1] + sorted[mid]) / 2.0)
+        } else {
+            Ok(sorted[mid])
+        }
+    })
 }
 
 #[pyfunction]
-fn stdev(data: Vec<f64>) -> PyResult<f64> {
-    let n = data.len();
-    if n < 2 {
-        return Err(pyo3::exceptions::PyValueError::new_err("stdev() requires at least two data points"));
-    }
+fn stdev(data: &PyAny) -> PyResult<f64> {
+    with_values(data, |values| {
+        let n = values.len();
+        if n < 2 {
+            return Err(pyo3::exceptions::PyValueError::new_err("stdev() requires at least two data points"));
+        }
 
-    let mean = data.iter().sum::<f64>() / n as f64;
-    let variance = data.iter().map(|value| {
-        let diff = mean - value;
-        diff * diff
-    }).sum::<f64>() / n as f64;
+        let mean = values.iter().sum::<f64>() / n as f64;
+        let variance = values.iter().map(|value| {
+            let diff = mean - value;
+            diff * diff
+        }).sum::<f64>() / n as f64;
 
-    Ok(variance.sqrt())
+        Ok(variance.sqrt())
+    })
 }
 
 #[pymodule]
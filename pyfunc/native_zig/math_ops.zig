@@ -18,6 +18,88 @@ export fn zig_sum_i32(data: [*]i32, size: usize) i64 {
     return sum;
 }
 
+// int64/uint64 kernels flag overflow instead of silently wrapping or truncating
+export fn zig_sum_i64(data: [*]i64, size: usize, overflow: *bool) i64 {
+    var sum: i64 = 0;
+    var overflowed = false;
+    for (0..size) |i| {
+        const result = @addWithOverflow(sum, data[i]);
+        sum = result[0];
+        overflowed = overflowed or result[1] != 0;
+    }
+    overflow.* = overflowed;
+    return sum;
+}
+
+export fn zig_sum_u64(data: [*]u64, size: usize, overflow: *bool) u64 {
+    var sum: u64 = 0;
+    var overflowed = false;
+    for (0..size) |i| {
+        const result = @addWithOverflow(sum, data[i]);
+        sum = result[0];
+        overflowed = overflowed or result[1] != 0;
+    }
+    overflow.* = overflowed;
+    return sum;
+}
+
+export fn zig_min_i64(data: [*]i64, size: usize) i64 {
+    if (size == 0) return 0;
+    var min_val = data[0];
+    for (1..size) |i| {
+        min_val = @min(min_val, data[i]);
+    }
+    return min_val;
+}
+
+export fn zig_max_i64(data: [*]i64, size: usize) i64 {
+    if (size == 0) return 0;
+    var max_val = data[0];
+    for (1..size) |i| {
+        max_val = @max(max_val, data[i]);
+    }
+    return max_val;
+}
+
+export fn zig_min_u64(data: [*]u64, size: usize) u64 {
+    if (size == 0) return 0;
+    var min_val = data[0];
+    for (1..size) |i| {
+        min_val = @min(min_val, data[i]);
+    }
+    return min_val;
+}
+
+export fn zig_max_u64(data: [*]u64, size: usize) u64 {
+    if (size == 0) return 0;
+    var max_val = data[0];
+    for (1..size) |i| {
+        max_val = @max(max_val, data[i]);
+    }
+    return max_val;
+}
+
+// In-place int64 maps; return true if any element overflowed
+export fn zig_map_add_i64(data: [*]i64, size: usize, addend: i64) bool {
+    var overflowed = false;
+    for (0..size) |i| {
+        const result = @addWithOverflow(data[i], addend);
+        data[i] = result[0];
+        overflowed = overflowed or result[1] != 0;
+    }
+    return overflowed;
+}
+
+export fn zig_map_multiply_i64(data: [*]i64, size: usize, multiplier: i64) bool {
+    var overflowed = false;
+    for (0..size) |i| {
+        const result = @mulWithOverflow(data[i], multiplier);
+        data[i] = result[0];
+        overflowed = overflowed or result[1] != 0;
+    }
+    return overflowed;
+}
+
 export fn zig_mean_f64(data: [*]f64, size: usize) f64 {
     if (size == 0) return 0.0;
     return zig_sum_f64(data, size) / @as(f64, @floatFromInt(size));
@@ -0,0 +1,253 @@
+"""
+Rule-based optimizer for PyFunc pipeline plans.
+
+optimize() rewrites a stage list into a cheaper equivalent one before it
+runs. Rewrites are applied until none matches:
+
+* filters move ahead of sort/reverse/unique, and ahead of a dictionary
+  template map when the predicate only reads fields the template copies
+  cheaply (the predicate is rewritten onto the input);
+* take() moves ahead of one-to-one stages, adjacent takes merge and
+  skip(a).take(b) becomes take(a + b).skip(a); first() gets a take(1)
+  ahead of the one-to-one stages feeding it;
+* sort() and reverse() are dropped when only map/filter/unique stages
+  and an order-insensitive terminal such as sum, count, min or max
+  follow them.
+
+rewrite_top_k() is separate and always applied because it is exact: a
+sort() directly followed by take(k), first() or last() becomes a bounded
+heap selection or a single min/max pass.
+
+The optimize() rewrites assume that stage functions are pure and that the pipeline
+is fed an iterable. An element that is filtered out early is never
+mapped, so errors it would have raised in a map disappear. Floating
+point sums can round differently once a sort is dropped.
+"""
+
+from collections.abc import Iterable
+from typing import Any, Callable, Optional
+
+from .errors import PipelineError
+from .expr import ARG, Arg, Call, Const, Item, Node, simplify
+from .placeholder import Placeholder
+from .plan import Stage
+
+# Stages producing exactly one output element per input element, in order
+ONE_TO_ONE_OPS = frozenset({
+    'map', 'map_cpp', 'starmap',
+    'bitwise_and', 'bitwise_or', 'bitwise_xor', 'bitwise_not', 'left_shift', 'right_shift',
+    'bitwise_and_go', 'bitwise_or_go', 'bitwise_xor_go', 'bitwise_not_go', 'left_shift_go', 'right_shift_go',
+})
+
+# Terminals whose result does not depend on the order of their input
+ORDER_INSENSITIVE_OPS = frozenset({
+    'sum', 'count', 'min', 'max', 'is_empty', 'median', 'stdev', 'describe',
+    'sum_cpp', 'count_cpp', 'min_cpp', 'max_cpp', 'median_rust', 'stdev_rust',
+    'sum_zig', 'mean_zig', 'stdev_zig',
+})
+
+# Stages that only reorder their input
+_REORDERING_OPS = frozenset({'sort', 'reverse'})
+
+# Stages between a reordering and an order-insensitive terminal that keep the terminal's result
+_ORDER_TRANSPARENT_OPS = frozenset({
+    'map', 'map_cpp', 'par_map', 'starmap', 'filter', 'filter_cpp', 'unique', 'async_boundary', 'prefetch',
+})
+
+# Stages a filter can run ahead of without changing the result
+_FILTER_COMMUTING_OPS = frozenset({'sort', 'reverse', 'unique'})
+
+# Estimated per-element cost of a call into an opaque Python function, in expression nodes
+OPAQUE_COST = 8
+
+# Fraction of elements a filter is assumed to keep when nothing better is known
+ASSUMED_SELECTIVITY = 0.5
+
+# Upper bound on rewrite passes; every rule makes progress, this only guards against surprises
+_MAX_PASSES = 100
+
+def optimize(stages: tuple, make_stage: Callable[..., Stage]) -> tuple:
+    """Rewrite stages into an equivalent, cheaper plan.
+
+    make_stage(op, *args) must build the stage that chaining op(*args) records.
+    """
+    plan = list(stages)
+    for _ in range(_MAX_PASSES):
+        changed = _drop_reorderings(plan)
+        changed = _push_filters(plan, make_stage) or changed
+        changed = _push_limits(plan, make_stage) or changed
+        if not changed:
+            break
+    return tuple(plan)
+
+def expression_cost(func: Any) -> float:
+    """Estimate the per-element cost of a stage function."""
+    if isinstance(func, Placeholder):
+        return _node_cost(simplify(func._node))
+    if isinstance(func, dict):
+        # One unit per entry for building the dictionary
+        return sum(1 + (expression_cost(value) if callable(value) else 0) for value in func.values())
+    return OPAQUE_COST
+
+def _node_cost(node: Node) -> float:
+    if isinstance(node, (Arg, Const)):
+        return 0
+    if isinstance(node, Call) and isinstance(node.func, Const):
+        return OPAQUE_COST + sum(_node_cost(a) for a in node.args)
+    return 1 + sum(_node_cost(child) for child in node.children())
+
+def _is_count(stage: Stage) -> bool:
+    """Check if a take/skip stage has a plain int argument."""
+    return type(stage.args[0]) is int
+
+# --- Rules: each one applies at most one rewrite and reports whether it did ---
+
+def _drop_reorderings(plan: list) -> bool:
+    """Drop sort/reverse when only order-insensitive stages consume their output."""
+    for i, stage in enumerate(plan):
+        if stage.op not in _REORDERING_OPS:
+            continue
+        j = i + 1
+        while j < len(plan) and plan[j].op in _ORDER_TRANSPARENT_OPS:
+            j += 1
+        if j < len(plan) and plan[j].op in ORDER_INSENSITIVE_OPS:
+            del plan[i]
+            return True
+    return False
+
+def _push_filters(plan: list, make_stage: Callable[..., Stage]) -> bool:
+    """Move a filter ahead of the stage before it when that is cheaper."""
+    for i in range(1, len(plan)):
+        stage, previous = plan[i], plan[i - 1]
+        if stage.op != 'filter':
+            continue
+        if previous.op in _FILTER_COMMUTING_OPS:
+            plan[i - 1], plan[i] = stage, previous
+            return True
+        if previous.op == 'map':
+            predicate = _predicate_through_template(previous.args[0], stage.args[0])
+            if predicate is not None:
+                plan[i - 1:i + 1] = [make_stage('filter', predicate), previous]
+                return True
+    return False
+
+def _predicate_through_template(template: Any, predicate: Any) -> Optional[Placeholder]:
+    """Rewrite a predicate over a template map's output into one over its input.
+
+    Returns None when the predicate reads the mapped value as a whole, reads
+    a field the template does not define, or the rewrite is not cheaper.
+    """
+    if not isinstance(template, dict) or not isinstance(predicate, Placeholder):
+        return None
+    reads: list = []
+    if not _field_reads(predicate._node, reads) or not reads:
+        return None
+    mapping = {}
+    for read in reads:
+        key = read.index.value
+        if key not in template:
+            return None
+        value = template[key]
+        if isinstance(value, Placeholder):
+            mapping[read] = value._node
+        elif callable(value):
+            mapping[read] = Call(Const(value), (ARG,))
+        else:
+            mapping[read] = Const(value)
+    fields_cost = sum(_node_cost(node) for node in mapping.values())
+    # Mapping every element then filtering, versus computing the read fields
+    # for every element and the whole template only for the survivors
+    if (1 - ASSUMED_SELECTIVITY) * expression_cost(template) <= fields_cost:
+        return None
+    return Placeholder(node=predicate._node.replace(mapping))
+
+def _field_reads(node: Node, reads: list) -> bool:
+    """Collect _['key'] reads; False if the argument is used any other way."""
+    if isinstance(node, Item) and isinstance(node.obj, Arg) and isinstance(node.index, Const):
+        reads.append(node)
+        return True
+    if isinstance(node, Arg):
+        return False
+    return all(_field_reads(child, reads) for child in node.children())
+
+def _push_limits(plan: list, make_stage: Callable[..., Stage]) -> bool:
+    """Move take() limits towards the source."""
+    for i in range(1, len(plan)):
+        stage, previous = plan[i], plan[i - 1]
+        if stage.op == 'take' and _is_count(stage):
+            if previous.op in ONE_TO_ONE_OPS:
+                plan[i - 1], plan[i] = stage, previous
+                return True
+            if previous.op == 'take' and _is_count(previous):
+                plan[i - 1:i + 1] = [make_stage('take', min(previous.args[0], stage.args[0]))]
+                return True
+            if previous.op == 'skip' and _is_count(previous) and previous.args[0] >= 0 and stage.args[0] >= 0:
+                plan[i - 1:i + 1] = [make_stage('take', previous.args[0] + stage.args[0]), previous]
+                return True
+        if stage.op == 'first':
+            start = i
+            while start > 0 and plan[start - 1].op in ONE_TO_ONE_OPS:
+                start -= 1
+            before = plan[start - 1] if start > 0 else None
+            # A take(1) already in place, or a skip the new limit would be pushed above over and over
+            settled = before is not None and (before.op == 'skip' or (
+                before.op == 'take' and _is_count(before) and before.args[0] <= 1))
+            if start < i and not settled:
+                plan.insert(start, make_stage('take', 1))
+                return True
+    return False
+
+# ======================================================================
+# Top-k selection
+# ======================================================================
+
+def rewrite_top_k(stages: tuple, make_stage: Callable[..., Stage]) -> tuple:
+    """Replace sort() followed by take(k), first() or last() with a selection that avoids the full sort."""
+    plan: list[Stage] = []
+    for stage in stages:
+        previous = plan[-1] if plan else None
+        if previous is not None and previous.op == 'sort':
+            key, reverse = previous.args
+            if stage.op == 'take' and _is_count(stage):
+                plan[-1] = _as_take(make_stage('top_k', stage.args[0], key, reverse))
+                continue
+            if stage.op in ('first', 'last'):
+                plan[-1] = _sorted_end_stage(previous, stage.op == 'last')
+                continue
+        plan.append(stage)
+    return tuple(plan)
+
+def _as_take(top_k_stage: Stage) -> Stage:
+    """Wrap a top_k stage so it returns an iterator like the take() it replaces."""
+    select = top_k_stage.func
+    return Stage(top_k_stage.op, lambda val: iter(select(val)), top_k_stage.args, fn=top_k_stage.fn, hints=top_k_stage.hints)
+
+def _sorted_end_stage(sort_stage: Stage, last: bool) -> Stage:
+    """Build a stage returning the first or last element sort_stage would produce, in one pass."""
+    key = sort_stage.fn
+    reverse = sort_stage.args[1]
+    # sorted() is stable, so first() is the earliest minimum (maximum when reversed)
+    # and last() is the latest maximum (minimum when reversed)
+    pick_max = reverse != last
+
+    def _sorted_end_func(val: Any) -> Any:
+        if not isinstance(val, Iterable) or isinstance(val, (str, bytes)):
+            raise PipelineError("sort() can only be used on iterables.")
+        if not last:
+            select = max if pick_max else min
+            return select(val, key=key, default=None) if key is not None else select(val, default=None)
+        iterator = iter(val)
+        for best in iterator:
+            break
+        else:
+            return None
+        best_key = key(best) if key is not None else best
+        for item in iterator:
+            item_key = key(item) if key is not None else item
+            # Later equal elements win
+            if not (item_key < best_key if pick_max else best_key < item_key):
+                best, best_key = item, item_key
+        return best
+
+    op = 'sort_last' if last else 'sort_first'
+    return Stage(op, _sorted_end_func, sort_stage.args, fn=key)
@@ -0,0 +1,447 @@
+"""
+Parallel execution of element-wise pipeline stages.
+
+parallel_map() splits a stream into chunks and runs them on a thread or
+process pool. Only a bounded number of chunks is in flight at any time,
+which also bounds the reorder buffer in ordered mode. When the consumer
+stops early (e.g. a downstream take()), closing the generator cancels the
+work that has not started yet. Idle workers take the next pending chunk
+from the pool's shared queue; with chunksize='auto' a ChunkSizer sizes the
+chunks from their measured run time.
+
+parallel_reduce() reduces each chunk (partition) on the pool and merges the
+partial results with a caller-supplied associative combine, pairing them
+up as a balanced tree in input order.
+
+In process mode both move numeric chunks to the workers through shared
+memory (see .shared) instead of pickling them, and numeric results back.
+
+threaded_iter() runs the production of a stream on its own thread and
+hands elements over through a bounded queue, so upstream stages overlap
+with downstream ones and a slow consumer throttles the producer.
+"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+import functools
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Generator, Optional, Tuple, Union
+
+from .errors import PipelineError
+from .executors import EXECUTION_MODES, default_workers, executor_config, get_executor, shared_executor
+from .placeholder import Placeholder
+from .shared import MIN_SHARED_ITEMS, SharedArray, SharedBlock, attached, discard, numeric_view, share_result, take
+
+# How process mode moves chunks to workers and results back
+TRANSFER_MODES = ('auto', 'pickle', 'shared_memory')
+
+# Chunks in flight per worker; enough to keep workers busy while results are drained
+IN_FLIGHT_PER_WORKER = 2
+
+# With a known input size, 'auto' keeps chunks below remaining / (workers * this), so chunks
+# shrink towards the end of the input and idle workers find pending work instead of waiting
+_CHUNKS_PER_WORKER = 4
+
+# 'auto' chunk sizes before any chunk has been timed
+_INITIAL_CHUNKSIZE = {'thread': 8, 'process': 32}
+
+# How long 'auto' aims for one chunk to run; processes pay more per task (pickling, IPC)
+_TARGET_CHUNK_SECONDS = {'thread': 0.002, 'process': 0.02}
+
+# Largest chunk 'auto' picks
+_MAX_AUTO_CHUNKSIZE = 1 << 16
+
+# Weight of the newest chunk in the running per-item cost estimate
+_COST_SMOOTHING = 0.3
+
+def borrow_pool(executor: Optional[str], mode: str, workers: Optional[int]) -> Tuple[Executor, str, int]:
+    """The pool a stage runs on, with its mode and worker count.
+
+    A named executor brings its own mode and size; otherwise the shared
+    pool for mode and workers (default: the CPU count) is used.
+    """
+    if executor is None:
+        workers = workers or default_workers()
+        return shared_executor(mode, workers), mode, workers
+    config = executor_config(executor)
+    return get_executor(executor), config.mode, config.max_workers
+
+def validate_options(workers: Any, mode: str, chunksize: Union[int, str], transfer: str = 'auto') -> None:
+    """Raise PipelineError for options parallel_map() does not accept."""
+    if mode not in EXECUTION_MODES:
+        raise PipelineError(f"Unknown execution mode {mode!r}; expected one of {', '.join(EXECUTION_MODES)}")
+    if workers is not None and (type(workers) is not int or workers < 1):
+        raise PipelineError(f"workers must be a positive int, got {workers!r}")
+    if chunksize != 'auto' and (type(chunksize) is not int or chunksize < 1):
+        raise PipelineError(f"chunksize must be a positive int or 'auto', got {chunksize!r}")
+    if transfer not in TRANSFER_MODES:
+        raise PipelineError(f"Unknown transfer mode {transfer!r}; expected one of {', '.join(TRANSFER_MODES)}")
+
+def validate_executor(executor: Any) -> None:
+    """Raise PipelineError unless executor is None or a pool name; the name is looked up at run time."""
+    if executor is not None and not isinstance(executor, str):
+        raise PipelineError(f"executor must be the name of a registered executor, got {executor!r}")
+
+class ChunkSizer:
+    """Chooses chunk sizes for chunksize='auto' from the measured cost of finished chunks.
+
+    Workers time every chunk; the sizer keeps a running per-item cost and
+    sizes the next chunk to take about the mode's target time, so cheap
+    items travel in big chunks and expensive ones in small chunks. When the
+    input size is known, chunks also shrink as the input runs out, so one
+    slow chunk at the end does not keep every other worker idle.
+    """
+
+    def __init__(self, mode: str, workers: int, size: int = -1):
+        self._target = _TARGET_CHUNK_SECONDS[mode]
+        self._workers = workers
+        # Elements not yet handed out, or -1 if unknown
+        self._remaining = size
+        self._size = _INITIAL_CHUNKSIZE[mode]
+        # Running estimate of seconds per element, None before the first measurement
+        self.cost: Optional[float] = None
+
+    def next_size(self) -> int:
+        """Size of the next chunk to hand out."""
+        size = self._size
+        if self._remaining >= 0:
+            size = max(1, min(size, -(-self._remaining // (self._workers * _CHUNKS_PER_WORKER))))
+            self._remaining = max(0, self._remaining - size)
+        return size
+
+    def record(self, items: int, seconds: float) -> None:
+        """Account for a finished chunk of items elements that ran for seconds."""
+        if items <= 0:
+            return
+        cost = seconds / items
+        self.cost = cost if self.cost is None else self.cost + _COST_SMOOTHING * (cost - self.cost)
+        if self.cost > 0:
+            self._size = max(1, min(int(self._target / self.cost), _MAX_AUTO_CHUNKSIZE))
+        else:
+            self._size = _MAX_AUTO_CHUNKSIZE
+
+def _map_chunk(func: Union[Callable[[Any], Any], Placeholder], chunk: list) -> list:
+    """Worker task: apply func to every element of a chunk.
+
+    Process workers receive Placeholders rather than their evaluators; the
+    unpickled Placeholder is cached per process, so it compiles once.
+    """
+    if isinstance(func, Placeholder):
+        func = func._func
+    return [func(item) for item in chunk]
+
+def _reduce_partition(reducer: Union[Callable[[Any, Any], Any], Placeholder], initializer: Any,
+                      partition: list) -> Any:
+    """Worker task: reduce one partition, starting from initializer unless it is None."""
+    if isinstance(reducer, Placeholder):
+        reducer = reducer.as_reducer()
+    if initializer is None:
+        return functools.reduce(reducer, partition)
+    return functools.reduce(reducer, partition, initializer)
+
+def _aggregate_partition(state_type: type, partition: list) -> Any:
+    """Worker task: the aggregate state of one partition."""
+    return state_type.from_iterable(partition)
+
+def reduce_task(reducer: Union[Callable[[Any, Any], Any], Placeholder], initializer: Any = None) -> Callable[[list], Any]:
+    """Picklable parallel_reduce() task reducing a partition with reducer."""
+    return functools.partial(_reduce_partition, reducer, initializer)
+
+def aggregate_task(state_type: type) -> Callable[[list], Any]:
+    """Picklable parallel_reduce() task computing a partition's aggregate state."""
+    return functools.partial(_aggregate_partition, state_type)
+
+def _thread_task(task: Callable[[Any], Any], chunk: list) -> Tuple[Any, float]:
+    """Thread worker entry: run task on a chunk; returns its result and how long it ran."""
+    started = time.perf_counter()
+    result = task(chunk)
+    return result, time.perf_counter() - started
+
+def _process_task(task: Callable[[Any], Any], chunk: Union[list, SharedArray], min_items: int) -> Tuple[Any, float]:
+    """Process worker entry: run task on a pickled or shared chunk; numeric result lists go back shared."""
+    if isinstance(chunk, SharedArray):
+        with attached(chunk) as view:
+            started = time.perf_counter()
+            result = task(view)
+            seconds = time.perf_counter() - started
+    else:
+        started = time.perf_counter()
+        result = task(chunk)
+        seconds = time.perf_counter() - started
+    if type(result) is list:
+        result = share_result(result, min_items)
+    return result, seconds
+
+def _discard_shared_result(future: Future) -> None:
+    """Done callback for abandoned futures: unlink a result block nobody will take()."""
+    if not future.cancelled() and future.exception() is None and isinstance(future.result()[0], SharedArray):
+        discard(future.result()[0])
+
+def _shared_min_items(mode: str, transfer: str) -> Optional[int]:
+    """Smallest chunk moved through shared memory, or None if chunks are always pickled."""
+    if mode != 'process' or transfer == 'pickle':
+        return None
+    return 1 if transfer == 'shared_memory' else MIN_SHARED_ITEMS
+
+class _Submitter:
+    """Submits chunks to a pool and collects their results, in submission order or as they finish.
+
+    With min_items set, numeric chunks of at least that many elements are
+    copied into shared memory blocks, which are released once their chunk
+    is done; numeric results come back the same way. Workers time every
+    chunk and the timings go to sizer, if given.
+    """
+
+    def __init__(self, executor: Executor, task: Callable[[Any], Any], min_items: Optional[int],
+                 sizer: Optional[ChunkSizer] = None):
+        self._executor = executor
+        self._task = task
+        self._min_items = min_items
+        self._sizer = sizer
+        # (future, shared block of the chunk or None, number of elements)
+        self.pending: deque[tuple[Future, Optional[SharedBlock], int]] = deque()
+
+    def submit(self, chunk: Union[list, memoryview]) -> None:
+        if self._min_items is None:
+            self.pending.append((self._executor.submit(_thread_task, self._task, chunk), None, len(chunk)))
+            return
+        block = SharedBlock.of(chunk, self._min_items)
+        payload = block.ref if block is not None else chunk if isinstance(chunk, list) else chunk.tolist()
+        future = self._executor.submit(_process_task, self._task, payload, self._min_items)
+        self.pending.append((future, block, len(chunk)))
+
+    def next_result(self, ordered: bool = True) -> Any:
+        """Wait for the oldest pending chunk (or, unordered, the first to finish) and return its result."""
+        if ordered:
+            entry = self.pending.popleft()
+        else:
+            done, _not_done = wait([entry[0] for entry in self.pending], return_when=FIRST_COMPLETED)
+            finished = done.pop()
+            entry = next(entry for entry in self.pending if entry[0] is finished)
+            self.pending.remove(entry)
+        future, block, items = entry
+        try:
+            result, seconds = future.result()
+        finally:
+            if block is not None:
+                block.release()
+        if self._sizer is not None:
+            self._sizer.record(items, seconds)
+        return take(result) if isinstance(result, SharedArray) else result
+
+    def close(self) -> None:
+        """Cancel what has not started; blocks of chunks still running are unlinked as they finish.
+
+        The pool itself is shared and stays up.
+        """
+        for future, block, _items in self.pending:
+            future.cancel()
+            # Attached workers keep their mapping
+            if block is not None:
+                block.release()
+            if self._min_items is not None:
+                future.add_done_callback(_discard_shared_result)
+        self.pending.clear()
+
+def _slices(view: memoryview, sizes: Callable[[], int]) -> Iterator[memoryview]:
+    start = 0
+    while start < len(view):
+        stop = start + sizes()
+        yield view[start:stop]
+        start = stop
+
+def _chunks(iterable: Iterable[Any], sizes: Callable[[], int],
+            min_items: Optional[int]) -> Iterator[Union[list, memoryview]]:
+    """Split iterable into chunks of sizes() elements each.
+
+    Numeric buffers headed for shared memory are sliced without copying.
+    """
+    view = numeric_view(iterable) if min_items is not None else None
+    if view is not None:
+        return _slices(view, sizes)
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, sizes())), [])
+
+def _chunk_sizes(chunksize: Union[int, str], mode: str, workers: int,
+                 size: int) -> Tuple[Callable[[], int], Optional[ChunkSizer]]:
+    """The chunk size source for a chunksize option, and the ChunkSizer behind 'auto'."""
+    if chunksize == 'auto':
+        sizer = ChunkSizer(mode, workers, size)
+        return sizer.next_size, sizer
+    return (lambda: chunksize), None
+
+def parallel_map(iterable: Iterable[Any], func: Callable[[Any], Any], workers: int, mode: str,
+                 ordered: bool, chunksize: Union[int, str], transfer: str = 'auto',
+                 size: int = -1, pool: Optional[Executor] = None) -> Generator[Any, None, None]:
+    """Yield func(x) for every x, computed on a pool of workers.
+
+    With ordered=True results come out in input order; otherwise each chunk's
+    results are yielded as soon as that chunk finishes. chunksize is a
+    number of elements or 'auto' for a ChunkSizer, which uses size, the
+    input's size hint (-1 if unknown). transfer is one of
+    TRANSFER_MODES and only matters in process mode: 'auto' moves numeric
+    chunks of MIN_SHARED_ITEMS or more through shared memory, 'shared_memory'
+    every numeric chunk and 'pickle' none. pool is the executor to run on,
+    which must match mode and workers; by default the registry's shared pool
+    for them.
+    """
+    min_items = _shared_min_items(mode, transfer)
+    sizes, sizer = _chunk_sizes(chunksize, mode, workers, size)
+    chunks = _chunks(iterable, sizes, min_items)
+    limit = workers * IN_FLIGHT_PER_WORKER
+    pool = pool if pool is not None else shared_executor(mode, workers)
+    tasks = _Submitter(pool, functools.partial(_map_chunk, func), min_items, sizer)
+    try:
+        for chunk in itertools.islice(chunks, limit):
+            tasks.submit(chunk)
+        while tasks.pending:
+            # In ordered mode the reorder buffer is the queue of submitted chunks, at most limit long
+            results = tasks.next_result(ordered)
+            # Refill before yielding so workers stay busy while the consumer runs
+            for chunk in itertools.islice(chunks, 1):
+                tasks.submit(chunk)
+            yield from results
+    finally:
+        # Reached on exhaustion, errors and when the consumer stops early
+        tasks.close()
+
+def parallel_reduce(iterable: Iterable[Any], task: Callable[[list], Any], combine: Callable[[Any, Any], Any],
+                    workers: int, mode: str, chunksize: Union[int, str], default: Any = None,
+                    transfer: str = 'auto', size: int = -1, pool: Optional[Executor] = None) -> Any:
+    """Run task on every chunk of iterable on a pool of workers and combine the partial results.
+
+    combine must be associative; it is always called as combine(left, right)
+    with left covering earlier elements, so it need not be commutative.
+    Partials are combined as a balanced tree while later chunks are still
+    running. Returns default if iterable is empty. task must be picklable in
+    process mode, e.g. a functools.partial of a module-level function; it
+    may be given a memoryview instead of a list when transfer allows
+    shared memory. chunksize, transfer, size and pool are as for parallel_map().
+    """
+    min_items = _shared_min_items(mode, transfer)
+    sizes, sizer = _chunk_sizes(chunksize, mode, workers, size)
+    chunks = _chunks(iterable, sizes, min_items)
+    limit = workers * IN_FLIGHT_PER_WORKER
+    pool = pool if pool is not None else shared_executor(mode, workers)
+    tasks = _Submitter(pool, task, min_items, sizer)
+    # (number of chunks covered, partial result); the counts are decreasing powers
+    # of two, like the set bits of a binary counter of the chunks seen so far
+    merged: list[tuple[int, Any]] = []
+    try:
+        for chunk in itertools.islice(chunks, limit):
+            tasks.submit(chunk)
+        while tasks.pending:
+            partial = tasks.next_result()
+            for chunk in itertools.islice(chunks, 1):
+                tasks.submit(chunk)
+            span = 1
+            while merged and merged[-1][0] == span:
+                left_span, left = merged.pop()
+                partial = combine(left, partial)
+                span += left_span
+            merged.append((span, partial))
+    finally:
+        tasks.close()
+    if not merged:
+        return default
+    result = merged[0][1]
+    for _span, partial in merged[1:]:
+        result = combine(result, partial)
+    return result
+
+# Marks the end of a threaded_iter() stream in its queue
+_DONE = object()
+
+# Seconds between checks for a stopped consumer while a producer waits on a full queue
+_STOP_POLL_INTERVAL = 0.05
+
+class _Failure:
+    """Carries an exception raised by a threaded_iter() producer to the consumer."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+class PrefetchStats:
+    """Counters a threaded_iter() consumer fills in while it runs.
+
+    stalls is how many times the consumer found the buffer empty and had to
+    wait for the producer, and stall_time the seconds it spent waiting. Many
+    stalls mean the producer is the bottleneck; none mean a smaller buffer
+    would do.
+    """
+
+    __slots__ = ('items', 'stalls', 'stall_time')
+
+    def __init__(self):
+        self.items = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+
+    def __repr__(self) -> str:
+        return f"PrefetchStats(items={self.items}, stalls={self.stalls}, stall_time={self.stall_time:.6f})"
+
+def threaded_iter(iterable: Iterable[Any], maxsize: int,
+                  stats: Optional[PrefetchStats] = None) -> Generator[Any, None, None]:
+    """Yield the elements of iterable, produced on a separate thread at most maxsize ahead.
+
+    The producer thread starts with the first next() call. Exceptions it
+    raises are re-raised in the consumer. When the consumer stops early the
+    producer finishes the element it is working on, closes the upstream
+    iterator and exits; the consumer does not wait for it. stats, if given,
+    counts the elements handed out and the waits for an empty buffer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        # Waits in slices so that a producer blocked on a full queue notices the consumer has gone
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_STOP_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as error:
+            put(_Failure(error))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=produce, name='pyfunc-boundary', daemon=True).start()
+    try:
+        while True:
+            if stats is None:
+                item = buffer.get()
+            else:
+                try:
+                    item = buffer.get_nowait()
+                except queue.Empty:
+                    stats.stalls += 1
+                    started = time.perf_counter()
+                    item = buffer.get()
+                    stats.stall_time += time.perf_counter() - started
+            if item is _DONE:
+                return
+            if type(item) is _Failure:
+                raise item.error
+            if stats is not None:
+                stats.items += 1
+            yield item
+    finally:
+        stop.set()
@@ -1,14 +1,28 @@
-from collections.abc import Iterable, Callable, Generator
+from collections import deque
+from collections.abc import Iterable, Callable, Generator, Reversible
 import copy
-from functools import reduce
+from functools import lru_cache, reduce
+import heapq
 import itertools
+import math
+import operator
 import os
+import pickle
 from typing import TypeVar, Generic, Any, Optional, cast, Union
 
 from .errors import PipelineError
-from .placeholder import Placeholder
+from .placeholder import PICKLE_VERSION, Placeholder
+from .aggregates import (STATISTICS_AGGREGATES, Aggregate, aggregate_factory, from_statistics, infer_combiner,
+                         merge_states)
+from .plan import Stage, execute, fuse_stages, size_hint
+from .codegen import compile_stages
+from .parallel import (PrefetchStats, aggregate_task, borrow_pool, parallel_map, parallel_reduce, reduce_task,
+                       threaded_iter, validate_executor, validate_options)
+from .optimizer import optimize, rewrite_top_k
 from .backends import get_backend
-from .statistics import median, stdev
+from .backends.buffers import float64_buffer, is_integral, numeric_view
+from .backends.streaming import fold_chunks, iter_chunks, map_chunks
+from .statistics import median, merge_moments, moments, quantile, stdev, stdev_from_moments, summary
 from . import bitwise as python_bitwise
 
 # Conditional import for C++ backend
@@ -31,6 +45,73 @@ else:
 T = TypeVar('T')
 U = TypeVar('U')
 
+# Sentinel for "no element" where None is a valid element
+_MISSING = object()
+
+# Containers whose len() is the number of elements iteration yields
+_SIZED_TYPES = (list, tuple, range, dict, set, frozenset)
+
+def _in_memory(val: Iterable[Any]) -> bool:
+    """Check if val is a list, tuple or numeric buffer, which backends take whole rather than as a stream.
+
+    Numeric buffers (array.array, memoryview, NumPy arrays) reach the
+    native kernels without being copied into a list.
+    """
+    return isinstance(val, (list, tuple)) or numeric_view(val) is not None
+
+def _as_sequence(val: Iterable[Any]) -> Iterable[Any]:
+    """Return val itself if it is a list, tuple or numeric buffer, otherwise a list of its elements."""
+    return val if _in_memory(val) else list(val)
+
+def _for_backends(val: Iterable[Any], operation: str, func: Any = None) -> Iterable[Any]:
+    """Materialize a stream only if a native backend might take the operation; Python paths stream.
+
+    Used by operations that need all of their input at once; the stream's
+    size hint is checked against backend thresholds. func is the stage's
+    function, for operations the C++ backend only runs for some functions.
+    """
+    if _in_memory(val):
+        return val
+    if not get_backend().may_accelerate(operation, size_hint(val), func):
+        return val
+    return list(val)
+
+def _rust_values(data: Iterable[Any]) -> Any:
+    """Input for the Rust kernels: a float64 buffer where there is one (see float64_buffer), else a list of floats."""
+    buffer = float64_buffer(data)
+    return buffer if buffer is not None else [float(x) for x in data]
+
+def _chunk_kernel(val: Iterable[Any], operation: str, *args: Any) -> Optional[Callable[[list], Any]]:
+    """Native per-chunk kernel for a stream that a native backend could take, or None.
+
+    Lists, tuples and numeric buffers always get None: they go to the backends whole.
+    """
+    if _in_memory(val):
+        return None
+    return get_backend().chunk_kernel(operation, *args, size=size_hint(val))
+
+def _sliding_windows(val: Iterable[Any], size: int, step: int) -> Generator[list, None, None]:
+    """Yield lists of size consecutive elements, step apart, holding only one window in memory."""
+    iterator = iter(val)
+    window = deque(itertools.islice(iterator, size), maxlen=size)
+    if len(window) < size:
+        return
+    yield list(window)
+    while True:
+        # The deque drops the step oldest elements; when step > size that skips the gap too
+        added = 0
+        for item in itertools.islice(iterator, step):
+            window.append(item)
+            added += 1
+        if added < step:
+            return
+        yield list(window)
+
+def _check_width(operation: str, name: str, value: int) -> None:
+    """Reject window sizes and steps below 1, whichever path the input takes."""
+    if value < 1:
+        raise ValueError(f"{operation}() {name} must be at least 1, got {value!r}")
+
 # ======================================================================
 # The Complete and Corrected Pipeline Class
 # ======================================================================
@@ -57,31 +138,117 @@ class Pipeline(Generic[T]):
         """Create a Pipeline from any iterable (tuple, set, generator, etc)."""
         return cast('Pipeline[Generator[T, None, None]]', cls(initial_value=iter(iterable)))
 
-    def __init__(self, initial_value: Any = None, _pipeline_func: Optional[Callable[[Any], Any]] = None):
+    def __init__(self, initial_value: Any = None, _pipeline_func: Optional[Callable[[Any], Any]] = None,
+                 _stages: tuple = (), _options: Optional[dict[str, Any]] = None):
         # _initial_value is the starting value for the pipeline when .get() is called
         self._initial_value = initial_value
-        # _pipeline_func is the accumulated function representing all chained operations
-        self._pipeline_func: Callable[[Any], Any] = _pipeline_func if _pipeline_func is not None else (lambda x: x)
+        # _stages is the logical plan: one Stage per chained operation, run in order by .get()
+        self._stages: tuple = _stages
+        if _pipeline_func is not None:
+            # A pre-built function replaces everything recorded so far
+            self._stages = (Stage('custom', _pipeline_func, fn=_pipeline_func),)
+        # _options holds execution settings shared by every pipeline chained from this one
+        self._options: dict[str, Any] = _options if _options is not None else {}
+        # _plan caches the stages that actually run once fusion has been applied
+        self._plan: Optional[tuple] = None
+        # _compiled caches the generated function returned by .compile()
+        self._compiled: Optional[Callable[[Any], Any]] = None
 
     def __repr__(self) -> str:
         """Representation for easier debugging."""
-        return f"Pipeline(initial_value={repr(self._initial_value)}, func={self._pipeline_func.__name__ if hasattr(self._pipeline_func, '__name__') else 'lambda'})"
+        plan = ' -> '.join(repr(stage) for stage in self._stages) or 'identity'
+        return f"Pipeline(initial_value={repr(self._initial_value)}, stages={plan})"
+
+    def __reduce__(self) -> tuple:
+        """Pickle as the recorded (op, args) calls, replayed when unpickled.
+
+        Stage functions are closures and cannot be pickled; the arguments
+        each method was called with (Placeholders, named functions, constants)
+        can. The initial value is pickled separately from the plan so that
+        restored plans can be cached by their bytes.
+        """
+        calls = tuple((stage.op, (stage.fn,) if stage.op == 'custom' else stage.args) for stage in self._stages)
+        return _restore_pipeline, (PICKLE_VERSION, pickle.dumps((calls, self._options)), self._initial_value)
+
+    @property
+    def stages(self) -> tuple:
+        """The recorded stages of this pipeline, in execution order."""
+        return self._stages
+
+    @property
+    def _pipeline_func(self) -> Callable[[Any], Any]:
+        """The accumulated function representing all chained operations."""
+        stages = self._physical_stages()
+        return lambda x: execute(stages, x)
+
+    def _optimized_stages(self) -> tuple:
+        """The recorded stages, rewritten by the plan optimizer when it is enabled and with top-k selections applied."""
+        stages = self._stages
+        if self._options.get('optimize', False):
+            stages = optimize(stages, self._make_stage)
+        return rewrite_top_k(stages, self._make_stage)
+
+    def _physical_stages(self) -> tuple:
+        """The stages that run on .get(), optimized and with element-wise runs fused when enabled."""
+        if self._plan is None:
+            stages = self._optimized_stages()
+            if self._options.get('fuse', True):
+                stages = fuse_stages(stages)
+            self._plan = stages
+        return self._plan
+
+    def _add_stage(self, op: str, func: Callable[[Any], Any], *args: Any,
+                   fn: Optional[Callable[..., Any]] = None, backends: tuple = ()) -> 'Pipeline[Any]':
+        """Return a new Pipeline with one more stage appended to the plan."""
+        stage = Stage(op, func, args, fn, {'backends': backends} if backends else None)
+        return Pipeline(self._initial_value, _stages=self._stages + (stage,), _options=self._options)
+
+    @staticmethod
+    def _make_stage(op: str, *args: Any) -> Stage:
+        """Build the stage that chaining op(*args) records; used by plan rewrites."""
+        return getattr(Pipeline(), op)(*args)._stages[-1]
+
+    def _with_options(self, **options: Any) -> 'Pipeline[T]':
+        """Return a new Pipeline with the same stages and updated execution options."""
+        return Pipeline(self._initial_value, _stages=self._stages, _options={**self._options, **options})
 
     def get(self) -> Any:
         """Get the current value from the pipeline by applying all accumulated functions."""
-        return self._pipeline_func(self._initial_value)
+        return execute(self._physical_stages(), self._initial_value)
 
     def clone(self) -> 'Pipeline[T]':
         """Return a new Pipeline with the same initial value and accumulated function."""
-        return Pipeline(copy.deepcopy(self._initial_value), self._pipeline_func)
+        return Pipeline(copy.deepcopy(self._initial_value), _stages=self._stages, _options=self._options)
+
+    def compile(self) -> Callable[[Any], Any]:
+        """Compile the pipeline into one generated Python function that behaves like calling the pipeline."""
+        if self._compiled is None:
+            self._compiled = compile_stages(self._optimized_stages())
+        return self._compiled
+
+    def fuse(self, enabled: bool = True) -> 'Pipeline[T]':
+        """Enable or disable fusing consecutive map/filter/take/skip stages into one C-level iterator chain."""
+        return self._with_options(fuse=enabled)
+
+    def optimize(self, enabled: bool = True) -> 'Pipeline[T]':
+        """Enable or disable rewriting the plan before it runs (filter and limit pushdown, dropping redundant sorts).
+
+        The optimizer assumes stage functions are pure; see pyfunc.optimizer for the rewrites it applies.
+        """
+        return self._with_options(optimize=enabled)
+
+    def explain(self) -> str:
+        """Describe the recorded plan and the plan that actually runs."""
+        recorded = ' -> '.join(repr(stage) for stage in self._stages) or 'identity'
+        physical = ' -> '.join(repr(stage) for stage in self._physical_stages()) or 'identity'
+        return f"recorded: {recorded}\nexecuted: {physical}"
 
     # --- Core Methods ---
 
     def apply(self, func: Callable[[Any], U]) -> 'Pipeline[U]':
         """Apply func to the value (or map over iterable). Chainable."""
         executable = self._unwrap(func)
-        new_pipeline_func = lambda x: executable(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('apply', executable, func, fn=executable)
 
     def then(self, func: Callable[[Any], U]) -> 'Pipeline[U]':
         """Alias for apply method for chaining operations."""
@@ -91,6 +258,13 @@ class Pipeline(Generic[T]):
         """Map a function over elements with optional C++ acceleration."""
         def _map_func(val: Any) -> Generator[U, None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                kernel = _chunk_kernel(val, 'map', func)
+                if kernel is not None:
+                    # Streams run through the C++ kernel a chunk at a time
+                    executable = self._unwrap(func)
+                    yield from map_chunks(val, kernel, lambda chunk: map(executable, chunk))
+                    return
+                
                 # Try C++ backend for supported operations
                 backend = get_backend()
                 try:
@@ -107,8 +281,77 @@ class Pipeline(Generic[T]):
             else:
                 executable = self._unwrap(func)
                 yield executable(val)
-        new_pipeline_func = lambda x: _map_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('map', _map_func, func, fn=self._executable_or_none(func), backends=('cpp',))
+
+    def par_map(self, func: Callable[[Any], U], workers: Optional[int] = None, mode: str = 'thread',
+                ordered: bool = True, chunksize: Union[int, str] = 'auto',
+                transfer: str = 'auto', executor: Optional[str] = None) -> 'Pipeline[Generator[U, None, None]]':
+        """Map a function over elements on a pool of workers.
+
+        mode is 'thread' or 'process' (func must then be picklable); workers
+        defaults to the CPU count. Elements are sent to workers in chunks of
+        chunksize; 'auto' times chunks as they finish and sizes later ones to
+        the measured per-element cost, shrinking them towards the end of
+        inputs of known size so no worker idles behind a slow chunk. With
+        ordered=False results are yielded as soon as their chunk is done.
+        Outstanding work is cancelled when downstream stops pulling, e.g.
+        after a take(). In process mode, transfer='auto' moves large chunks
+        of floats or ints (and array.array or other numeric buffer inputs)
+        through shared memory instead of pickling them; 'shared_memory' does
+        so for every numeric chunk and 'pickle' never.
+
+        Workers come from a pool kept warm across runs, shared by stages with
+        the same mode and workers. executor names a pool declared with
+        pyfunc.register_executor() instead, whose mode and size then apply.
+        """
+        validate_options(workers, mode, chunksize, transfer)
+        validate_executor(executor)
+        executable = self._unwrap(func)
+        def _par_map_func(val: Any) -> Generator[U, None, None]:
+            if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                pool, pool_mode, pool_workers = borrow_pool(executor, mode, workers)
+                # Placeholder evaluators are closures; processes get the picklable expression instead
+                task = func if pool_mode == 'process' and isinstance(func, Placeholder) else executable
+                yield from parallel_map(val, task, pool_workers, pool_mode, ordered, chunksize, transfer,
+                                        size_hint(val), pool)
+            else:
+                yield executable(val)
+        return self._add_stage('par_map', _par_map_func, func, workers, mode, ordered, chunksize, transfer, executor,
+                               fn=executable)
+
+    def async_boundary(self, maxsize: int = 1024) -> 'Pipeline[Generator[T, None, None]]':
+        """Run the stages before this point on their own thread, connected to the rest by a bounded queue.
+
+        The producing thread runs at most maxsize elements ahead, so a slow
+        consumer throttles it and memory stays bounded. Each boundary adds a
+        thread: read().async_boundary().map(parse).async_boundary().map(write)
+        runs reading, parsing and writing concurrently. Stages that release
+        the GIL (native kernels, I/O) gain the most.
+        """
+        if type(maxsize) is not int or maxsize < 1:
+            raise PipelineError(f"maxsize must be a positive int, got {maxsize!r}")
+        def _async_boundary_func(val: Any) -> Any:
+            if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                return threaded_iter(val, maxsize)
+            return val
+        return self._add_stage('async_boundary', _async_boundary_func, maxsize)
+
+    def prefetch(self, n: int, stats: Optional[PrefetchStats] = None) -> 'Pipeline[Generator[T, None, None]]':
+        """Read up to n elements ahead on a background thread.
+
+        Overlaps a slow source (file reads, decompression, database cursors)
+        with the stages after it. Errors from the source are re-raised when
+        the element would have been read; when downstream stops early (take(),
+        first()) the source is closed. Pass a pyfunc.parallel.PrefetchStats
+        to count how often downstream had to wait for an empty buffer.
+        """
+        if type(n) is not int or n < 1:
+            raise PipelineError(f"prefetch() needs a positive int, got {n!r}")
+        def _prefetch_func(val: Any) -> Any:
+            if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                return threaded_iter(val, n, stats)
+            return val
+        return self._add_stage('prefetch', _prefetch_func, n, stats)
 
     def map_cpp(self, func: Callable[[Any], U]) -> 'Pipeline[Generator[U, None, None]]':
         """Map a function over elements using C++ backend explicitly."""
@@ -132,8 +375,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("map_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _map_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('map_cpp', _map_cpp_func, func, backends=('cpp',))
 
     def pipe(self, *funcs: Callable[[Any], Any]) -> 'Pipeline[Any]':
         """Applies a sequence of functions to the current value in order."""
@@ -143,27 +385,25 @@ class Pipeline(Generic[T]):
                 executable = self._unwrap(f)
                 result = executable(result)
             return result
-        new_pipeline_func = lambda x: chained_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('pipe', chained_func, *funcs)
 
     def compose(self, *funcs: Callable[[Any], Any]) -> 'Pipeline[Any]':
         """Compose multiple functions and apply them as a single transformation."""
         composed = reduce(lambda f, g: lambda x: self._unwrap(f)(self._unwrap(g)(x)), reversed(funcs))
-        new_pipeline_func = lambda x: composed(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('compose', composed, *funcs)
 
     def reduce(self, func: Callable[[Any, Any], U], initializer: Optional[Any] = None) -> 'Pipeline[U]':
         """Apply a function of two arguments cumulatively to the items of an iterable, from left to right, to reduce the iterable to a single value."""
         def _reduce_func(val: Any) -> U:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                # Convert generators/iterators to lists to allow reuse and size checking
-                val_list = list(val)
+                # Streams are only materialized when a native backend might take them
+                data = _for_backends(val, 'reduce', func=func)
                 
                 # Try C++ backend for supported operations
                 backend = get_backend()
                 try:
-                    if backend.should_use_cpp(val_list, 'reduce', func):
-                        return backend.execute_reduce(val_list, func, initializer)
+                    if backend.should_use_cpp(data, 'reduce', func):
+                        return backend.execute_reduce(data, func, initializer)
                 except Exception:
                     # Fall back to Python if C++ fails
                     pass
@@ -176,13 +416,56 @@ class Pipeline(Generic[T]):
                     executable = func
                 
                 if initializer is None:
-                    return reduce(executable, val_list)
+                    return reduce(executable, data)
                 else:
-                    return reduce(executable, val_list, initializer)
+                    return reduce(executable, data, initializer)
             else:
                 raise PipelineError("reduce() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _reduce_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('reduce', _reduce_func, func, initializer, backends=('cpp',))
+
+    def par_reduce(self, func: Union[Callable[[Any, Any], U], type], combine: Optional[Callable[[Any, Any], Any]] = None,
+                   workers: Optional[int] = None, mode: str = 'thread', initializer: Optional[Any] = None,
+                   chunksize: Union[int, str] = 'auto', transfer: str = 'auto',
+                   executor: Optional[str] = None) -> 'Pipeline[U]':
+        """Reduce partitions of the input on a pool of workers and combine the partial results.
+
+        combine merges two partial results and must be associative; it can
+        be left out for _ + _, _ * _, _ & _, _ | _, _ ^ _, min, max and the
+        matching operator functions, which combine with themselves.
+        initializer, if given, starts every partition, so it must be an
+        identity of combine (0 for sums, 1 for products). func may also be an
+        aggregate state class from pyfunc.aggregates such as Mean or
+        Variance; partition states are then merged and the result returned.
+        mode, workers, chunksize (elements per partition), transfer and
+        executor are as for par_map().
+        """
+        validate_options(workers, mode, chunksize, transfer)
+        validate_executor(executor)
+        aggregate = isinstance(func, type) and issubclass(func, Aggregate)
+        if aggregate:
+            task, combiner = aggregate_task(func), merge_states
+        else:
+            combiner = combine if combine is not None else infer_combiner(func)
+            if combiner is None:
+                raise PipelineError("par_reduce() cannot infer how to combine partial results of "
+                                    f"{func!r}; pass combine=")
+            # Placeholders are passed as such and turned into reducers by the workers
+            task = reduce_task(func, initializer)
+        def _par_reduce_func(val: Any) -> U:
+            if not isinstance(val, Iterable) or isinstance(val, (str, bytes)):
+                raise PipelineError("par_reduce() can only be used on iterables (excluding str/bytes).")
+            pool, pool_mode, pool_workers = borrow_pool(executor, mode, workers)
+            result = parallel_reduce(val, task, combiner, pool_workers, pool_mode, chunksize,
+                                     default=_MISSING, transfer=transfer, size=size_hint(val), pool=pool)
+            if aggregate:
+                return (func() if result is _MISSING else result).result()
+            if result is _MISSING:
+                if initializer is None:
+                    raise TypeError("par_reduce() of empty iterable with no initial value")
+                return initializer
+            return result
+        return self._add_stage('par_reduce', _par_reduce_func, func, combine, workers, mode, initializer, chunksize,
+                               transfer, executor)
 
     def reduce_cpp(self, func: Callable[[Any, Any], U], initializer: Optional[Any] = None) -> 'Pipeline[U]':
         """Reduce elements using C++ backend explicitly."""
@@ -206,8 +489,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("reduce_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _reduce_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('reduce_cpp', _reduce_cpp_func, func, initializer, backends=('cpp',))
 
     def reduce_right(self, func: Callable[[Any, Any], U], initializer: Optional[Any] = None) -> 'Pipeline[U]':
         """Apply a function of two arguments cumulatively to the items of an iterable, from right to left, to reduce the iterable to a single value."""
@@ -219,14 +501,14 @@ class Pipeline(Generic[T]):
 
         def _reduce_right_func(val: Any) -> U:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                # Convert to list to allow reverse iteration and indexing
-                val_list = list(val)
+                # Reverse iteration needs a sequence; lists and tuples are used as they are
+                val_list = _as_sequence(val)
                 if initializer is None:
                     # If no initializer, start with the last element
                     if not val_list:
                         raise TypeError("reduce_right() of empty sequence with no initial value")
                     acc = val_list[-1]
-                    items: Iterable[Any] = val_list[-2::-1] # Iterate from second to last to first
+                    items: Iterable[Any] = itertools.islice(reversed(val_list), 1, None) # Iterate from second to last to first
                 else:
                     acc = initializer
                     items = reversed(val_list) # Iterate from last to first
@@ -236,8 +518,7 @@ class Pipeline(Generic[T]):
                 return acc
             else:
                 raise PipelineError("reduce_right() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _reduce_right_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('reduce_right', _reduce_right_func, func, initializer, fn=executable)
 
     # --- Conditional Application ---
 
@@ -250,8 +531,7 @@ class Pipeline(Generic[T]):
             if executable_condition(processed_val):
                 return executable_func(processed_val)
             return processed_val
-        new_pipeline_func = lambda x: _apply_if_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('apply_if', _apply_if_func, condition, func)
 
     def when(self, pred: Callable[[Any], bool], func: Callable[[Any], Any]) -> 'Pipeline[Any]':
         """Apply `func` only if `pred(value)` is True."""
@@ -262,8 +542,7 @@ class Pipeline(Generic[T]):
             if executable_pred(processed_val):
                 return executable_func(processed_val)
             return processed_val
-        new_pipeline_func = lambda x: _when_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('when', _when_func, pred, func)
 
     def unless(self, pred: Callable[[Any], bool], func: Callable[[Any], Any]) -> 'Pipeline[Any]':
         """Apply `func` only if `pred(value)` is False."""
@@ -274,8 +553,7 @@ class Pipeline(Generic[T]):
             if not executable_pred(processed_val):
                 return executable_func(processed_val)
             return processed_val
-        new_pipeline_func = lambda x: _unless_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('unless', _unless_func, pred, func)
 
     def if_else(self, pred: Callable[[Any], bool], then_fn: Callable[[Any], Any], else_fn: Callable[[Any], Any]) -> 'Pipeline[Any]':
         """Apply `then_fn` if `pred(value)` is True, otherwise apply `else_fn`."""
@@ -288,8 +566,7 @@ class Pipeline(Generic[T]):
                 return executable_then_fn(processed_val)
             else:
                 return executable_else_fn(processed_val)
-        new_pipeline_func = lambda x: _if_else_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('if_else', _if_else_func, pred, then_fn, else_fn)
 
     # --- Operator Overloads ---
 
@@ -311,13 +588,19 @@ class Pipeline(Generic[T]):
                     yield (val[i], val[i + 1])
             else:
                 raise PipelineError("pairwise() can only be used on lists.")
-        new_pipeline_func = lambda x: _pairwise_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('pairwise', _pairwise_func)
         
     def filter(self, predicate: Callable[[Any], bool]) -> 'Pipeline[Generator[T, None, None]]':
         """Filter elements of an iterable based on a predicate with optional C++ acceleration."""
         def _filter_func(val: Any) -> Generator[T, None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                kernel = _chunk_kernel(val, 'filter', predicate)
+                if kernel is not None:
+                    # Streams run through the C++ kernel a chunk at a time
+                    executable = self._unwrap(predicate)
+                    yield from map_chunks(val, kernel, lambda chunk: filter(executable, chunk))
+                    return
+                
                 # Try C++ backend for supported operations
                 backend = get_backend()
                 try:
@@ -335,8 +618,7 @@ class Pipeline(Generic[T]):
                         yield v
             else:
                 raise PipelineError("filter() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _filter_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('filter', _filter_func, predicate, fn=self._executable_or_none(predicate), backends=('cpp',))
 
     def filter_cpp(self, predicate: Callable[[Any], bool]) -> 'Pipeline[Generator[T, None, None]]':
         """Filter elements using C++ backend explicitly."""
@@ -347,7 +629,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError("C++ backend not available")
                 
                 # Convert to list if it's a generator
-                val_list = list(val) if hasattr(val, '__iter__') and not isinstance(val, (list, tuple)) else val
+                val_list = _as_sequence(val)
                 
                 if not backend.cpp_backend.supports_operation('filter', predicate):
                     raise PipelineError(f"C++ backend doesn't support this filter operation: {predicate}")
@@ -361,8 +643,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("filter_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _filter_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('filter_cpp', _filter_cpp_func, predicate, backends=('cpp',))
 
     def flatten(self) -> 'Pipeline[Generator[Any, None, None]]':
         """Flatten one level of nested iterables."""
@@ -375,8 +656,7 @@ class Pipeline(Generic[T]):
                         yield item
             else:
                 raise PipelineError("flatten() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _flatten_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('flatten', _flatten_func)
 
     def flatten_deep(self) -> 'Pipeline[Generator[Any, None, None]]':
         """Recursively flatten nested iterables."""
@@ -391,45 +671,56 @@ class Pipeline(Generic[T]):
                 yield from _flatten(val)
             else:
                 raise PipelineError("flatten_deep() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _flatten_deep_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('flatten_deep', _flatten_deep_func)
 
     def chunk(self, size: int) -> 'Pipeline[Generator[list[T], None, None]]':
         """Break a sequence into chunks of the given size."""
         def _chunk_func(val: Any) -> Generator[list[T], None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val = list(val) # Convert to list to allow slicing
-                for i in range(0, len(val), size):
-                    yield val[i:i + size]
+                _check_width('chunk', 'size', size)
+                if isinstance(val, list):
+                    for i in range(0, len(val), size):
+                        yield val[i:i + size]
+                    return
+                # Other iterables are chunked as they stream
+                iterator = iter(val)
+                while chunk := list(itertools.islice(iterator, size)):
+                    yield chunk
             else:
                 raise PipelineError("chunk() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _chunk_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('chunk', _chunk_func, size)
 
     def window(self, size: int, step: int = 1) -> 'Pipeline[Generator[list[T], None, None]]':
         """Create a sliding window view over a sequence."""
         def _window_func(val: Any) -> Generator[list[T], None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val = list(val) # Convert to list to allow slicing
-                for i in range(0, len(val) - size + 1, step):
-                    yield val[i:i + size]
+                _check_width('window', 'size', size)
+                _check_width('window', 'step', step)
+                if isinstance(val, list):
+                    for i in range(0, len(val) - size + 1, step):
+                        yield val[i:i + size]
+                    return
+                # Other iterables only ever hold one window
+                yield from _sliding_windows(val, size, step)
             else:
                 raise PipelineError("window() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _window_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('window', _window_func, size, step)
 
     def sliding_reduce(self, func: Callable[[Any], U], size: int) -> 'Pipeline[Generator[U, None, None]]':
         """Create sliding windows and apply a function to each."""
         executable_func = self._unwrap(func)
         def _sliding_reduce_func(val: Any) -> Generator[U, None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val = list(val) # Convert to list to allow slicing
-                for i in range(len(val) - size + 1):
-                    yield executable_func(val[i:i + size])
+                _check_width('sliding_reduce', 'size', size)
+                if isinstance(val, list):
+                    for i in range(len(val) - size + 1):
+                        yield executable_func(val[i:i + size])
+                    return
+                for window in _sliding_windows(val, size, 1):
+                    yield executable_func(window)
             else:
                 raise PipelineError("sliding_reduce() can only be used on iterables.")
-        new_pipeline_func = lambda x: _sliding_reduce_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('sliding_reduce', _sliding_reduce_func, func, size, fn=executable_func)
 
     def sliding_pairs(self) -> 'Pipeline[Generator[list[T], None, None]]':
         """Create a sliding window of pairs over a sequence."""
@@ -437,14 +728,24 @@ class Pipeline(Generic[T]):
 
     def sort(self, key: Optional[Callable[[Any], Any]] = None, reverse: bool = False) -> 'Pipeline[list[T]]':
         """Sort the iterable."""
-        executable_key = self._unwrap(key) if key else None
+        executable_key = self._unwrap(key) if key is not None else None
         def _sort_func(val: Any) -> list[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
                 return sorted(val, key=executable_key, reverse=reverse)
             else:
                 raise PipelineError("sort() can only be used on iterables.")
-        new_pipeline_func = lambda x: _sort_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('sort', _sort_func, key, reverse, fn=executable_key)
+
+    def top_k(self, k: int, key: Optional[Callable[[Any], Any]] = None, reverse: bool = True) -> 'Pipeline[list[T]]':
+        """Return the first k elements of sort(key, reverse) (the k largest by default) using a bounded heap."""
+        executable_key = self._unwrap(key) if key is not None else None
+        def _top_k_func(val: Any) -> list[T]:
+            if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                return select(k, val, key=executable_key)
+            else:
+                raise PipelineError("top_k() can only be used on iterables.")
+        return self._add_stage('top_k', _top_k_func, k, key, reverse, fn=executable_key)
 
     def unique(self) -> 'Pipeline[Generator[T, None, None]]':
         """Remove duplicates from the iterable while preserving order."""
@@ -457,8 +758,7 @@ class Pipeline(Generic[T]):
                         yield x
             else:
                 raise PipelineError("unique() can only be used on iterables.")
-        new_pipeline_func = lambda x: _unique_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('unique', _unique_func)
 
     def starmap(self, func: Callable[..., U]) -> 'Pipeline[Generator[U, None, None]]':
         """Apply a function to each tuple in a list of tuples."""
@@ -472,8 +772,7 @@ class Pipeline(Generic[T]):
                         raise PipelineError("starmap() can only be used on iterables of tuples.")
             else:
                 raise PipelineError("starmap() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _starmap_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('starmap', _starmap_func, func, fn=executable)
 
     def first(self) -> 'Pipeline[Optional[T]]':
         """Get the first element of an iterable."""
@@ -482,79 +781,66 @@ class Pipeline(Generic[T]):
                 return next(iter(val), None)
             else:
                 raise PipelineError("first() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _first_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('first', _first_func)
 
     def last(self) -> 'Pipeline[Optional[T]]':
         """Get the last element of an iterable."""
         def _last_func(val: Any) -> Optional[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
                 try:
-                    if isinstance(val, list): # Optimize for lists
+                    if isinstance(val, (list, tuple)): # Optimize for sequences
                         return val[-1]
                     # For other iterables, consume to get the last element
-                    last_item = None
-                    for item in val:
-                        last_item = item
-                    return last_item
+                    tail = deque(val, maxlen=1)
+                    return tail[0] if tail else None
                 except IndexError:
                     return None
             else:
                 raise PipelineError("last() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _last_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('last', _last_func)
 
     def nth(self, n: int) -> 'Pipeline[Optional[T]]':
         """Get the nth element of an iterable (0-indexed)."""
         def _nth_func(val: Any) -> Optional[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
                 try:
-                    if isinstance(val, list):
+                    if isinstance(val, (list, tuple)):
                         return val[n]
                     # For other iterables, iterate to the nth element
-                    for i, item in enumerate(val):
-                        if i == n:
-                            return item
-                    return None # n is out of bounds
+                    if n < 0:
+                        return None # n is out of bounds
+                    return next(itertools.islice(val, n, None), None)
                 except IndexError:
                     return None
             else:
                 raise PipelineError("nth() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _nth_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('nth', _nth_func, n)
 
     def is_empty(self) -> 'Pipeline[bool]':
         """Check if the iterable is empty."""
         def _is_empty_func(val: Any) -> bool:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                return not bool(list(val)) # Convert to list to check emptiness
+                if isinstance(val, _SIZED_TYPES):
+                    return len(val) == 0
+                # Pull at most one element
+                return next(iter(val), _MISSING) is _MISSING
             else:
                 raise PipelineError("is_empty() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _is_empty_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('is_empty', _is_empty_func)
 
     def count(self) -> 'Pipeline[int]':
         """Count the number of elements in an iterable with optional C++ acceleration."""
         def _count_func(val: Any) -> int:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                # Convert generators/iterators to lists to allow reuse and size checking
-                val_list = list(val)
-                
-                # Try C++ backend for supported operations
-                backend = get_backend()
-                try:
-                    if backend.should_use_cpp(val_list, 'count'):
-                        return backend.execute_sum(val_list)
-                except Exception:
-                    # Fall back to Python if C++ fails
-                    pass
-                
-                # Python implementation
-                return len(val_list)
+                if isinstance(val, _SIZED_TYPES):
+                    return len(val)
+                # Count a stream without storing it: zip advances the counter once per element
+                counter = itertools.count()
+                deque(zip(val, counter), maxlen=0)
+                return next(counter)
             else:
                 raise PipelineError("count() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _count_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('count', _count_func)
 
     def count_cpp(self) -> 'Pipeline[int]':
         """Count the number of elements in an iterable using C++ backend explicitly."""
@@ -575,36 +861,38 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("count_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _count_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('count_cpp', _count_cpp_func, backends=('cpp',))
 
     def sum(self) -> 'Pipeline[Union[int, float]]':
         """Calculate the sum of elements in an iterable with optional backend acceleration."""
         def _sum_func(val: Any) -> Union[int, float]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val_list = list(val)
+                if not _in_memory(val):
+                    # Streams are summed a chunk at a time, natively where a backend takes the chunk
+                    kernel = _chunk_kernel(val, 'sum')
+                    return fold_chunks(val, kernel, sum, operator.add, default=0) if kernel else sum(val)
+                data = val
                 backend = get_backend()
                 
                 # Try Zig backend for mathematical operations
                 try:
-                    if backend.should_use_zig(val_list, 'sum') and backend.zig_backend:
-                        return backend.zig_backend.sum(val_list)
+                    if backend.should_use_zig(data, 'sum') and backend.zig_backend:
+                        return backend.zig_backend.sum(data)
                 except Exception:
                     pass
                 
                 # Try C++ backend
                 try:
-                    if backend.should_use_cpp(val_list, 'sum'):
-                        return backend.execute_sum(val_list)
+                    if backend.should_use_cpp(data, 'sum'):
+                        return backend.execute_sum(data)
                 except Exception:
                     pass
                 
                 # Python implementation
-                return sum(val_list)
+                return sum(data)
             else:
                 raise PipelineError("sum() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _sum_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('sum', _sum_func, backends=('zig', 'cpp'))
 
     def sum_cpp(self) -> 'Pipeline[Union[int, float]]':
         """Calculate the sum using C++ backend explicitly."""
@@ -625,33 +913,32 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("sum_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _sum_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('sum_cpp', _sum_cpp_func, backends=('cpp',))
 
     def min(self) -> 'Pipeline[Optional[T]]':
         """Get the minimum element in an iterable with optional C++ acceleration."""
         def _min_func(val: Any) -> Optional[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                # Convert generators/iterators to lists to allow reuse and size checking
-                val_list = list(val)
-                if not val_list:
-                    return None
+                if not _in_memory(val):
+                    # Streams are scanned a chunk at a time, natively where a backend takes the chunk
+                    kernel = _chunk_kernel(val, 'min')
+                    return fold_chunks(val, kernel, min, min) if kernel else min(val, default=None)
+                data = val
                 
                 # Try C++ backend for supported operations
                 backend = get_backend()
                 try:
-                    if backend.should_use_cpp(val_list, 'min'):
-                        return backend.cpp_backend.min(val_list)
+                    if len(data) and backend.should_use_cpp(data, 'min'):
+                        return backend.cpp_backend.min(data)
                 except Exception:
                     # Fall back to Python if C++ fails
                     pass
                 
                 # Python implementation
-                return min(val_list)
+                return min(data, default=None)
             else:
                 raise PipelineError("min() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _min_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('min', _min_func, backends=('cpp',))
 
     def min_cpp(self) -> 'Pipeline[Optional[T]]':
         """Get the minimum element in an iterable using C++ backend explicitly."""
@@ -674,33 +961,32 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("min_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _min_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('min_cpp', _min_cpp_func, backends=('cpp',))
 
     def max(self) -> 'Pipeline[Optional[T]]':
         """Get the maximum element in an iterable with optional C++ acceleration."""
         def _max_func(val: Any) -> Optional[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                # Convert generators/iterators to lists to allow reuse and size checking
-                val_list = list(val)
-                if not val_list:
-                    return None
+                if not _in_memory(val):
+                    # Streams are scanned a chunk at a time, natively where a backend takes the chunk
+                    kernel = _chunk_kernel(val, 'max')
+                    return fold_chunks(val, kernel, max, max) if kernel else max(val, default=None)
+                data = val
                 
                 # Try C++ backend for supported operations
                 backend = get_backend()
                 try:
-                    if backend.should_use_cpp(val_list, 'max'):
-                        return backend.cpp_backend.max(val_list)
+                    if len(data) and backend.should_use_cpp(data, 'max'):
+                        return backend.cpp_backend.max(data)
                 except Exception:
                     # Fall back to Python if C++ fails
                     pass
                 
                 # Python implementation
-                return max(val_list)
+                return max(data, default=None)
             else:
                 raise PipelineError("max() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _max_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('max', _max_func, backends=('cpp',))
 
     def max_cpp(self) -> 'Pipeline[Optional[T]]':
         """Get the maximum element in an iterable using C++ backend explicitly."""
@@ -723,8 +1009,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"C++ backend failed: {e}")
             else:
                 raise PipelineError("max_cpp() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _max_cpp_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('max_cpp', _max_cpp_func, backends=('cpp',))
 
     # --- Statistical Methods ---
 
@@ -732,45 +1017,147 @@ class Pipeline(Generic[T]):
         """Calculate the median of the elements in an iterable with optional Rust acceleration."""
         def _median_func(val: Any) -> Union[int, float]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val_list = list(val)
+                data = _for_backends(val, 'median')
                 
                 # Try Rust backend for large datasets (configurable threshold)
                 backend = get_backend()
-                if backend.should_use_rust(val_list, 'median'):
+                if backend.should_use_rust(data, 'median'):
                     try:
                         from . import native_rust
-                        return native_rust.median([float(x) for x in val_list])
+                        return native_rust.median(_rust_values(data))
                     except ImportError:
                         pass  # Fall back to Python
                 
                 # Python implementation for small datasets or when Rust unavailable
-                return median(val_list)
+                return median(data)
             else:
                 raise PipelineError("median() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _median_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('median', _median_func, backends=('rust',))
 
     def stdev(self) -> 'Pipeline[float]':
         """Calculate the standard deviation of the elements in an iterable with optional Rust acceleration."""
         def _stdev_func(val: Any) -> float:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val_list = list(val)
+                if not _in_memory(val):
+                    # Streams merge per-chunk moments, computed natively where a backend takes the chunk
+                    kernel = _chunk_kernel(val, 'moments')
+                    if kernel is None:
+                        return stdev(val)
+                    return stdev_from_moments(fold_chunks(val, kernel, moments, merge_moments, default=(0, 0.0, 0.0)))
+                data = val
                 
                 # Try Rust backend for large datasets (configurable threshold)
                 backend = get_backend()
-                if backend.should_use_rust(val_list, 'stdev'):
+                if backend.should_use_rust(data, 'stdev'):
                     try:
                         from . import native_rust
-                        return native_rust.stdev([float(x) for x in val_list])
+                        return native_rust.stdev(_rust_values(data))
                     except ImportError:
                         pass  # Fall back to Python
                 
                 # Python implementation for small datasets or when Rust unavailable
-                return stdev(val_list)
+                return stdev(data)
             else:
                 raise PipelineError("stdev() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _stdev_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('stdev', _stdev_func, backends=('rust',))
+
+    def describe(self, percentiles: Optional[Iterable[float]] = None) -> 'Pipeline[dict[str, Any]]':
+        """Summarize the elements in one pass: count, sum, mean, min, max, stdev and variance.
+
+        percentiles are fractions in [0, 1]; each adds a key like '25%' with
+        the linearly interpolated quantile, from one sort of the elements.
+        stdev and variance are population statistics, as in stdev(); where
+        stdev() raises for fewer than two elements, they are NaN here. Large
+        lists and buffers go to the batch Zig kernel, which computes all of
+        them in one native call; otherwise a one-pass Welford update runs
+        over the elements, streaming generators unless percentiles are asked for.
+        """
+        quantiles = tuple(percentiles) if percentiles is not None else ()
+        for q in quantiles:
+            if isinstance(q, bool) or not isinstance(q, (int, float)) or not 0 <= q <= 1:
+                raise PipelineError(f"describe() percentiles must be fractions between 0 and 1, got {q!r}")
+
+        def _describe_func(val: Any) -> dict[str, Any]:
+            if not isinstance(val, Iterable) or isinstance(val, (str, bytes)):
+                raise PipelineError("describe() can only be used on iterables (excluding str/bytes).")
+            data = _as_sequence(val) if quantiles else _for_backends(val, 'stdev')
+            backend = get_backend()
+            stats = None
+            if _in_memory(data) and len(data) > 0 and backend.should_use_zig(data, 'stdev') and backend.zig_backend:
+                try:
+                    batch = backend.zig_backend.batch_statistics(data)
+                    count, variance = len(data), batch['stdev'] ** 2
+                    stats = {'count': count, 'sum': batch['sum'], 'mean': batch['mean'], 'min': batch['min'],
+                             'max': batch['max'], 'stdev': batch['stdev'], 'variance': variance}
+                    # Like sum(), integer data keeps integer results where the kernel's are whole
+                    if is_integral(data):
+                        for key in ('sum', 'min', 'max'):
+                            if stats[key].is_integer():
+                                stats[key] = int(stats[key])
+                except Exception:
+                    stats = None
+            if stats is None:
+                count, total, low, high, mean, m2 = summary(data)
+                variance = m2 / count if count else math.nan
+                stats = {'count': count, 'sum': total, 'mean': mean, 'min': low, 'max': high,
+                         'stdev': math.sqrt(variance), 'variance': variance}
+            if stats['count'] < 2:
+                stats['stdev'] = stats['variance'] = math.nan
+            if quantiles:
+                ordered = sorted(data)
+                for q in quantiles:
+                    stats[f"{q * 100:g}%"] = quantile(ordered, q)
+            return stats
+        return self._add_stage('describe', _describe_func, quantiles or None, backends=('zig',))
+
+    def aggregate(self, aggregates: Optional[dict[str, Any]] = None, **named: Any) -> 'Pipeline[dict[str, Any]]':
+        """Compute several aggregates over one pass of the elements, as a dict of results by name.
+
+        Each aggregate is an Aggregate class (Sum, Count, Min, Max, Mean,
+        Variance, ...), one of the builtins sum, len, min and max, or an
+        (init, step, finish) tuple folding step(acc, x) over the elements
+        from init and returning finish(acc); finish may be left out. Names
+        can also be given as a dict. Streams are read once, 64K elements at a
+        time; when every aggregate is one of the statistics the batch Zig
+        kernel computes, large chunks take a single native call.
+        """
+        specs = {**(aggregates or {}), **named}
+        if not specs:
+            raise PipelineError("aggregate() needs at least one aggregate")
+        factories = {}
+        for name, spec in specs.items():
+            factories[name] = aggregate_factory(spec)
+            if factories[name] is None:
+                raise PipelineError(f"aggregate() got {spec!r} for {name!r}; expected an Aggregate class, "
+                                    "sum/len/min/max or an (init, step, finish) tuple")
+        native = all(factory in STATISTICS_AGGREGATES for factory in factories.values())
+
+        def _aggregate_func(val: Any) -> dict[str, Any]:
+            if not isinstance(val, Iterable) or isinstance(val, (str, bytes)):
+                raise PipelineError("aggregate() can only be used on iterables (excluding str/bytes).")
+            states = {name: make() for name, make in factories.items()}
+            backend = get_backend()
+            # Lists, tuples and buffers are a single chunk
+            chunks = (val,) if _in_memory(val) else iter_chunks(val)
+            for chunk in chunks:
+                partials = None
+                if native and len(chunk) > 0 and backend.should_use_zig(chunk, 'stdev') and backend.zig_backend:
+                    try:
+                        stats = backend.zig_backend.batch_statistics(chunk)
+                        # Like sum(), integer data keeps integer results where the kernel's are whole
+                        if is_integral(chunk):
+                            stats.update((key, int(stats[key])) for key in ('sum', 'min', 'max')
+                                         if stats[key].is_integer())
+                        partials = {name: from_statistics(factories[name], len(chunk), stats) for name in states}
+                    except Exception:
+                        partials = None
+                for name, state in states.items():
+                    if isinstance(state, Aggregate):
+                        state.merge(partials[name] if partials else type(state).from_iterable(chunk))
+                    else:
+                        state.add_all(chunk)
+            return {name: state.result() for name, state in states.items()}
+        return self._add_stage('aggregate', _aggregate_func, specs, backends=('zig',))
 
     def median_rust(self) -> 'Pipeline[Union[int, float]]':
         """Calculate the median of the elements in an iterable using Rust."""
@@ -778,13 +1165,12 @@ class Pipeline(Generic[T]):
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
                 try:
                     from . import native_rust
-                    return native_rust.median(list(val))
+                    return native_rust.median(_as_sequence(val))
                 except ImportError:
                     raise PipelineError("Rust backend not available. Please compile it first.")
             else:
                 raise PipelineError("median_rust() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _median_rust_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('median_rust', _median_rust_func, backends=('rust',))
 
     def stdev_rust(self) -> 'Pipeline[float]':
         """Calculate the standard deviation of the elements in an iterable using Rust."""
@@ -792,13 +1178,12 @@ class Pipeline(Generic[T]):
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
                 try:
                     from . import native_rust
-                    return native_rust.stdev(list(val))
+                    return native_rust.stdev(_as_sequence(val))
                 except ImportError:
                     raise PipelineError("Rust backend not available. Please compile it first.")
             else:
                 raise PipelineError("stdev_rust() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _stdev_rust_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('stdev_rust', _stdev_rust_func, backends=('rust',))
 
     def sum_zig(self) -> 'Pipeline[Union[int, float]]':
         """Calculate the sum using Zig backend explicitly."""
@@ -808,7 +1193,7 @@ class Pipeline(Generic[T]):
                 if backend.zig_backend is None:
                     raise PipelineError("Zig backend not available")
                 
-                val_list = list(val)
+                val_list = _as_sequence(val)
                 if not backend.zig_backend.supports_data_type(val_list):
                     raise PipelineError(f"Zig backend doesn't support this data type: {type(val_list)}")
                 
@@ -818,8 +1203,7 @@ class Pipeline(Generic[T]):
                     raise PipelineError(f"Zig backend failed: {e}")
             else:
                 raise PipelineError("sum_zig() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _sum_zig_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('sum_zig', _sum_zig_func, backends=('zig',))
 
     def mean_zig(self) -> 'Pipeline[float]':
         """Calculate the mean using Zig backend explicitly."""
@@ -829,15 +1213,14 @@ class Pipeline(Generic[T]):
                 if backend.zig_backend is None:
                     raise PipelineError("Zig backend not available")
                 
-                val_list = list(val)
+                val_list = _as_sequence(val)
                 try:
                     return backend.zig_backend.mean(val_list)
                 except Exception as e:
                     raise PipelineError(f"Zig backend failed: {e}")
             else:
                 raise PipelineError("mean_zig() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _mean_zig_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('mean_zig', _mean_zig_func, backends=('zig',))
 
     def stdev_zig(self) -> 'Pipeline[float]':
         """Calculate the standard deviation using Zig backend explicitly."""
@@ -847,15 +1230,14 @@ class Pipeline(Generic[T]):
                 if backend.zig_backend is None:
                     raise PipelineError("Zig backend not available")
                 
-                val_list = list(val)
+                val_list = _as_sequence(val)
                 try:
                     return backend.zig_backend.stdev(val_list)
                 except Exception as e:
                     raise PipelineError(f"Zig backend failed: {e}")
             else:
                 raise PipelineError("stdev_zig() can only be used on iterables (excluding str/bytes)")
-        new_pipeline_func = lambda x: _stdev_zig_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('stdev_zig', _stdev_zig_func, backends=('zig',))
 
     # --- Bitwise Methods ---
 
@@ -863,23 +1245,27 @@ class Pipeline(Generic[T]):
         """Perform a bitwise AND on each element in an iterable with optional Go acceleration."""
         def _bitwise_and_func(val: Any) -> Generator[int, None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                val_list = list(val)
+                kernel = _chunk_kernel(val, 'bitwise_and', operand)
+                if kernel is not None:
+                    # Streams run through the Go kernel a chunk at a time
+                    yield from map_chunks(val, kernel, lambda chunk: python_bitwise.bitwise_and(chunk, operand))
+                    return
+                data = val
                 backend = get_backend()
                 
                 # Try Go backend for bitwise operations
                 try:
-                    if backend.should_use_go(val_list, 'bitwise_and') and backend.go_backend:
-                        yield from backend.go_backend.bitwise_and(val_list, operand)
+                    if backend.should_use_go(data, 'bitwise_and') and backend.go_backend:
+                        yield from backend.go_backend.bitwise_and(data, operand)
                         return
                 except Exception:
                     pass
                 
                 # Python implementation fallback
-                yield from python_bitwise.bitwise_and(val_list, operand)
+                yield from python_bitwise.bitwise_and(data, operand)
             else:
                 raise PipelineError("bitwise_and() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _bitwise_and_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_and', _bitwise_and_func, operand, backends=('go',))
 
     def bitwise_or(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise OR on each element in an iterable."""
@@ -888,8 +1274,7 @@ class Pipeline(Generic[T]):
                 yield from python_bitwise.bitwise_or(val, operand)
             else:
                 raise PipelineError("bitwise_or() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _bitwise_or_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_or', _bitwise_or_func, operand)
 
     def bitwise_xor(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise XOR on each element in an iterable."""
@@ -898,8 +1283,7 @@ class Pipeline(Generic[T]):
                 yield from python_bitwise.bitwise_xor(val, operand)
             else:
                 raise PipelineError("bitwise_xor() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _bitwise_xor_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_xor', _bitwise_xor_func, operand)
 
     def bitwise_not(self) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise NOT on each element in an iterable."""
@@ -908,8 +1292,7 @@ class Pipeline(Generic[T]):
                 yield from python_bitwise.bitwise_not(val)
             else:
                 raise PipelineError("bitwise_not() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _bitwise_not_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_not', _bitwise_not_func)
 
     def left_shift(self, bits: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise left shift on each element in an iterable."""
@@ -918,8 +1301,7 @@ class Pipeline(Generic[T]):
                 yield from python_bitwise.left_shift(val, bits)
             else:
                 raise PipelineError("left_shift() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _left_shift_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('left_shift', _left_shift_func, bits)
 
     def right_shift(self, bits: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise right shift on each element in an iterable."""
@@ -928,8 +1310,7 @@ class Pipeline(Generic[T]):
                 yield from python_bitwise.right_shift(val, bits)
             else:
                 raise PipelineError("right_shift() can only be used on iterables of integers.")
-        new_pipeline_func = lambda x: _right_shift_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('right_shift', _right_shift_func, bits)
 
     def bitwise_and_go(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise AND using Go backend explicitly."""
@@ -939,15 +1320,14 @@ class Pipeline(Generic[T]):
                 if backend.go_backend is None:
                     raise PipelineError("Go backend not available")
                 
-                val_list = list(val)
+                val_list = _as_sequence(val)
                 try:
                     yield from backend.go_backend.bitwise_and(val_list, operand)
                 except Exception as e:
                     raise PipelineError(f"Go backend failed: {e}")
             else:
                 raise PipelineError("bitwise_and_go() can only be used on iterables of integers")
-        new_pipeline_func = lambda x: _bitwise_and_go_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_and_go', _bitwise_and_go_func, operand, backends=('go',))
 
     def bitwise_or_go(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
         """Perform a bitwise OR using Go backend explicitly."""
@@ -957,39 +1337,34 @@ class Pipeline(Generic[T]):
                 if backend.go_backend is None:
                     raise PipelineError("Go backend not available")
                 
-                val_list = list(val)
+                val_list = _as_sequence(val)
                 try:
                     yield from backend.go_backend.bitwise_or(val_list, operand)
                 except Exception as e:
                     raise PipelineError(f"Go backend failed: {e}")
             else:
                 raise PipelineError("bitwise_or_go() can only be used on iterables of integers")
-        new_pipeline_func = lambda x: _bitwise_or_go_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('bitwise_or_go', _bitwise_or_go_func, operand, backends=('go',))
 
     def reverse(self) -> 'Pipeline[list[T]]':
         """Reverse the order of elements in an iterable."""
         def _reverse_func(val: Any) -> list[T]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                return list(reversed(val))
+                # Iterators (e.g. a filter the optimizer moved ahead) are materialized first
+                return list(reversed(val if isinstance(val, Reversible) else list(val)))
             else:
                 raise PipelineError("reverse() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _reverse_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('reverse', _reverse_func)
 
     def take(self, n: int) -> 'Pipeline[Generator[T, None, None]]':
         """Take the first n elements from the iterable."""
         def _take_func(val: Any) -> Generator[T, None, None]:
             if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                for i, item in enumerate(val):
-                    if i < n:
-                        yield item
-                    else:
-                        break
+                # islice stops before pulling element n + 1, as the fused take does
+                yield from itertools.islice(val, max(n, 0))
             else:
                 raise PipelineError("take() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _take_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('take', _take_func, n)
 
     def take_while(self, predicate: Callable[[Any], bool]) -> 'Pipeline[Generator[T, None, None]]':
         """Take elements from the iterable as long as the predicate is true."""
@@ -1003,8 +1378,7 @@ class Pipeline(Generic[T]):
                         break
             else:
                 raise PipelineError("take_while() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _take_while_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('take_while', _take_while_func, predicate, fn=executable_predicate)
 
     def skip(self, n: int) -> 'Pipeline[Generator[T, None, None]]':
         """Skip the first n elements from the iterable."""
@@ -1015,8 +1389,7 @@ class Pipeline(Generic[T]):
                         yield item
             else:
                 raise PipelineError("skip() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _skip_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('skip', _skip_func, n)
 
     def skip_while(self, predicate: Callable[[Any], bool]) -> 'Pipeline[Generator[T, None, None]]':
         """Skip elements from the iterable as long as the predicate is true."""
@@ -1032,8 +1405,7 @@ class Pipeline(Generic[T]):
                         yield item
             else:
                 raise PipelineError("skip_while() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _skip_while_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('skip_while', _skip_while_func, predicate, fn=executable_predicate)
 
     def chain(self, *others: Iterable[Any]) -> 'Pipeline[Generator[Any, None, None]]':
         """Concatenate multiple sequences."""
@@ -1047,8 +1419,7 @@ class Pipeline(Generic[T]):
                         raise PipelineError("chain() can only concatenate iterables (excluding str/bytes).")
             else:
                 raise PipelineError("chain() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _chain_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('chain', _chain_func, *others)
 
     def zip_with(self, other: Iterable[Any]) -> 'Pipeline[Generator[tuple[Any, Any], None, None]]':
         """Zip the current iterable with another iterable."""
@@ -1057,8 +1428,7 @@ class Pipeline(Generic[T]):
                 yield from zip(val, other)
             else:
                 raise PipelineError("zip_with() requires two iterables.")
-        new_pipeline_func = lambda x: _zip_with_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('zip_with', _zip_with_func, other)
 
     def product(self, *iterables: Iterable[Any]) -> 'Pipeline[Generator[tuple[Any, ...], None, None]]':
         """Cartesian product of input iterables."""
@@ -1067,8 +1437,7 @@ class Pipeline(Generic[T]):
                 yield from itertools.product(val, *iterables)
             else:
                 raise PipelineError("product() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _product_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('product', _product_func, *iterables)
 
     def combinations(self, r: int) -> 'Pipeline[Generator[tuple[Any, ...], None, None]]':
         """Return r-length subsequences of elements from the input iterable."""
@@ -1077,8 +1446,7 @@ class Pipeline(Generic[T]):
                 yield from itertools.combinations(val, r)
             else:
                 raise PipelineError("combinations() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _combinations_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('combinations', _combinations_func, r)
 
     def group_by(self, key: Callable[[Any], Any]) -> 'Pipeline[dict[Any, list[T]]]':
         """Group elements of an iterable based on a key function."""
@@ -1094,14 +1462,14 @@ class Pipeline(Generic[T]):
                 return groups
             else:
                 raise PipelineError("group_by() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _group_by_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('group_by', _group_by_func, key, fn=executable_key)
 
     # --- Conversion Methods ---
 
     def to_list(self) -> list[Any]:
         """Convert the pipeline result to a list."""
-        result = self.get()
+        # A size hint on the result lets list() preallocate
+        result = execute(self._physical_stages(), self._initial_value, hint_result=True)
         if isinstance(result, Iterable) and not isinstance(result, (str, bytes)):
             return list(result)
         else:
@@ -1121,8 +1489,7 @@ class Pipeline(Generic[T]):
                     yield from val.split(delimiter)
             else:
                 raise PipelineError("explode() can only be used on strings.")
-        new_pipeline_func = lambda x: _explode_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('explode', _explode_func, delimiter)
 
     def implode(self, separator: str = "") -> 'Pipeline[str]':
         """Join an iterable of strings into a single string."""
@@ -1131,8 +1498,7 @@ class Pipeline(Generic[T]):
                 return separator.join(str(item) for item in val)
             else:
                 raise PipelineError("implode() can only be used on iterables (excluding str/bytes).")
-        new_pipeline_func = lambda x: _implode_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('implode', _implode_func, separator)
 
     def surround(self, prefix: str, suffix: str) -> 'Pipeline[str]':
         """Surround a string with prefix and suffix."""
@@ -1141,8 +1507,7 @@ class Pipeline(Generic[T]):
                 return f"{prefix}{val}{suffix}"
             else:
                 raise PipelineError("surround() can only be used on strings.")
-        new_pipeline_func = lambda x: _surround_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('surround', _surround_func, prefix, suffix)
 
     def template_fill(self, values: dict[str, Any]) -> 'Pipeline[str]':
         """Fill a template string with values using format()."""
@@ -1151,8 +1516,7 @@ class Pipeline(Generic[T]):
                 return val.format(**values)
             else:
                 raise PipelineError("template_fill() can only be used on strings.")
-        new_pipeline_func = lambda x: _template_fill_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('template_fill', _template_fill_func, values)
 
     # --- Dictionary Methods ---
 
@@ -1163,8 +1527,7 @@ class Pipeline(Generic[T]):
                 yield from val.items()
             else:
                 raise PipelineError("with_items() can only be used on dictionaries.")
-        new_pipeline_func = lambda x: _with_items_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('with_items', _with_items_func)
 
     def map_keys(self, func: Callable[[Any], Any]) -> 'Pipeline[dict[Any, Any]]':
         """Apply a function to all keys in a dictionary."""
@@ -1174,8 +1537,7 @@ class Pipeline(Generic[T]):
                 return {executable(k): v for k, v in val.items()}
             else:
                 raise PipelineError("map_keys() can only be used on dictionaries.")
-        new_pipeline_func = lambda x: _map_keys_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('map_keys', _map_keys_func, func, fn=executable)
 
     def map_values(self, func: Callable[[Any], Any]) -> 'Pipeline[dict[Any, Any]]':
         """Apply a function to all values in a dictionary."""
@@ -1185,8 +1547,7 @@ class Pipeline(Generic[T]):
                 return {k: executable(v) for k, v in val.items()}
             else:
                 raise PipelineError("map_values() can only be used on dictionaries.")
-        new_pipeline_func = lambda x: _map_values_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('map_values', _map_values_func, func, fn=executable)
 
     # --- Side Effect Methods ---
 
@@ -1196,8 +1557,7 @@ class Pipeline(Generic[T]):
         def _do_func(val: Any) -> Any:
             executable(val)
             return val
-        new_pipeline_func = lambda x: _do_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('do', _do_func, func, fn=executable)
 
     def tap(self, func: Callable[[Any], Any]) -> 'Pipeline[T]':
         """Alias for do() - apply a side-effect function without changing the value."""
@@ -1208,13 +1568,19 @@ class Pipeline(Generic[T]):
         def _debug_func(val: Any) -> Any:
             print(f"{label}: {val}")
             return val
-        new_pipeline_func = lambda x: _debug_func(self._pipeline_func(x))
-        return Pipeline(self._initial_value, new_pipeline_func)
+        return self._add_stage('debug', _debug_func, label)
 
     def trace(self, label: str) -> 'Pipeline[T]':
         """Print the current value with a custom label for tracing."""
         return self.debug(label)
 
+    def _executable_or_none(self, func: Any) -> Optional[Callable[[Any], Any]]:
+        """Unwrap func for a stage descriptor, leaving any error to surface at execution time."""
+        try:
+            return self._unwrap(func)
+        except PipelineError:
+            return None
+
     def _unwrap(self, func: Any) -> Callable[[Any], Any]:
         """Unwraps a function or placeholder into an executable callable."""
         if isinstance(func, Placeholder):
@@ -1284,8 +1650,8 @@ class Pipeline(Generic[T]):
 
     def __call__(self, value: T) -> Any:
         """Make the pipeline callable with an input value."""
-        # When called, the pipeline applies its accumulated function to the provided value
-        return self._pipeline_func(value)
+        # When called, the pipeline runs its recorded stages over the provided value
+        return execute(self._physical_stages(), value)
 
     def add(self, number: Any) -> 'Pipeline[Any]':
         """Add a number to the current value."""
@@ -1307,6 +1673,35 @@ def pipe(value: T) -> 'Pipeline[T]':
     """Creates a new Pipeline instance with the given initial value."""
     return Pipeline(initial_value=value)
 
+def _restore_pipeline(version: int, plan: bytes, initial_value: Any) -> 'Pipeline[Any]':
+    """Rebuild a pickled Pipeline, sharing the cached plan for its stages."""
+    template = _restore_plan(version, plan)
+    if initial_value is None:
+        return template
+    restored: Pipeline[Any] = Pipeline(initial_value, _stages=template._stages, _options=template._options)
+    restored._plan = template._plan
+    return restored
+
+@lru_cache(maxsize=256)
+def _restore_plan(version: int, plan: bytes) -> 'Pipeline[Any]':
+    """Replay pickled stage calls into a Pipeline with no initial value.
+
+    Cached on the pickled bytes, so a worker process that receives the same
+    pipeline with every task rebuilds and plans it only once.
+    """
+    if version > PICKLE_VERSION:
+        raise PipelineError(f"Pipeline was pickled with format {version}; "
+                            f"this version of PyFunc reads up to format {PICKLE_VERSION}")
+    calls, options = pickle.loads(plan)
+    restored: Pipeline[Any] = Pipeline(_options=dict(options))
+    for op, args in calls:
+        if op == 'custom':
+            restored = Pipeline(_pipeline_func=args[0], _options=restored._options)
+        else:
+            restored = getattr(restored, op)(*args)
+    restored._physical_stages()
+    return restored
+
 
 # Only define Go backend methods if native_go is available
 if native_go is not None:
@@ -1318,11 +1713,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.bitwise_and(list(val), operand)
+                    return native_go.bitwise_and(_as_sequence(val), operand)
                 else:
                     raise PipelineError("bitwise_and_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _bitwise_and_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('bitwise_and_go', _bitwise_and_go_func, operand, backends=('go',))
 
         def bitwise_or_go(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
             """Perform a bitwise OR on each element in an iterable using Go backend."""
@@ -1331,11 +1725,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.bitwise_or(list(val), operand)
+                    return native_go.bitwise_or(_as_sequence(val), operand)
                 else:
                     raise PipelineError("bitwise_or_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _bitwise_or_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('bitwise_or_go', _bitwise_or_go_func, operand, backends=('go',))
 
         def bitwise_xor_go(self, operand: int) -> 'Pipeline[Generator[int, None, None]]':
             """Perform a bitwise XOR on each element in an iterable using Go backend."""
@@ -1344,11 +1737,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.bitwise_xor(list(val), operand)
+                    return native_go.bitwise_xor(_as_sequence(val), operand)
                 else:
                     raise PipelineError("bitwise_xor_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _bitwise_xor_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('bitwise_xor_go', _bitwise_xor_go_func, operand, backends=('go',))
 
         def bitwise_not_go(self) -> 'Pipeline[Generator[int, None, None]]':
             """Perform a bitwise NOT on each element in an iterable using Go backend."""
@@ -1357,11 +1749,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.bitwise_not(list(val))
+                    return native_go.bitwise_not(_as_sequence(val))
                 else:
                     raise PipelineError("bitwise_not_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _bitwise_not_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('bitwise_not_go', _bitwise_not_go_func, backends=('go',))
 
         def left_shift_go(self, bits: int) -> 'Pipeline[Generator[int, None, None]]':
             """Perform a bitwise left shift on each element in an iterable using Go backend."""
@@ -1370,11 +1761,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.left_shift(list(val), bits)
+                    return native_go.left_shift(_as_sequence(val), bits)
                 else:
                     raise PipelineError("left_shift_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _left_shift_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('left_shift_go', _left_shift_go_func, bits, backends=('go',))
 
         def right_shift_go(self, bits: int) -> 'Pipeline[Generator[int, None, None]]':
             """Perform a bitwise right shift on each element in an iterable using Go backend."""
@@ -1383,11 +1773,10 @@ if native_go is not None:
                 if native_go is None:
                     raise PipelineError("Go backend not available.")
                 if isinstance(val, Iterable) and not isinstance(val, (str, bytes)):
-                    return native_go.right_shift_go(list(val), bits)
+                    return native_go.right_shift_go(_as_sequence(val), bits)
                 else:
                     raise PipelineError("right_shift_go() can only be used on iterables of integers.")
-            new_pipeline_func = lambda x: _right_shift_go_func(self._pipeline_func(x))
-            return Pipeline(self._initial_value, new_pipeline_func)
+            return self._add_stage('right_shift_go', _right_shift_go_func, bits, backends=('go',))
 
     # Dynamically add GoBitwiseMethods to Pipeline if native_go is available
     for name in dir(GoBitwiseMethods):
@@ -1,18 +1,43 @@
+from functools import lru_cache
+import pickle
 from typing import Any, Callable, Optional
 
+from .errors import PipelineError
+from .expr import ARG, BINARY_OPERATORS, Arg, Attr, BinOp, Call, Const, Item, Node, UnaryOp, load, simplify
+
+# Version of the pickled forms written by Placeholder and Pipeline
+PICKLE_VERSION = 1
+
 class Placeholder:
     """
     A placeholder object that creates callable expressions for an elegant pipeline syntax.
     This class is now a pure "recipe builder". The Pipeline class is responsible
     for "unwrapping" the recipe into an executable function.
+
+    Each placeholder holds an expression tree (see pyfunc.expr) describing the
+    operations applied so far; the executable function is built from it on demand.
     """
-    def __init__(self, func: Optional[Callable[[Any], Any]] = None, op_func: Optional[Callable[[Any, Any], Any]] = None, other_operand: Optional[Any] = None, is_reverse: bool = False):
-        # _func stores the function that has been built up by the expression.
-        self._func: Callable[[Any], Any] = func if func is not None else (lambda x: x)
-        # For binary operations, these store the details
-        self._op_func: Optional[Callable[[Any, Any], Any]] = op_func
-        self._other_operand: Optional[Any] = other_operand
-        self._is_reverse: bool = is_reverse
+    def __init__(self, func: Optional[Callable[[Any], Any]] = None, node: Optional[Node] = None):
+        # _node is the expression tree; an opaque func becomes a call of that function
+        if node is None:
+            node = ARG if func is None else Call(Const(func), (ARG,))
+        self._node: Node = node
+        self._evaluator: Optional[Callable[[Any], Any]] = func
+
+    @property
+    def _func(self) -> Callable[[Any], Any]:
+        """The single-argument callable computing the expression, with its constants folded."""
+        if self._evaluator is None:
+            self._evaluator = simplify(self._node).evaluator()
+        return self._evaluator
+
+    @property
+    def _key(self) -> tuple:
+        """Structural key of the expression, usable where == builds a new placeholder."""
+        return self._node.key
+
+    def __hash__(self) -> int:
+        return hash(self._node.key)
 
     def __call__(self, *args: Any, **kwargs: Any) -> 'Placeholder':
         """
@@ -20,80 +45,85 @@ class Placeholder:
         It returns a NEW placeholder with the method call added to the function chain.
         It does NOT execute the function. The Pipeline's _unwrap handles execution.
         """
-        return Placeholder(func=lambda x: self._func(x)(*args, **kwargs))
+        node = Call(self._node, tuple(Const(a) for a in args), tuple((k, Const(v)) for k, v in kwargs.items()))
+        return Placeholder(node=node)
 
     def __getattr__(self, name: str) -> 'Placeholder':
         """Builds a new placeholder for attribute access like _.name"""
-        return Placeholder(func=lambda x: getattr(self._func(x), name))
+        if name.startswith('__') and name.endswith('__'):
+            # Protocol lookups (pickle, copy, inspect) must see missing dunders as missing
+            raise AttributeError(name)
+        return Placeholder(node=Attr(self._node, name))
+
+    def __reduce__(self) -> tuple:
+        """Pickle as the versioned nested-tuple form of the expression."""
+        return _restore_placeholder, (PICKLE_VERSION, pickle.dumps(self._node.dump()))
 
     def __getitem__(self, key: Any) -> 'Placeholder':
         """Builds a new placeholder for item access like _['key']"""
-        return Placeholder(func=lambda x: self._func(x)[key])
+        return Placeholder(node=Item(self._node, Const(key)))
 
     def __repr__(self) -> str:
-        if self._op_func:
-            op_name = self._op_func.__name__ if hasattr(self._op_func, '__name__') else 'binary_op'
-            return f"Placeholder(op={op_name}, other={self._other_operand}, reverse={self._is_reverse})"
-        return f"Placeholder({self._func.__name__ if hasattr(self._func, '__name__') else 'lambda'})"
-
-    # --- Operator overloads build a new placeholder with the composed function ---
-    def _binary_op(self, other: Any, op_func: Callable[[Any, Any], Any], is_reverse: bool = False) -> 'Placeholder':
-        # The func for the new placeholder will apply the binary operation
-        if isinstance(other, Placeholder):
-            new_func = lambda x: op_func(self._func(x), other._func(x))
-        else:
-            new_func = lambda x: op_func(self._func(x), other)
-        return Placeholder(func=new_func, op_func=op_func, other_operand=other, is_reverse=is_reverse)
+        return f"Placeholder({self._node!r})"
+
+    # --- Operator overloads build a new placeholder with the extended expression ---
+    def _binary_op(self, other: Any, symbol: str, is_reverse: bool = False) -> 'Placeholder':
+        other_node = other._node if isinstance(other, Placeholder) else Const(other)
+        if is_reverse:
+            # Reflected operators put the constant on the left: 10 - _ computes 10 - x
+            return Placeholder(node=BinOp(symbol, other_node, self._node))
+        return Placeholder(node=BinOp(symbol, self._node, other_node))
 
     # Comparison operators
-    def __lt__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a < b)
-    def __le__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a <= b)
-    def __eq__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a == b) # type: ignore
-    def __ne__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a != b) # type: ignore
-    def __gt__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a > b)
-    def __ge__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a >= b)
+    def __lt__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '<')
+    def __le__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '<=')
+    def __eq__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '==') # type: ignore
+    def __ne__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '!=') # type: ignore
+    def __gt__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '>')
+    def __ge__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '>=')
 
     # Arithmetic operators
-    def __add__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a + b)
-    def __sub__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a - b)
-    def __mul__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a * b)
-    def __truediv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a / b)
-    def __floordiv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a // b)
-    def __mod__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a % b)
-    def __pow__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a ** b)
+    def __add__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '+')
+    def __sub__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '-')
+    def __mul__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '*')
+    def __truediv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '/')
+    def __floordiv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '//')
+    def __mod__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '%')
+    def __pow__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '**')
 
     # Reverse arithmetic operators
-    def __radd__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a + b, True)
-    def __rsub__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a - b, True)
-    def __rmul__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a * b, True)
-    def __rtruediv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a / b, True)
-    def __rfloordiv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a // b, True)
-    def __rmod__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a % b, True)
-    def __rpow__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a ** b, True)
+    def __radd__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '+', True)
+    def __rsub__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '-', True)
+    def __rmul__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '*', True)
+    def __rtruediv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '/', True)
+    def __rfloordiv__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '//', True)
+    def __rmod__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '%', True)
+    def __rpow__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '**', True)
 
     # Bitwise operators
-    def __and__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a & b)
-    def __or__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a | b)
-    def __xor__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a ^ b)
-    def __lshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a << b)
-    def __rshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a >> b)
+    def __and__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '&')
+    def __or__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '|')
+    def __xor__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '^')
+    def __lshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '<<')
+    def __rshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '>>')
 
     # Reverse bitwise operators
-    def __rand__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a & b, True)
-    def __ror__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a | b, True)
-    def __rxor__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a ^ b, True)
-    def __rlshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a << b, True)
-    def __rrshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, lambda a, b: a >> b, True)
+    def __rand__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '&', True)
+    def __ror__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '|', True)
+    def __rxor__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '^', True)
+    def __rlshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '<<', True)
+    def __rrshift__(self, other: Any) -> 'Placeholder': return self._binary_op(other, '>>', True)
+
 
     # Unary operators
-    def __neg__(self) -> 'Placeholder': return Placeholder(func=lambda x: -self._func(x))
-    def __pos__(self) -> 'Placeholder': return Placeholder(func=lambda x: +self._func(x))
-    def __invert__(self) -> 'Placeholder': return Placeholder(func=lambda x: ~self._func(x))
-    def __abs__(self) -> 'Placeholder': return Placeholder(func=lambda x: abs(self._func(x)))
+    def __neg__(self) -> 'Placeholder': return Placeholder(node=UnaryOp('-', self._node))
+    def __pos__(self) -> 'Placeholder': return Placeholder(node=UnaryOp('+', self._node))
+    def __invert__(self) -> 'Placeholder': return Placeholder(node=UnaryOp('~', self._node))
+    def __abs__(self) -> 'Placeholder': return Placeholder(node=Call(Const(abs), (self._node,)))
 
     # Container operators
     def __contains__(self, item: Any) -> 'Placeholder':
-        return Placeholder(func=lambda x: item in self._func(x))
+        return Placeholder(node=BinOp('in', Const(item), self._node))
 
     # Special methods that should not be used directly on Placeholder
     def __len__(self) -> Any:
@@ -104,39 +134,43 @@ class Placeholder:
 
     def as_reducer(self) -> Callable[[Any, Any], Any]:
         """Returns a two-argument function suitable for reduce operations."""
-        if self._op_func is None:
+        node = self._node
+        if not isinstance(node, BinOp):
             raise TypeError("This placeholder does not represent a binary operation for reduce.")
 
-        op_func = self._op_func
-        other_operand = self._other_operand
-        is_reverse = self._is_reverse
-
-        if isinstance(other_operand, Placeholder):
-            # If the other operand is also a placeholder, it means the operation is like _ + _
-            # In this case, both 'a' and 'b' come from the reduce operation itself.
-            return lambda a, b: op_func(a, b)
-        else:
-            # If the other operand is a concrete value, it's fixed.
-            if is_reverse:
-                return lambda a, b: op_func(other_operand, b) # other_operand is left, b is right
-            else:
-                return lambda a, b: op_func(a, other_operand) # a is left, other_operand is right
+        op_func = BINARY_OPERATORS[node.op]
+        if isinstance(node.left, Arg) and isinstance(node.right, Arg):
+            # _ + _ : both operands come from the reduce operation itself
+            return op_func
+        # Otherwise the left side is computed from the accumulator 'a' and the right side from 'b'
+        left = node.left.evaluator()
+        right = node.right.evaluator()
+        return lambda a, b: op_func(left(a), right(b))
 
     # Function composition operators
     def __rshift__(self, other: 'Placeholder') -> 'Placeholder':
         """Function composition: f >> g means g(f(x))"""
         if isinstance(other, Placeholder):
-            return Placeholder(func=lambda x: other._func(self._func(x)))
+            return Placeholder(node=other._node.substitute(self._node))
         else:
-            return Placeholder(func=lambda x: other(self._func(x)))
+            return Placeholder(node=Call(Const(other), (self._node,)))
 
     def __lshift__(self, other: 'Placeholder') -> 'Placeholder':
         """Function composition: f << g means f(g(x))"""
         if isinstance(other, Placeholder):
-            return Placeholder(func=lambda x: self._func(other._func(x)))
+            return Placeholder(node=self._node.substitute(other._node))
         else:
-            return Placeholder(func=lambda x: self._func(other(x)))
-
+            return Placeholder(node=self._node.substitute(Call(Const(other), (ARG,))))
 
 
+@lru_cache(maxsize=256)
+def _restore_placeholder(version: int, data: bytes) -> Placeholder:
+    """Rebuild a pickled Placeholder.
 
+    Cached on the pickled bytes, so a worker process that receives the same
+    expression with every task rebuilds and compiles it only once.
+    """
+    if version > PICKLE_VERSION:
+        raise PipelineError(f"Placeholder was pickled with format {version}; "
+                            f"this version of PyFunc reads up to format {PICKLE_VERSION}")
+    return Placeholder(node=load(pickle.loads(data)))
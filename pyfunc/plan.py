@@ -0,0 +1,220 @@
+"""
+Logical plan for PyFunc pipelines.
+
+Every chained call on a Pipeline records a Stage instead of wrapping the
+previous function in a new closure. The ordered tuple of stages is the
+pipeline's logical plan: it can be inspected, rewritten and executed with
+a flat loop.
+"""
+
+from collections.abc import Iterable, Iterator
+import itertools
+import operator
+from typing import Any, Callable, Dict, Optional
+
+from .backends import get_backend
+
+class Stage:
+    """A single recorded pipeline step."""
+
+    __slots__ = ('op', 'func', 'args', 'fn', 'hints')
+
+    def __init__(self, op: str, func: Callable[[Any], Any], args: tuple = (),
+                 fn: Optional[Callable[..., Any]] = None, hints: Optional[dict] = None):
+        # op is the name of the Pipeline method that recorded the stage
+        self.op = op
+        # func transforms the whole value flowing through the pipeline
+        self.func = func
+        # args are the arguments the Pipeline method was called with
+        self.args = args
+        # fn is the unwrapped user callable (if any) applied by the stage
+        self.fn = fn
+        # hints carry backend and execution metadata
+        self.hints: dict = hints if hints is not None else {}
+
+    def __repr__(self) -> str:
+        args = ', '.join(_short_repr(arg) for arg in self.args)
+        return f"{self.op}({args})"
+
+def _short_repr(value: Any, limit: int = 40) -> str:
+    """Compact repr used when displaying plans."""
+    name = getattr(value, '__name__', None)
+    # Placeholders answer any attribute lookup with a new Placeholder
+    text = name if isinstance(name, str) else repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+def execute(stages: tuple, value: Any, hint_result: bool = False) -> Any:
+    """Run the stages over value with a flat loop.
+
+    Lazy outputs of stages with a known size rule are wrapped in a
+    SizedIterator so that the next stage (and backend dispatch) sees a
+    size estimate. The final result is only wrapped when hint_result is set,
+    so .get() still returns the stage's own generator.
+    """
+    last = len(stages) - 1
+    for index, stage in enumerate(stages):
+        rule = _SIZE_RULES.get(stage.op) if index < last or hint_result else None
+        if rule is None:
+            value = stage.func(value)
+            continue
+        size = size_hint(value)
+        exact = not isinstance(value, SizedIterator) or value.exact
+        value = stage.func(value)
+        if size >= 0 and isinstance(value, Iterator) and not isinstance(value, SizedIterator):
+            value = SizedIterator(value, rule(stage, size), exact and not _drops_elements(stage))
+    return value
+
+# ======================================================================
+# Size propagation
+# ======================================================================
+
+class SizedIterator:
+    """An iterator carrying an estimate of how many elements it will yield.
+
+    Iterating it hands out the wrapped iterator itself, so consumers pay
+    nothing per element. estimated_size is what backends apply their size
+    thresholds and chunk sizes to; it is an upper bound once a filter may
+    have dropped elements. Only an exact size is reported through
+    operator.length_hint(), so list() never preallocates for elements
+    that do not come.
+    """
+
+    __slots__ = ('_iterator', 'estimated_size', 'exact')
+
+    def __init__(self, iterator: Iterator[Any], size: int, exact: bool = True):
+        self._iterator = iterator
+        self.estimated_size = size
+        self.exact = exact
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iterator
+
+    def __next__(self) -> Any:
+        return next(self._iterator)
+
+    def __length_hint__(self) -> int:
+        return self.estimated_size if self.exact else NotImplemented
+
+def size_hint(value: Any) -> int:
+    """Exact or estimated number of elements in value; -1 if unknown or value is not a collection."""
+    if isinstance(value, SizedIterator):
+        return value.estimated_size
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        return -1
+    try:
+        return operator.length_hint(value, -1)
+    except Exception:
+        return -1
+
+def _count_arg(stage: Stage, index: int = 0) -> Optional[int]:
+    arg = stage.args[index] if len(stage.args) > index else None
+    return arg if type(arg) is int else None
+
+def _take_size(stage: Stage, size: int) -> int:
+    n = _count_arg(stage)
+    return size if n is None else min(size, max(n, 0))
+
+def _skip_size(stage: Stage, size: int) -> int:
+    n = _count_arg(stage)
+    return size if n is None else max(size - max(n, 0), 0)
+
+def _chunk_size(stage: Stage, size: int) -> int:
+    n = _count_arg(stage)
+    return size if n is None or n < 1 else -(-size // n)
+
+def _window_size(stage: Stage, size: int) -> int:
+    width, step = _count_arg(stage), _count_arg(stage, 1)
+    if width is None or step is None or width < 1 or step < 1:
+        return size
+    return max((size - width) // step + 1, 0)
+
+def _sliding_reduce_size(stage: Stage, size: int) -> int:
+    width = _count_arg(stage, 1)
+    return size if width is None or width < 1 else max(size - width + 1, 0)
+
+def _fused_size(stage: Stage, size: int) -> int:
+    for inner in stage.args:
+        size = _SIZE_RULES[inner.op](inner, size)
+    return size
+
+def _same_size(stage: Stage, size: int) -> int:
+    return size
+
+# Stages that may drop elements: their size rule gives an upper bound
+_FILTERING_OPS = frozenset({'filter', 'filter_cpp', 'unique', 'take_while', 'skip_while'})
+
+def _drops_elements(stage: Stage) -> bool:
+    if stage.op == 'fused':
+        return any(inner.op in _FILTERING_OPS for inner in stage.args)
+    return stage.op in _FILTERING_OPS
+
+# How many elements each lazy stage yields given its input size; filters give an upper bound
+_SIZE_RULES: Dict[str, Callable[[Stage, int], int]] = {
+    **dict.fromkeys((
+        'map', 'map_cpp', 'par_map', 'starmap', 'async_boundary', 'prefetch',
+        'bitwise_and', 'bitwise_or', 'bitwise_xor', 'bitwise_not', 'left_shift', 'right_shift',
+        'bitwise_and_go', 'bitwise_or_go', 'bitwise_xor_go', 'bitwise_not_go', 'left_shift_go', 'right_shift_go',
+        'filter', 'filter_cpp', 'unique', 'take_while', 'skip_while',
+    ), _same_size),
+    'take': _take_size,
+    'skip': _skip_size,
+    'chunk': _chunk_size,
+    'window': _window_size,
+    'sliding_reduce': _sliding_reduce_size,
+    'pairwise': lambda stage, size: size // 2,
+    'fused': _fused_size,
+}
+
+# ======================================================================
+# Operator fusion
+# ======================================================================
+
+# Element-wise stages that can be lowered onto builtin C-level iterators
+_FUSED_ITERATORS: Dict[str, Callable[[Stage, Any], Any]] = {
+    'map': lambda stage, it: map(stage.fn, it),
+    'filter': lambda stage, it: filter(stage.fn, it),
+    'take': lambda stage, it: itertools.islice(it, max(stage.args[0], 0)),
+    'skip': lambda stage, it: itertools.islice(it, max(stage.args[0], 0), None),
+    'take_while': lambda stage, it: itertools.takewhile(stage.fn, it),
+    'skip_while': lambda stage, it: itertools.dropwhile(stage.fn, it),
+}
+
+def is_fusable(stage: Stage) -> bool:
+    """Check if a stage is element-wise and can run inside a fused loop."""
+    if stage.op not in _FUSED_ITERATORS:
+        return False
+    if stage.op in ('take', 'skip'):
+        return type(stage.args[0]) is int
+    return stage.fn is not None
+
+def _fused_stage(run: tuple) -> Stage:
+    """Build one stage that runs a sequence of element-wise stages as a single iterator chain."""
+    lowerings = [(_FUSED_ITERATORS[stage.op], stage) for stage in run]
+    accelerated = 'cpp' in run[0].hints.get('backends', ())
+
+    def _fused_func(val: Any) -> Any:
+        if (not isinstance(val, Iterable) or isinstance(val, (str, bytes))
+                or (accelerated and get_backend().cpp_enabled)):
+            # Scalars, strings and C++-eligible inputs keep the per-stage behaviour
+            return execute(run, val)
+        for lower, stage in lowerings:
+            val = lower(stage, val)
+        return val
+
+    return Stage('fused', _fused_func, run)
+
+def fuse_stages(stages: tuple) -> tuple:
+    """Replace each run of consecutive element-wise stages with a single fused stage."""
+    fused: list[Stage] = []
+    run: list[Stage] = []
+    for stage in stages:
+        if is_fusable(stage):
+            run.append(stage)
+            continue
+        if run:
+            fused.append(_fused_stage(tuple(run)))
+            run = []
+        fused.append(stage)
+    if run:
+        fused.append(_fused_stage(tuple(run)))
+    return tuple(fused)
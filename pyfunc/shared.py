@@ -0,0 +1,165 @@
+"""
+Shared-memory transfer of numeric chunks to and from worker processes.
+
+Process pools normally pickle every chunk into a pipe and the worker
+unpickles it into a new list, boxing every element on both sides. A chunk
+of floats or ints can instead be copied once into a
+multiprocessing.shared_memory block: the worker receives a small
+SharedArray reference and reads the block through a typed memoryview, with
+no copy. Numeric results come back the same way.
+
+The process that creates a block owns it and unlinks it; SharedBlock is
+that owner. Workers only attach to blocks and detach again.
+"""
+
+import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import os
+from typing import Dict, Optional, Union
+
+from .backends.buffers import numeric_view
+
+# Below this many elements a chunk is pickled; a block costs a few system calls
+MIN_SHARED_ITEMS = 4096
+
+# Windows frees a block when its last handle closes, so a worker cannot hand one back
+_RESULTS_SHAREABLE = os.name == 'posix'
+
+# Worker pid -> whether its resource tracker is the one it inherited from its parent
+_INHERITED_TRACKER: Dict[int, bool] = {}
+
+def _typecode(values: list) -> Optional[str]:
+    """array type code holding every element of values unchanged, if there is one."""
+    if not values:
+        return None
+    first = type(values[0])
+    if first is float and all(type(value) is float for value in values):
+        return 'd'
+    if first is int and all(type(value) is int for value in values):
+        return 'q'
+    return None
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """Stop a worker's own resource tracker from unlinking a block when the worker exits.
+
+    Before Python 3.13 attaching to a block registers it for cleanup too.
+    A forked worker that shares its parent's tracker must leave the entry
+    alone, since the owner's unlink removes it.
+    """
+    if os.name != 'posix':
+        return
+    from multiprocessing import resource_tracker
+    if not _INHERITED_TRACKER[os.getpid()]:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+
+def _note_tracker() -> None:
+    """Worker side: record, before the first block is touched, whether the tracker was inherited."""
+    pid = os.getpid()
+    if pid not in _INHERITED_TRACKER and os.name == 'posix':
+        from multiprocessing import resource_tracker
+        _INHERITED_TRACKER[pid] = getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+
+class SharedArray:
+    """Picklable reference to a typed array in a shared memory block."""
+
+    __slots__ = ('name', 'format', 'length')
+
+    def __init__(self, name: str, format: str, length: int):
+        self.name = name
+        self.format = format
+        self.length = length
+
+    def __repr__(self) -> str:
+        return f"SharedArray(name={self.name!r}, format={self.format!r}, length={self.length})"
+
+class SharedBlock:
+    """A shared memory block holding one typed array, owned by the process that created it."""
+
+    def __init__(self, data: Union[memoryview, array.array]):
+        view = memoryview(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(view.nbytes, 1))
+        self._shm.buf[:view.nbytes] = view.cast('B')
+        self.ref = SharedArray(self._shm.name, view.format, len(view))
+
+    @classmethod
+    def of(cls, chunk: Union[list, memoryview], min_items: int = MIN_SHARED_ITEMS) -> Optional['SharedBlock']:
+        """Copy a numeric chunk of at least min_items elements into a new block; None if it cannot go."""
+        if len(chunk) < min_items:
+            return None
+        if isinstance(chunk, memoryview):
+            return cls(chunk)
+        typecode = _typecode(chunk)
+        if typecode is None:
+            return None
+        try:
+            return cls(array.array(typecode, chunk))
+        except OverflowError:
+            # ints beyond 64 bits stay pickled
+            return None
+
+    def release(self) -> None:
+        """Detach and unlink the block; workers still attached keep their mapping."""
+        if self._shm is None:
+            return
+        shm, self._shm = self._shm, None
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+@contextmanager
+def attached(ref: SharedArray, worker: bool = True) -> Iterator[memoryview]:
+    """Typed memoryview of a referenced array, valid inside the with block.
+
+    worker is False in the process that unlinks the block afterwards.
+    """
+    if worker:
+        _note_tracker()
+    shm = shared_memory.SharedMemory(name=ref.name)
+    if worker:
+        _untrack(shm)
+    data = shm.buf[:ref.length * array.array(ref.format).itemsize]
+    view = data.cast(ref.format)
+    try:
+        yield view
+    finally:
+        view.release()
+        data.release()
+        try:
+            shm.close()
+        except BufferError:
+            # The task kept a view of the block; the mapping goes when that is collected
+            pass
+
+def share_result(values: list, min_items: int = MIN_SHARED_ITEMS) -> Union[list, SharedArray]:
+    """Worker side: move a numeric result list into a new block for the parent to take()."""
+    if not _RESULTS_SHAREABLE:
+        return values
+    _note_tracker()
+    block = SharedBlock.of(values, min_items)
+    if block is None:
+        return values
+    shm, block._shm = block._shm, None
+    # The parent unlinks the block once it has read it
+    _untrack(shm)
+    shm.close()
+    return block.ref
+
+def take(ref: SharedArray) -> list:
+    """Parent side: the elements of a block a worker handed back, unlinking the block."""
+    with attached(ref, worker=False) as view:
+        values = view.tolist()
+    discard(ref)
+    return values
+
+def discard(ref: SharedArray) -> None:
+    """Unlink a block a worker handed back without reading it."""
+    try:
+        shm = shared_memory.SharedMemory(name=ref.name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
@@ -4,7 +4,7 @@ Pure Python implementations of statistical operations.
 
 import math
 from collections.abc import Iterable
-from typing import List, Union
+from typing import List, Sequence, Tuple, Union
 
 def median(data: Iterable[Union[int, float]]) -> Union[int, float]:
     """Calculates the median of a sequence of numbers."""
@@ -22,17 +22,83 @@ def median(data: Iterable[Union[int, float]]) -> Union[int, float]:
         # Even number of elements
         return (sorted_data[mid_index - 1] + sorted_data[mid_index]) / 2
 
-def stdev(data: Iterable[Union[int, float]]) -> float:
+def moments(data: Iterable[Union[int, float]]) -> Tuple[int, float, float]:
     """
-    Calculates the population standard deviation of a sequence of numbers.
+    Calculates (count, mean, sum of squared deviations) in a single pass.
     """
-    data_list: List[Union[int, float]] = list(data)
-    n = len(data_list)
-    
+    # Welford's update keeps a running mean and sum of squared deviations,
+    # so the data is read once and never stored
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for x in data:
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    return n, mean, m2
+
+def merge_moments(a: Tuple[int, float, float], b: Tuple[int, float, float]) -> Tuple[int, float, float]:
+    """
+    Combines the moments of two disjoint parts of a dataset (Chan et al.).
+    """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+def stdev_from_moments(state: Tuple[int, float, float]) -> float:
+    """
+    Population standard deviation of the data the moments were computed from.
+    """
+    n, _mean, m2 = state
     if n < 2:
         raise ValueError("stdev() requires at least two data points")
-    
-    mean = sum(data_list) / n
-    variance = sum((x - mean) ** 2 for x in data_list) / n
-    
-    return math.sqrt(variance)
+    return math.sqrt(m2 / n)
+
+def stdev(data: Iterable[Union[int, float]]) -> float:
+    """
+    Calculates the population standard deviation of a sequence of numbers.
+    """
+    return stdev_from_moments(moments(data))
+
+def summary(data: Iterable[Union[int, float]]) -> Tuple[int, Union[int, float], Union[int, float], Union[int, float], float, float]:
+    """
+    Calculates (count, sum, min, max, mean, sum of squared deviations) in a single pass.
+    """
+    # The Welford update of moments(), with the running sum and extrema alongside
+    n = 0
+    total: Union[int, float] = 0
+    low = high = math.nan
+    mean = 0.0
+    m2 = 0.0
+    for x in data:
+        if n == 0:
+            low = high = x
+        elif x < low:
+            low = x
+        elif x > high:
+            high = x
+        n += 1
+        total += x
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    return n, total, low, high, (mean if n else math.nan), m2
+
+def quantile(sorted_data: Sequence[Union[int, float]], q: float) -> float:
+    """
+    The q-th quantile (0 <= q <= 1) of sorted data, interpolating linearly between elements.
+    """
+    if not sorted_data:
+        return math.nan
+    position = q * (len(sorted_data) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_data) - 1)
+    fraction = position - lower
+    return sorted_data[lower] + (sorted_data[upper] - sorted_data[lower]) * fraction
@@ -0,0 +1,379 @@
+"""
+Typed numeric pipelines.
+
+pipe_array() starts a TypedPipeline over numbers kept in contiguous typed
+storage (array.array or a memoryview of the caller's buffer) from stage to
+stage, instead of one boxed Python int or float per element. Every stage
+has a dtype: int64, uint64, float64 or float32.
+
+The dtype of a map() over a Placeholder is inferred from the expression,
+following NumPy's rules for a Python scalar operand: ``_ * 2`` keeps an
+int64 pipeline int64, ``_ * 2.5`` and ``_ / 2`` make it float64, and a
+float32 pipeline stays float32. Other functions keep the input dtype unless
+map() is given dtype=. Stages are run by the native kernel for their dtype
+when a backend takes them (Zig for sums, extrema and int64/float64
+arithmetic, C++ for float64 expressions and filters), and in Python
+otherwise; either way the result is stored in the stage's dtype.
+
+A source buffer that already holds the pipeline's dtype is read in place;
+stages never write into their input. The buffer is only borrowed while the
+pipeline runs, so an array.array source can still grow between runs; a
+view returned by get() keeps it borrowed until the view is released.
+"""
+
+import array
+from collections.abc import Iterable
+from typing import Any, Callable, Optional, Union
+
+from .backends import get_backend
+from .backends.buffers import INTEGER_FORMATS, holds, numeric_view, typed_copy
+from .errors import PipelineError
+from .expr import Arg, BinOp, Call, Const, Node, UnaryOp, simplify
+from .placeholder import Placeholder
+from .plan import Stage
+
+# dtype names and the array type codes that store them
+DTYPES = {'int64': 'q', 'uint64': 'Q', 'float64': 'd', 'float32': 'f'}
+
+_INTEGER_DTYPES = ('int64', 'uint64')
+
+# Arithmetic operators whose result has the promoted dtype of their operands
+_ARITHMETIC_OPS = ('+', '-', '*', '//', '%', '**')
+
+_BITWISE_OPS = ('&', '|', '^', '<<', '>>')
+
+# Placeholder patterns with a Zig map kernel: operator -> ZigBackend method
+_ZIG_MAPS = {'+': 'map_add', '*': 'map_multiply', '**': 'map_power'}
+
+def _check_dtype(dtype: str) -> str:
+    if dtype not in DTYPES:
+        raise PipelineError(f"Unknown dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+    return dtype
+
+def _buffer_dtype(view: memoryview) -> str:
+    """dtype holding every element of a numeric buffer unchanged."""
+    if view.format in INTEGER_FORMATS:
+        return 'uint64' if holds(view, 'Q') else 'int64'
+    return 'float32' if holds(view, 'f') else 'float64'
+
+def _scalar_kind(value: Any) -> Optional[str]:
+    """'int' or 'float' for a Python scalar constant, None for anything else."""
+    if type(value) in (bool, int):
+        return 'int'
+    if type(value) is float:
+        return 'float'
+    return None
+
+def _promote(left: str, right: str) -> str:
+    """Result dtype of an arithmetic operator; 'int'/'float' stand for Python scalars."""
+    if left == right:
+        return left
+    if left in ('int', 'float'):
+        left, right = right, left
+    if right == 'int':
+        return left if left != 'float' else 'float'
+    if right == 'float':
+        return left if left in ('float64', 'float32') else 'float64'
+    # Two different array dtypes: only float64 holds both
+    return 'float64'
+
+def infer_dtype(node: Node, dtype: str) -> str:
+    """dtype of an expression applied to elements of the given dtype.
+
+    Raises PipelineError for expressions without a numeric dtype, such as
+    comparisons or calls, so the caller can name one with dtype=.
+    """
+    result = _infer(simplify(node), dtype)
+    if result not in DTYPES:
+        raise PipelineError(f"{node!r} does not depend on the element; pass dtype=")
+    return result
+
+def _infer(node: Node, dtype: str) -> str:
+    if isinstance(node, Arg):
+        return dtype
+    if isinstance(node, Const) and _scalar_kind(node.value) is not None:
+        return _scalar_kind(node.value)
+    if isinstance(node, BinOp) and node.op in _ARITHMETIC_OPS + ('/',) + _BITWISE_OPS:
+        left, right = _infer(node.left, dtype), _infer(node.right, dtype)
+        if node.op in _BITWISE_OPS:
+            if not {left, right} <= set(_INTEGER_DTYPES) | {'int'}:
+                raise PipelineError(f"{node!r} needs integer operands")
+            return _promote(left, right)
+        result = _promote(left, right)
+        if node.op == '/' and result in _INTEGER_DTYPES + ('int',):
+            return 'float64'
+        return result
+    if isinstance(node, UnaryOp) and node.op in ('-', '+', '~'):
+        result = _infer(node.operand, dtype)
+        if node.op == '~' and result not in _INTEGER_DTYPES:
+            raise PipelineError(f"{node!r} needs an integer operand")
+        return result
+    if isinstance(node, Call) and isinstance(node.func, Const) and node.func.value is abs and len(node.args) == 1:
+        return _infer(node.args[0], dtype)
+    raise PipelineError(f"Cannot infer the dtype of {node!r}; pass dtype=")
+
+def _store(values: Iterable[Any], dtype: str, operation: str) -> array.array:
+    """Elements as a new array of dtype."""
+    try:
+        return array.array(DTYPES[dtype], values)
+    except TypeError as exc:
+        raise PipelineError(f"{operation}() produced a value that is not {dtype}; pass dtype= ({exc})") from None
+    except OverflowError as exc:
+        raise PipelineError(f"{operation}() produced a value out of range for {dtype} ({exc})") from None
+
+def _native_map(values: Any, fn: Any, dtype: str, out: str) -> Optional[array.array]:
+    """Run a dtype-preserving map natively when a backend takes it, else None."""
+    if not isinstance(fn, Placeholder) or out != dtype or dtype not in ('int64', 'float64'):
+        return None
+    node = simplify(fn._node, integral=dtype in _INTEGER_DTYPES)
+    backend = get_backend()
+    if isinstance(node, BinOp) and node.op in _ZIG_MAPS:
+        # _ op c, or c op _ for the commutative operators
+        operand = None
+        if isinstance(node.left, Arg):
+            operand = node.right
+        elif isinstance(node.right, Arg) and node.op != '**':
+            operand = node.left
+        if isinstance(operand, Const) and _scalar_kind(operand.value) is not None:
+            zig = backend.zig_backend if backend.should_use_zig(values, _ZIG_MAPS[node.op]) else None
+            # The int64 kernels only take int operands and are missing from older libraries
+            if zig is not None and (dtype == 'float64' or
+                                    (zig._has_int64 and node.op != '**' and type(operand.value) is int)):
+                try:
+                    return getattr(zig, _ZIG_MAPS[node.op])(values, operand.value)
+                except Exception:
+                    pass
+    if dtype == 'float64' and backend.should_use_cpp(values, 'map', fn):
+        try:
+            return backend.cpp_backend.map(values, fn)
+        except Exception:
+            pass
+    return None
+
+class TypedPipeline:
+    """A pipeline over numbers stored contiguously in one dtype.
+
+    Element-wise stages produce a new typed array; sum(), min(), max(),
+    mean() and count() end the pipeline with a Python number.
+    """
+
+    def __init__(self, source: Any, dtype: str, _stages: tuple = (), _borrowed: bool = False):
+        self._source = source
+        self._stages = _stages
+        self._dtype = dtype
+        # The source is the caller's buffer, viewed only for the length of a run
+        self._borrowed = _borrowed
+
+    @property
+    def dtype(self) -> Optional[str]:
+        """dtype of the elements the pipeline produces; None once it has been reduced to a number."""
+        return self._dtype
+
+    @property
+    def stages(self) -> tuple:
+        """The recorded stages of this pipeline, in execution order."""
+        return self._stages
+
+    def __repr__(self) -> str:
+        plan = ' -> '.join(repr(stage) for stage in self._stages) or 'identity'
+        return f"TypedPipeline(dtype={self._dtype}, stages={plan})"
+
+    def _add_stage(self, op: str, func: Callable[[Any], Any], *args: Any, fn: Optional[Callable[..., Any]] = None,
+                   dtype: Optional[str] = None) -> 'TypedPipeline':
+        """Return a new TypedPipeline with one more stage, producing dtype (None for a number)."""
+        if self._dtype is None:
+            raise PipelineError(f"{op}() cannot follow a stage that reduced the pipeline to a number")
+        stage = Stage(op, func, args, fn, {'dtype': dtype})
+        return TypedPipeline(self._source, dtype, _stages=self._stages + (stage,), _borrowed=self._borrowed)
+
+    def get(self) -> Any:
+        """Run the pipeline: a typed array (or a view of the source) or, after a reduction, a number."""
+        if not self._borrowed:
+            value = self._source
+            for stage in self._stages:
+                value = stage.func(value)
+            return value
+        view = value = memoryview(self._source)
+        try:
+            for stage in self._stages:
+                value = stage.func(value)
+            return value
+        finally:
+            # Slices taken by take()/skip() stay valid; only a returned view keeps the buffer borrowed
+            if value is not view:
+                view.release()
+
+    def to_array(self) -> array.array:
+        """The elements as a new array.array of the pipeline's dtype."""
+        if self._dtype is None:
+            raise PipelineError("to_array() needs elements, but the pipeline was reduced to a number")
+        value = self.get()
+        if isinstance(value, array.array) and value is not self._source:
+            return value
+        return typed_copy(value, DTYPES[self._dtype])
+
+    def to_list(self) -> list:
+        """The elements as a list of Python numbers."""
+        if self._dtype is None:
+            raise PipelineError("to_list() needs elements, but the pipeline was reduced to a number")
+        return self.get().tolist()
+
+    # ------------------------------------------------------------------
+    # Element-wise stages
+    # ------------------------------------------------------------------
+
+    def map(self, func: Callable[[Any], Any], dtype: Optional[str] = None) -> 'TypedPipeline':
+        """Apply func to every element; dtype defaults to the inferred dtype of a Placeholder, else the input's."""
+        source_dtype = self._dtype
+        if dtype is not None:
+            out = _check_dtype(dtype)
+        elif isinstance(func, Placeholder) and source_dtype is not None:
+            out = infer_dtype(func._node, source_dtype)
+        else:
+            out = source_dtype
+        if isinstance(func, Placeholder):
+            # Elements of an integer dtype are ints, so the arithmetic identities hold
+            fn = simplify(func._node, integral=source_dtype in _INTEGER_DTYPES).evaluator()
+        else:
+            fn = func
+
+        def _map_func(values: Any) -> array.array:
+            result = _native_map(values, func, source_dtype, out)
+            if result is not None:
+                return result
+            return _store(map(fn, values), out, 'map')
+
+        return self._add_stage('map', _map_func, func, dtype, fn=func, dtype=out)
+
+    def filter(self, predicate: Callable[[Any], bool]) -> 'TypedPipeline':
+        """Keep the elements for which predicate is true."""
+        dtype = self._dtype
+        fn = predicate._func if isinstance(predicate, Placeholder) else predicate
+
+        def _filter_func(values: Any) -> array.array:
+            backend = get_backend()
+            if dtype == 'float64' and backend.should_use_cpp(values, 'filter', predicate):
+                try:
+                    return backend.cpp_backend.filter(values, predicate)
+                except Exception:
+                    pass
+            return _store(filter(fn, values), dtype, 'filter')
+
+        return self._add_stage('filter', _filter_func, predicate, fn=predicate, dtype=dtype)
+
+    def take(self, n: int) -> 'TypedPipeline':
+        """Keep the first n elements; a view, not a copy."""
+        # Clamped so a negative n keeps nothing, as Pipeline.take() does, instead of counting from the end
+        stop = max(n, 0)
+        return self._add_stage('take', lambda values: memoryview(values)[:stop], n, dtype=self._dtype)
+
+    def skip(self, n: int) -> 'TypedPipeline':
+        """Drop the first n elements; a view, not a copy."""
+        start = max(n, 0)
+        return self._add_stage('skip', lambda values: memoryview(values)[start:], n, dtype=self._dtype)
+
+    def astype(self, dtype: str) -> 'TypedPipeline':
+        """Convert the elements to dtype; floats become integers by truncation towards zero."""
+        typecode = DTYPES[_check_dtype(dtype)]
+        source_dtype = self._dtype
+
+        def _astype_func(values: Any) -> array.array:
+            if dtype in _INTEGER_DTYPES and source_dtype not in _INTEGER_DTYPES:
+                return _store(map(int, values), dtype, 'astype')
+            return typed_copy(values, typecode)
+
+        return self._add_stage('astype', _astype_func, dtype, dtype=dtype)
+
+    # ------------------------------------------------------------------
+    # Reductions
+    # ------------------------------------------------------------------
+
+    def _native(self, values: Any, operation: str) -> Any:
+        """Zig kernel for a reduction over values, or None; integer data needs the int64 kernels."""
+        backend = get_backend()
+        if self._dtype == 'float32' or not backend.should_use_zig(values, operation):
+            return None
+        zig = backend.zig_backend
+        if zig is None or (self._dtype in _INTEGER_DTYPES and not zig._has_int64):
+            return None
+        return getattr(zig, operation)
+
+    def sum(self) -> 'TypedPipeline':
+        """Sum of the elements; exact for integers, which raise no overflow."""
+        def _sum_func(values: Any) -> Union[int, float]:
+            kernel = self._native(values, 'sum')
+            if kernel is not None:
+                try:
+                    return kernel(values)
+                except Exception:
+                    # 64-bit overflow: Python ints do not have one
+                    pass
+            return sum(values)
+
+        return self._add_stage('sum', _sum_func)
+
+    def min(self) -> 'TypedPipeline':
+        """Smallest element."""
+        return self._add_stage('min', self._extremum('min', min))
+
+    def max(self) -> 'TypedPipeline':
+        """Largest element."""
+        return self._add_stage('max', self._extremum('max', max))
+
+    def _extremum(self, operation: str, builtin: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        def _extremum_func(values: Any) -> Union[int, float]:
+            if len(values) == 0:
+                raise ValueError(f"{operation}() arg is an empty sequence")
+            kernel = self._native(values, operation)
+            if kernel is not None:
+                try:
+                    return kernel(values)
+                except Exception:
+                    pass
+            return builtin(values)
+        return _extremum_func
+
+    def mean(self) -> 'TypedPipeline':
+        """Arithmetic mean; integer elements are summed exactly before dividing."""
+        is_float = self._dtype not in _INTEGER_DTYPES
+
+        def _mean_func(values: Any) -> float:
+            if len(values) == 0:
+                raise PipelineError("mean() of an empty pipeline")
+            kernel = self._native(values, 'mean') if is_float else None
+            if kernel is not None:
+                try:
+                    return kernel(values)
+                except Exception:
+                    pass
+            return sum(values) / len(values)
+
+        return self._add_stage('mean', _mean_func)
+
+    def count(self) -> 'TypedPipeline':
+        """Number of elements."""
+        return self._add_stage('count', len)
+
+def pipe_array(data: Any, dtype: Optional[str] = None) -> TypedPipeline:
+    """Start a TypedPipeline over a numeric buffer or an iterable of numbers.
+
+    dtype defaults to the buffer's own element type (small integer types
+    widen to int64), or for other iterables to int64 if every element is an
+    int and float64 otherwise. A buffer already holding dtype is used in
+    place, and only borrowed while the pipeline runs; anything else is
+    copied once into an array of dtype.
+    """
+    view = numeric_view(data)
+    if dtype is None:
+        if view is not None:
+            dtype = _buffer_dtype(view)
+        else:
+            data = data if isinstance(data, (list, tuple)) else list(data)
+            dtype = 'int64' if all(type(x) in (bool, int) for x in data) else 'float64'
+    typecode = DTYPES[_check_dtype(dtype)]
+    if view is not None and holds(view, typecode):
+        view.release()
+        return TypedPipeline(data, dtype, _borrowed=True)
+    if view is not None and dtype in _INTEGER_DTYPES and view.format not in INTEGER_FORMATS:
+        raise PipelineError(f"Cannot store float elements as {dtype}; start from float64 and use astype()")
+    return TypedPipeline(typed_copy(data, typecode), dtype)
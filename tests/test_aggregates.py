@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests for mergeable aggregation states."""
+
+import unittest
+import operator
+import statistics
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, PipelineError, _
+from pyfunc.backends import get_backend
+from pyfunc.aggregates import Count, Max, Mean, Min, Sum, Variance, infer_combiner, merge_states
+
+
+class TestAggregateStates(unittest.TestCase):
+
+    DATA = [4.0, -1.5, 8.25, 3.0, 3.0, 10.0, -7.75]
+
+    def test_merged_partitions_match_one_pass(self):
+        expected = {Sum: sum(self.DATA), Count: len(self.DATA), Min: -7.75, Max: 10.0,
+                    Mean: statistics.fmean(self.DATA), Variance: statistics.pvariance(self.DATA)}
+        for state_type, value in expected.items():
+            for split in range(len(self.DATA) + 1):
+                left = state_type.from_iterable(self.DATA[:split])
+                right = state_type.from_iterable(iter(self.DATA[split:]))
+                self.assertAlmostEqual(merge_states(left, right).result(), value, msg=state_type.__name__)
+
+    def test_add_matches_from_iterable(self):
+        for state_type in (Sum, Count, Min, Max, Mean, Variance):
+            state = state_type()
+            for value in self.DATA:
+                state.add(value)
+            self.assertAlmostEqual(state.result(), state_type.from_iterable(self.DATA).result())
+
+    def test_empty_states(self):
+        self.assertEqual(Sum().result(), 0)
+        self.assertEqual(Count().result(), 0)
+        self.assertIsNone(Min.from_iterable([]).result())
+        self.assertEqual(Max().merge(Max.from_iterable([2])).result(), 2)
+        with self.assertRaises(ValueError):
+            Mean().result()
+        with self.assertRaises(ValueError):
+            Variance.from_iterable([1.0]).result()
+        self.assertEqual(repr(Mean(2, 5)), "Mean(count=2, total=5)")
+
+    def test_infer_combiner(self):
+        self.assertIs(infer_combiner(_ + _), operator.add)
+        self.assertIs(infer_combiner(_ | _), operator.or_)
+        self.assertIs(infer_combiner(min), min)
+        self.assertIsNone(infer_combiner(_ - _))
+        self.assertIsNone(infer_combiner(_ + 1))
+        self.assertIsNone(infer_combiner(lambda a, b: a + b))
+
+
+
+class BatchZig:
+    """Computes batch statistics in Python, counting the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def batch_statistics(self, values):
+        self.calls += 1
+        return {'sum': float(sum(values)), 'mean': statistics.fmean(values), 'min': float(min(values)),
+                'max': float(max(values)), 'stdev': statistics.pstdev(values)}
+
+
+class TestPipelineAggregate(unittest.TestCase):
+
+    def test_one_pass_over_a_generator(self):
+        pulled = []
+        def source():
+            for x in range(200000):
+                pulled.append(x)
+                yield x
+        result = (pipe(source()).filter(_ % 3 == 0)
+                  .aggregate(total=Sum, n=len, hi=max, lo=Min, avg=Mean,
+                             evens=(0, lambda acc, x: acc + (x % 2 == 0), None),
+                             last=(list, lambda acc, x: (acc + [x])[-2:], tuple)).get())
+        multiples = range(0, 200000, 3)
+        self.assertEqual(len(pulled), 200000)
+        self.assertEqual(result, {'total': sum(multiples), 'n': len(multiples), 'hi': 199998, 'lo': 0,
+                                  'avg': statistics.fmean(multiples), 'evens': len(range(0, 200000, 6)),
+                                  'last': (199995, 199998)})
+
+    def test_specs(self):
+        self.assertEqual(pipe([3, 1, 2]).aggregate({'product': (1, _ * _), 'n': Count}).get(),
+                         {'product': 6, 'n': 3})
+        self.assertEqual(pipe([]).aggregate(n=len, hi=max, total=sum).get(), {'n': 0, 'hi': None, 'total': 0})
+        for spec in (sorted, (0,), (0, 5), 'sum'):
+            with self.assertRaises(PipelineError):
+                pipe([1]).aggregate(x=spec)
+        with self.assertRaises(PipelineError):
+            pipe([1]).aggregate()
+
+    def test_numeric_aggregates_use_the_batch_kernel(self):
+        backend = get_backend()
+        saved = backend._zig_backend, backend.zig_threshold
+        zig = BatchZig()
+        backend._zig_backend, backend.zig_threshold = zig, 1000
+        try:
+            data = [float(x % 17) for x in range(5000)]
+            result = pipe(data).aggregate(total=sum, n=len, var=Variance).get()
+            self.assertEqual(zig.calls, 1)
+            self.assertEqual((result['total'], result['n']), (sum(data), 5000))
+            self.assertAlmostEqual(result['var'], statistics.pvariance(data))
+            # Integer inputs keep integer sums and extrema
+            self.assertEqual(pipe(iter(range(5000))).aggregate(total=sum, hi=max).get(), {'total': 12497500, 'hi': 4999})
+            self.assertEqual(zig.calls, 2)
+            # A custom fold keeps the whole aggregation in Python
+            pipe(data).aggregate(total=sum, first=(None, lambda acc, x: x if acc is None else acc)).get()
+            self.assertEqual(zig.calls, 2)
+        finally:
+            backend._zig_backend, backend.zig_threshold = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Tests for asynchronous pipelines."""
+
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import apipe, AsyncPipeline, PipelineError, _
+from pyfunc.backends import get_backend
+from pyfunc.executors import default_workers
+
+
+async def arange(n, closed=None):
+    try:
+        for i in range(n):
+            await asyncio.sleep(0)
+            yield i
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+async def double(x):
+    await asyncio.sleep(0)
+    return x * 2
+
+
+class RecordingZig:
+    """Stands in for a loaded Zig backend and records the threads it runs on."""
+
+    def __init__(self):
+        self.threads = []
+
+    def sum(self, data):
+        self.threads.append(threading.get_ident())
+        return sum(data)
+
+
+class TestAsyncPipeline(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_source_and_coroutine_stages(self):
+        result = await apipe(arange(10)).map(double).filter(_ > 4).map(_ + 1).aget()
+        self.assertEqual(result, [7, 9, 11, 13, 15, 17, 19])
+        self.assertEqual(await apipe([1, 2, 3]).map(double).aget(), [2, 4, 6])
+
+    async def test_async_for(self):
+        seen = [x async for x in apipe(arange(5)).map(double)]
+        self.assertEqual(seen, [0, 2, 4, 6, 8])
+        self.assertEqual([x async for x in apipe(range(3)).sort(reverse=True)], [2, 1, 0])
+
+    async def test_awaitable_source_and_then(self):
+        async def load():
+            return [3, 1, 2]
+        async def total(values):
+            return sum(values)
+        self.assertEqual(await apipe(load()).then(total).aget(), 6)
+        self.assertEqual(await apipe(5).aget(), 5)
+
+    async def test_sync_methods_run_on_collected_elements(self):
+        pipeline = apipe(arange(10)).map(double).sort(reverse=True).take(3)
+        self.assertIsInstance(pipeline, AsyncPipeline)
+        self.assertEqual(await pipeline.to_list(), [18, 16, 14])
+        self.assertEqual(await apipe(arange(10)).filter(_ % 2 == 0).sum().aget(), 20)
+        self.assertEqual([stage.op for stage in apipe([]).map(double).sort().sum().stages], ['map', 'sync'])
+
+    async def test_take_closes_source(self):
+        closed = []
+        self.assertEqual(await apipe(arange(1000, closed)).take(3).aget(), [0, 1, 2])
+        self.assertEqual(closed, [True])
+        self.assertEqual(await apipe(arange(10)).skip(7).aget(), [7, 8, 9])
+        self.assertEqual(await apipe(arange(10)).take_while(_ < 3).aget(), [0, 1, 2])
+        self.assertEqual(await apipe(arange(6)).skip_while(_ < 4).aget(), [4, 5])
+
+    async def test_native_segments_run_off_the_event_loop(self):
+        backend = get_backend()
+        saved = backend._zig_backend, backend.zig_threshold
+        backend._zig_backend, backend.zig_threshold = RecordingZig(), 100
+        try:
+            self.assertEqual(await apipe(arange(200)).sum().aget(), sum(range(200)))
+            self.assertEqual(await apipe(arange(50)).sum().aget(), sum(range(50)))
+            self.assertEqual(len(backend._zig_backend.threads), 1)
+            self.assertNotEqual(backend._zig_backend.threads[0], threading.get_ident())
+        finally:
+            backend._zig_backend, backend.zig_threshold = saved
+
+    async def test_concurrent_parallel_segments_do_not_deadlock(self):
+        async def run_all():
+            pipeline = apipe(list(range(10000))).par_map(_ * 2).sum()
+            return await asyncio.wait_for(asyncio.gather(*(pipeline.aget() for _i in range(default_workers() + 1))), 10)
+
+        results = []
+        # A deadlocked worker thread cannot be cancelled, so the loop runs apart from the test's own
+        runner = threading.Thread(target=lambda: results.append(asyncio.run(run_all())), daemon=True)
+        runner.start()
+        runner.join(20)
+        self.assertFalse(runner.is_alive())
+        self.assertEqual(results, [[sum(range(10000)) * 2] * (default_workers() + 1)])
+
+    async def test_errors(self):
+        with self.assertRaises(PipelineError):
+            await apipe(5).map(double).aget()
+        with self.assertRaises(AttributeError):
+            apipe([]).no_such_method()
+        with self.assertRaises(PipelineError):
+            apipe([]).explain()
+
+
+class TestAmap(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.running = 0
+        self.peak = 0
+
+    async def slow_square(self, x):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            # Later elements finish first
+            await asyncio.sleep(0.001 * (10 - x % 10))
+            return x * x
+        finally:
+            self.running -= 1
+
+    async def test_concurrency_limit_and_order(self):
+        result = await apipe(arange(30)).amap(self.slow_square, concurrency=5, ordered=True).aget()
+        self.assertEqual(result, [x * x for x in range(30)])
+        self.assertEqual(self.peak, 5)
+
+    async def test_unordered_yields_as_completed(self):
+        result = await apipe(range(10)).amap(self.slow_square, concurrency=10).aget()
+        self.assertEqual(sorted(result), [x * x for x in range(10)])
+        self.assertEqual(result[0], 81)
+
+    async def test_rate_limit(self):
+        start = time.monotonic()
+        result = await apipe(range(6)).amap(double, rate=100).aget()
+        self.assertEqual(sorted(result), [0, 2, 4, 6, 8, 10])
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+    async def test_take_cancels_calls_in_flight(self):
+        started, cancelled = [], []
+        async def hang(x):
+            started.append(x)
+            try:
+                await asyncio.sleep(0 if x < 2 else 10)
+                return x
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+        closed = []
+        result = await apipe(arange(1000, closed)).amap(hang, concurrency=4, ordered=True).take(2).aget()
+        self.assertEqual(result, [0, 1])
+        # Every call still running was cancelled, and no more than the limit were started
+        self.assertEqual(cancelled, started[2:])
+        self.assertTrue(cancelled)
+        self.assertLessEqual(len(started), 6)
+        self.assertEqual(closed, [True])
+
+    async def test_errors(self):
+        async def fail(x):
+            raise ValueError(x)
+        with self.assertRaises(ValueError):
+            await apipe(range(5)).amap(fail).aget()
+        with self.assertRaises(PipelineError):
+            apipe([]).amap(double, concurrency=0)
+        with self.assertRaises(PipelineError):
+            apipe([]).amap(double, rate=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Tests for zero-copy numeric buffers in the native backends."""
+
+import unittest
+import array
+import ctypes
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, _, freeze, thaw
+from pyfunc.backends import get_backend
+from pyfunc.backends.buffers import as_ctypes, float64_buffer, numeric_view, typed_copy, typed_result
+from pyfunc.backends.conversion_cache import ConversionCache, conversion_cache
+from pyfunc.backends.go_backend import GoBackend
+from pyfunc.backends.zig_backend import ZigBackend
+
+
+class FakeLibrary:
+    """Stands in for a loaded shared library; kernels see the ctypes arrays they are passed."""
+
+    def __init__(self):
+        self.addresses = []
+
+    def _record(self, data, size):
+        self.addresses.append(ctypes.addressof(data))
+        return data[:size]
+
+    def zig_sum_f64(self, data, size):
+        return sum(self._record(data, size))
+
+    def zig_sum_i32(self, data, size):
+        return sum(self._record(data, size))
+
+    def zig_mean_f64(self, data, size):
+        return sum(self._record(data, size)) / size
+
+    def zig_max_f64(self, data, size):
+        return max(self._record(data, size))
+
+    def zig_map_multiply_f64(self, data, size, multiplier):
+        for i, value in enumerate(self._record(data, size)):
+            data[i] = value * multiplier
+
+    def bitwise_and_go(self, data, size, operand):
+        for i, value in enumerate(self._record(data, size)):
+            data[i] = value & operand
+
+
+def _backend(cls):
+    backend = cls.__new__(cls)
+    backend._lib = FakeLibrary()
+    backend._available = True
+    backend._has_int64 = False
+    return backend
+
+
+class TestBufferHelpers(unittest.TestCase):
+
+    def test_matching_buffers_are_not_copied(self):
+        data = array.array('d', [1.5, 2.5, 3.5])
+        for source in (data, memoryview(data)):
+            self.assertEqual(ctypes.addressof(as_ctypes(source, 'd')), data.buffer_info()[0])
+        self.assertEqual(list(as_ctypes(memoryview(data).toreadonly(), 'd')), [1.5, 2.5, 3.5])
+        self.assertIs(float64_buffer(data).obj, data)
+
+    def test_other_inputs_are_converted_once(self):
+        self.assertEqual(list(as_ctypes(array.array('h', [1, -2]), 'd')), [1.0, -2.0])
+        self.assertEqual(list(as_ctypes([1, 2.75], 'd')), [1.0, 2.75])
+        self.assertEqual(list(as_ctypes(bytearray(b'\x01\x02'), 'i')), [1, 2])
+        self.assertEqual(float64_buffer(array.array('q', [5])), array.array('d', [5.0]))
+        self.assertIsNone(float64_buffer([1.0]))
+        self.assertIsNone(numeric_view(b'abc'))
+        self.assertIsNone(numeric_view(memoryview(array.array('d', range(6))).cast('B').cast('d', (2, 3))))
+
+    def test_copies_and_results(self):
+        data = array.array('d', [1.0, 2.0])
+        copy = typed_copy(data, 'd')
+        copy[0] = 9.0
+        self.assertEqual(data[0], 1.0)
+        self.assertIsInstance(typed_result(data, copy), array.array)
+        self.assertEqual(typed_result([1.0, 2.0], copy), [9.0, 2.0])
+
+
+class TestZeroCopyBackends(unittest.TestCase):
+
+    def test_zig_reads_buffers_in_place(self):
+        zig = _backend(ZigBackend)
+        data = array.array('d', [0.5] * 100)
+        self.assertEqual(zig.sum(data), 50.0)
+        self.assertEqual(zig.sum(array.array('i', [1, 2, 3])), 6)
+        self.assertEqual(zig._lib.addresses[0], data.buffer_info()[0])
+        self.assertEqual(zig.sum([1.0, 2.5]), 3.5)
+
+    def test_element_wise_results_are_typed(self):
+        zig = _backend(ZigBackend)
+        data = array.array('d', [1.0, 2.0, 3.0])
+        result = zig.map_multiply(data, 2.0)
+        self.assertEqual(result, array.array('d', [2.0, 4.0, 6.0]))
+        # The kernel writes into a copy, not the caller's buffer
+        self.assertEqual(data, array.array('d', [1.0, 2.0, 3.0]))
+        self.assertEqual(zig.map_multiply([1, 2], 3.0), [3.0, 6.0])
+        go = _backend(GoBackend)
+        self.assertEqual(go.bitwise_and(array.array('i', [6, 7, 12]), 5), array.array('i', [4, 5, 4]))
+        self.assertEqual(go.bitwise_and([6, 7], 5), [4, 5])
+
+    def test_pipelines_hand_buffers_to_backends(self):
+        backend = get_backend()
+        saved = backend._zig_backend, backend.zig_threshold
+        zig = _backend(ZigBackend)
+        backend._zig_backend, backend.zig_threshold = zig, 10
+        try:
+            data = array.array('d', range(1000))
+            self.assertEqual(pipe(data).sum().get(), 499500.0)
+            self.assertEqual(pipe(memoryview(data)).sum().get(), 499500.0)
+            self.assertEqual(zig._lib.addresses, [data.buffer_info()[0]] * 2)
+        finally:
+            backend._zig_backend, backend.zig_threshold = saved
+        # Without a backend, buffers run through the Python implementations
+        self.assertEqual(pipe(data).filter(_ > 997).to_list(), [998.0, 999.0])
+        self.assertEqual(pipe(array.array('q', [6, 7])).bitwise_and(5).to_list(), [4, 5])
+
+
+class TestConversionCache(unittest.TestCase):
+
+    def test_repeated_aggregates_reuse_one_conversion(self):
+        zig = _backend(ZigBackend)
+        series = tuple(float(i) for i in range(2000))
+        misses = conversion_cache.misses
+        self.assertEqual(zig.sum(series), 1999000.0)
+        self.assertEqual(zig.max(series), 1999.0)
+        self.assertEqual(len(set(zig._lib.addresses)), 1)
+        self.assertEqual(conversion_cache.misses, misses + 1)
+        # Lists are only cached once frozen
+        data = [float(i) for i in range(2000)]
+        zig.sum(data)
+        self.assertEqual(conversion_cache.misses, misses + 1)
+        freeze(data)
+        try:
+            zig.sum(data)
+            zig.mean(data)
+            self.assertEqual(zig._lib.addresses[-1], zig._lib.addresses[-2])
+            self.assertEqual(conversion_cache.misses, misses + 2)
+        finally:
+            thaw(data)
+
+    def test_changed_lists_are_converted_again(self):
+        cache = ConversionCache(min_items=1)
+        data = cache.freeze([1.0, 2.0, 3.0])
+        first = cache.get(data, 'd', typed_copy)
+        self.assertIs(cache.get(data, 'd', typed_copy), first)
+        data.append(4.0)
+        self.assertEqual(cache.get(data, 'd', typed_copy).tolist(), [1.0, 2.0, 3.0, 4.0])
+        data[0] = 9.0
+        self.assertEqual(cache.get(data, 'd', typed_copy)[0], 9.0)
+        cache.thaw(data)
+        self.assertFalse(cache.cacheable(data))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_retained_elements_count_towards_the_cap(self):
+        cache = ConversionCache(min_items=1)
+        series = tuple(float(i) for i in range(1000))
+        values = cache.get(series, 'd', typed_copy)
+        held = sys.getsizeof(series) + len(series) * sys.getsizeof(1.0) + values.itemsize * len(values)
+        self.assertEqual(cache.nbytes, held)
+        cache.resize(held - 1)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ConversionCache(min_items=1)
+        first, second = tuple(range(100)), tuple(range(1, 101))
+        cache.get(first, 'd', typed_copy)
+        cache.resize(cache.nbytes * 3 // 2)
+        cache.get(second, 'd', typed_copy)
+        cache.get(first, 'd', typed_copy)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        cache.resize(0)
+        self.assertEqual(cache.nbytes, 0)
+        self.assertFalse(cache.cacheable(first))
+
+
+if __name__ == "__main__":
+    unittest.main()
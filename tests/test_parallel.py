@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Tests for parallel pipeline stages."""
+
+import unittest
+import array
+import itertools
+import math
+import operator
+import statistics
+import threading
+import time
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, Pipeline, PipelineError, _, get_executor, register_executor, shutdown_executors, warm_executor
+from pyfunc.aggregates import Aggregate, Mean, Variance
+from pyfunc.parallel import ChunkSizer, PrefetchStats
+from pyfunc.shared import SharedBlock, attached
+
+
+class TestParMap(unittest.TestCase):
+
+    def test_matches_map(self):
+        data = list(range(1000))
+        expected = pipe(data).map(_ * 3 + 1).to_list()
+        for chunksize in ('auto', 1, 7, 5000):
+            self.assertEqual(pipe(data).par_map(_ * 3 + 1, workers=4, chunksize=chunksize).to_list(), expected)
+        self.assertEqual(pipe(iter(data)).par_map(_ * 3 + 1, workers=3).to_list(), expected)
+        self.assertEqual(pipe([]).par_map(_ + 1).to_list(), [])
+
+    def test_unordered_returns_every_result(self):
+        def slow_for_small(x):
+            time.sleep(0.01 if x < 4 else 0)
+            return x * 2
+        result = pipe(range(40)).par_map(slow_for_small, workers=4, ordered=False, chunksize=2).to_list()
+        self.assertEqual(sorted(result), [x * 2 for x in range(40)])
+
+    def test_process_mode(self):
+        self.assertEqual(pipe([-3, 1, -2]).par_map(abs, workers=2, mode='process').to_list(), [3, 1, 2])
+        # Placeholders and pipelines are pickled to the workers
+        self.assertEqual(pipe(range(6)).par_map(_ * 2 + 1, workers=2, mode='process').to_list(), [1, 3, 5, 7, 9, 11])
+        per_row = Pipeline().map(_ * 10).sum()
+        self.assertEqual(pipe([[1, 2], [3]]).par_map(per_row, workers=2, mode='process').to_list(), [30, 30])
+
+    def test_take_cancels_outstanding_work(self):
+        calls = itertools.count()
+        lock = threading.Lock()
+        def tracked(x):
+            with lock:
+                next(calls)
+            return x
+        result = pipe(itertools.count()).par_map(tracked, workers=2, chunksize=1).take(5).to_list()
+        self.assertEqual(result, [0, 1, 2, 3, 4])
+        time.sleep(0.05)
+        # Only the bounded number of in-flight chunks ran past the limit
+        self.assertLess(next(calls), 20)
+
+    def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            pipe([1, 0, 2]).par_map(lambda x: 1 / x, workers=2, chunksize=1).to_list()
+
+    def test_options_are_validated(self):
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_map(_ + 1, mode='fiber')
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_map(_ + 1, workers=0)
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_map(_ + 1, chunksize='big')
+
+
+class TestAdaptiveChunks(unittest.TestCase):
+
+    def test_sizes_follow_measured_cost(self):
+        sizer = ChunkSizer('thread', workers=4)
+        self.assertEqual(sizer.next_size(), 8)
+        # Cheap elements: chunks grow towards the target duration
+        sizer.record(8, 8e-7)
+        self.assertEqual(sizer.next_size(), 20000)
+        # Expensive elements pull the running estimate back down
+        for _i in range(20):
+            sizer.record(10, 0.05)
+        self.assertEqual(sizer.next_size(), 1)
+
+    def test_chunks_shrink_towards_the_end(self):
+        sizer = ChunkSizer('thread', workers=2, size=1000)
+        sizer.record(1, 1e-9)
+        sizes = []
+        while sum(sizes) < 1000:
+            sizes.append(sizer.next_size())
+        self.assertEqual(sum(sizes), 1000)
+        self.assertEqual(sizes[0], 125)
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertEqual(sizes[-1], 1)
+
+    def test_uneven_costs_keep_order(self):
+        def uneven(x):
+            time.sleep(0.002 if x % 25 == 0 else 0.00002)
+            return -x
+        data = list(range(300))
+        self.assertEqual(pipe(data).par_map(uneven, workers=4).to_list(), [-x for x in data])
+        self.assertEqual(pipe(iter(data)).par_map(uneven, workers=4).to_list(), [-x for x in data])
+        self.assertEqual(pipe(data).par_reduce(_ + _, workers=4).get(), sum(data))
+
+
+class TestParReduce(unittest.TestCase):
+
+    def test_inferred_combiners(self):
+        data = list(range(1, 2001))
+        for chunksize in ('auto', 1, 3, 64, 5000):
+            self.assertEqual(pipe(data).par_reduce(_ + _, workers=4, chunksize=chunksize).get(), sum(data))
+            self.assertEqual(pipe(data).par_reduce(max, workers=4, chunksize=chunksize).get(), 2000)
+        self.assertEqual(pipe(iter(data[:20])).par_reduce(_ * _, workers=3, chunksize=4).get(), math.factorial(20))
+        self.assertEqual(pipe([5, 3, 9]).par_reduce(operator.xor, workers=2, chunksize=1).get(), 5 ^ 3 ^ 9)
+
+    def test_combine_keeps_input_order(self):
+        words = [str(i) for i in range(100)]
+        # String concatenation is associative but not commutative
+        result = pipe(words).par_reduce(lambda a, b: a + b, combine=operator.add, workers=4, chunksize=3).get()
+        self.assertEqual(result, ''.join(words))
+
+    def test_initializer_and_empty_input(self):
+        self.assertEqual(pipe(range(10)).par_reduce(_ + _, initializer=0, workers=2, chunksize=3).get(), 45)
+        self.assertEqual(pipe([]).par_reduce(_ + _, initializer=0).get(), 0)
+        with self.assertRaises(TypeError):
+            pipe([]).par_reduce(_ + _).get()
+
+    def test_aggregate_states(self):
+        data = [float(x % 13) for x in range(1000)]
+        self.assertAlmostEqual(pipe(data).par_reduce(Mean, workers=4, chunksize=37).get(), statistics.fmean(data))
+        self.assertAlmostEqual(pipe(iter(data)).par_reduce(Variance, workers=4, chunksize=37).get(),
+                               statistics.pvariance(data))
+
+    def test_process_mode(self):
+        self.assertEqual(pipe(range(100)).par_reduce(_ + _, workers=2, mode='process', chunksize=10).get(), 4950)
+        self.assertAlmostEqual(pipe(range(100)).par_reduce(Mean, workers=2, mode='process').get(), 49.5)
+
+    def test_unknown_combiner_is_an_error(self):
+        with self.assertRaises(PipelineError):
+            pipe([1, 2]).par_reduce(lambda a, b: a - b)
+        with self.assertRaises(PipelineError):
+            pipe(5).par_reduce(_ + _).get()
+
+
+class TestAsyncBoundary(unittest.TestCase):
+
+    def test_stages_run_on_their_own_threads(self):
+        threads = {'read': set(), 'parse': set(), 'write': set()}
+        def record(step):
+            def _record(x):
+                threads[step].add(threading.get_ident())
+                return x
+            return _record
+        result = (pipe(range(100)).map(record('read')).async_boundary(maxsize=4)
+                  .map(record('parse')).map(_ * 2).async_boundary().map(record('write')).to_list())
+        self.assertEqual(result, [x * 2 for x in range(100)])
+        read, parse, write = (threads[step] for step in ('read', 'parse', 'write'))
+        self.assertEqual(write, {threading.get_ident()})
+        self.assertEqual(len(read | parse | write), 3)
+
+    def test_bounded_queue_throttles_producer(self):
+        produced = []
+        def source():
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        stream = pipe(source()).async_boundary(maxsize=5).get()
+        self.assertEqual(next(stream), 0)
+        time.sleep(0.05)
+        # The queue, the element waiting to be put and the one handed out
+        self.assertLessEqual(len(produced), 7)
+        stream.close()
+
+    def test_early_stop_closes_upstream(self):
+        closed = threading.Event()
+        def source():
+            try:
+                yield from itertools.count()
+            finally:
+                closed.set()
+        self.assertEqual(pipe(source()).async_boundary(maxsize=2).take(3).to_list(), [0, 1, 2])
+        self.assertTrue(closed.wait(1))
+
+    def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            pipe([1, 0]).map(lambda x: 1 / x).async_boundary().to_list()
+        with self.assertRaises(PipelineError):
+            pipe([1]).async_boundary(maxsize=0)
+        self.assertEqual(pipe(5).async_boundary().get(), 5)
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def slow_source(self, n, delay=0.005):
+        for i in range(n):
+            time.sleep(delay)
+            yield i
+
+    def test_overlaps_source_with_downstream(self):
+        def slow_square(x):
+            time.sleep(0.005)
+            return x * x
+        start = time.monotonic()
+        result = pipe(self.slow_source(20)).prefetch(4).map(slow_square).to_list()
+        elapsed = time.monotonic() - start
+        self.assertEqual(result, [x * x for x in range(20)])
+        # Sequentially this takes 20 * 10ms
+        self.assertLess(elapsed, 0.17)
+
+    def test_stats_count_stalls(self):
+        stats = PrefetchStats()
+        self.assertEqual(pipe(self.slow_source(10)).prefetch(8, stats=stats).to_list(), list(range(10)))
+        self.assertEqual(stats.items, 10)
+        # A slow source leaves the consumer waiting for most elements
+        self.assertGreaterEqual(stats.stalls, 5)
+        self.assertGreater(stats.stall_time, 0)
+        fast = PrefetchStats()
+        stream = pipe(range(50)).prefetch(100, stats=fast).get()
+        time.sleep(0.05)
+        self.assertEqual(list(stream), list(range(50)))
+        self.assertEqual(fast.stalls, 0)
+
+    def test_first_closes_source(self):
+        closed = threading.Event()
+        def source():
+            try:
+                yield from itertools.count(7)
+            finally:
+                closed.set()
+        self.assertEqual(pipe(source()).prefetch(3).first().get(), 7)
+        self.assertTrue(closed.wait(1))
+
+    def test_errors_propagate(self):
+        def failing():
+            yield 1
+            raise OSError("read failed")
+        stream = pipe(failing()).prefetch(2).get()
+        self.assertEqual(next(stream), 1)
+        with self.assertRaises(OSError):
+            next(stream)
+        with self.assertRaises(PipelineError):
+            pipe([1]).prefetch(0)
+
+
+_WORKER_TAG = None
+
+
+def _tag_worker(tag):
+    global _WORKER_TAG
+    _WORKER_TAG = tag
+
+
+def _worker_tag(x):
+    return (_WORKER_TAG, os.getpid())
+
+
+class TestExecutorRegistry(unittest.TestCase):
+
+    def test_pools_are_reused_across_runs(self):
+        started = []
+        register_executor('test-reuse', max_workers=2, initializer=lambda: started.append(threading.get_ident()))
+        pool = get_executor('test-reuse')
+        for _i in range(3):
+            self.assertEqual(pipe(range(50)).par_map(_ * 2, executor='test-reuse', chunksize=5).to_list(),
+                             [x * 2 for x in range(50)])
+            self.assertEqual(pipe(range(50)).par_reduce(_ + _, executor='test-reuse').get(), 1225)
+        self.assertIs(get_executor('test-reuse'), pool)
+        self.assertLessEqual(len(started), 2)
+        # Unnamed stages share one pool per mode and size
+        self.assertEqual(pipe(range(5)).par_map(_ + 1, workers=3).to_list(), [1, 2, 3, 4, 5])
+        self.assertIs(get_executor('thread-3'), get_executor('thread-3'))
+
+    def test_process_pool_initializer_and_mode(self):
+        register_executor('test-process', mode='process', max_workers=2, initializer=_tag_worker, initargs=('ready',))
+        warm_executor('test-process')
+        # The pool's mode applies, so the placeholder is pickled to the workers
+        self.assertEqual(pipe(range(4)).par_map(_ * 3, executor='test-process').to_list(), [0, 3, 6, 9])
+        tags = pipe(range(20)).par_map(_worker_tag, executor='test-process', chunksize=1).to_list()
+        self.assertEqual({tag for tag, _pid in tags}, {'ready'})
+        self.assertNotIn(os.getpid(), {pid for _tag, pid in tags})
+
+    def test_warm_starts_every_thread(self):
+        started = []
+        register_executor('test-warm', max_workers=3, initializer=lambda: started.append(threading.get_ident()))
+        warm_executor('test-warm')
+        self.assertEqual(len(set(started)), 3)
+
+    def test_shutdown_restarts_on_next_use(self):
+        register_executor('test-restart', max_workers=1)
+        pool = get_executor('test-restart')
+        shutdown_executors()
+        self.assertEqual(pipe([1, 2]).par_map(_ + 1, executor='test-restart').to_list(), [2, 3])
+        self.assertIsNot(get_executor('test-restart'), pool)
+
+    def test_unknown_executor_is_an_error(self):
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_map(_ + 1, executor='test-missing').to_list()
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_reduce(_ + _, executor=4)
+        with self.assertRaises(PipelineError):
+            register_executor('test-bad', mode='fiber')
+
+
+def _shm_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+class PartitionTypes(Aggregate):
+    """Records the type each partition reaches the workers as."""
+
+    __slots__ = ('kinds',)
+
+    def __init__(self, kinds=()):
+        self.kinds = kinds
+
+    @classmethod
+    def from_iterable(cls, data):
+        return cls((type(data).__name__,))
+
+    def merge(self, other):
+        self.kinds += other.kinds
+        return self
+
+    def result(self):
+        return list(self.kinds)
+
+
+class TestSharedMemoryTransfer(unittest.TestCase):
+
+    def test_numeric_buffers_reach_workers_as_views(self):
+        before = _shm_blocks()
+        data = array.array('d', (i / 4 for i in range(20000)))
+        self.assertEqual(pipe(data).par_map(_ * 2, workers=2, mode='process').to_list(), [x * 2 for x in data])
+        self.assertAlmostEqual(pipe(data).par_reduce(Mean, workers=2, mode='process').get(), sum(data) / len(data))
+        kinds = pipe(data).par_reduce(PartitionTypes, workers=2, mode='process', chunksize=5000).get()
+        self.assertEqual(kinds, ['memoryview'] * 4)
+        self.assertEqual(_shm_blocks() - before, set())
+
+    def test_lists_and_early_stop(self):
+        before = _shm_blocks()
+        data = [float(i) for i in range(10000)]
+        result = pipe(data).par_map(_ + 1, workers=2, mode='process', transfer='shared_memory').take(3).to_list()
+        self.assertEqual(result, [1.0, 2.0, 3.0])
+        total = pipe(list(range(10000))).par_reduce(_ + _, workers=2, mode='process', transfer='shared_memory').get()
+        self.assertEqual(total, sum(range(10000)))
+        # Mixed types are pickled so ints stay ints
+        self.assertEqual(pipe([1, 2.5] * 10).par_map(_ * 2, workers=2, mode='process', transfer='shared_memory',
+                                                     chunksize=5).to_list(), [2, 5.0] * 10)
+        time.sleep(0.2)
+        self.assertEqual(_shm_blocks() - before, set())
+
+    def test_only_numeric_chunks_are_shared(self):
+        self.assertIsNone(SharedBlock.of([1.0, 2], min_items=1))
+        self.assertIsNone(SharedBlock.of(['a'], min_items=1))
+        self.assertIsNone(SharedBlock.of([2 ** 70], min_items=1))
+        self.assertIsNone(SharedBlock.of([1.0] * 10, min_items=100))
+        block = SharedBlock.of([3, 1, 2], min_items=1)
+        try:
+            with attached(block.ref, worker=False) as view:
+                self.assertEqual((view.format, view.tolist()), ('q', [3, 1, 2]))
+        finally:
+            block.release()
+        with self.assertRaises(PipelineError):
+            pipe([1]).par_map(_ + 1, transfer='mmap')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -442,6 +442,102 @@ class TestPipeline(unittest.TestCase):
         result_empty = Pipeline(empty_data).reverse().to_list()
         self.assertEqual(result_empty, [])
 
+    def test_stage_list(self):
+        p = Pipeline([1, 2, 3]).map(_ * 2).filter(_ > 2).sum()
+        self.assertEqual([stage.op for stage in p.stages], ['map', 'filter', 'sum'])
+        self.assertEqual(p.stages[0].args[0]._func(4), 8)
+        self.assertEqual(p.get(), 10)
+        self.assertEqual(p([5]), 10)
+
+        # Chaining never mutates the parent pipeline
+        base = Pipeline([1, 2, 3]).map(_ + 1)
+        base.filter(_ > 2)
+        self.assertEqual(len(base.stages), 1)
+        self.assertEqual(base.to_list(), [2, 3, 4])
+
+    def test_deep_pipeline(self):
+        p = Pipeline(0)
+        for _i in range(5000):
+            p = p.apply(increment)
+        self.assertEqual(p.get(), 5000)
+
+    def test_streaming_terminals(self):
+        import itertools
+        import statistics
+        # Infinite or one-shot inputs are never materialized
+        self.assertFalse(Pipeline(itertools.count()).is_empty().get())
+        self.assertTrue(Pipeline(iter([])).is_empty().get())
+        self.assertEqual(Pipeline(x for x in range(100000)).count().get(), 100000)
+        self.assertEqual(Pipeline(iter(range(10))).last().get(), 9)
+        self.assertEqual(Pipeline(itertools.count()).nth(5).get(), 5)
+        self.assertEqual(Pipeline(iter(range(3))).nth(5).get(), None)
+        self.assertEqual(Pipeline(iter([3, 1, 2])).min().get(), 1)
+        self.assertIsNone(Pipeline(iter([])).max().get())
+        self.assertEqual(Pipeline(iter([1, 2, 3])).reduce_right(lambda x, acc: x - acc).get(), 2)
+
+        data = [2.5, 1.0, 4.0, 7.5, 3.25]
+        self.assertAlmostEqual(Pipeline(iter(data)).stdev().get(), statistics.pstdev(data))
+        with self.assertRaises(ValueError):
+            Pipeline(iter([1])).stdev().get()
+
+        # Chunks and windows stream the same lists the list path slices
+        for size, step in ((3, 1), (2, 2), (2, 3), (5, 1)):
+            self.assertEqual(Pipeline(iter(range(7))).window(size, step).to_list(),
+                             Pipeline(list(range(7))).window(size, step).to_list())
+        self.assertEqual(Pipeline(iter(range(5))).chunk(2).to_list(), [[0, 1], [2, 3], [4]])
+        self.assertEqual(Pipeline(itertools.count()).sliding_reduce(sum, 3).take(2).to_list(), [3, 6])
+        # Widths below 1 are rejected the same way on both paths
+        for source in (list(range(5)), iter(range(5))):
+            for build in (lambda p: p.chunk(0), lambda p: p.window(0), lambda p: p.window(2, 0),
+                          lambda p: p.sliding_reduce(sum, -1)):
+                with self.assertRaises(ValueError):
+                    build(Pipeline(source)).to_list()
+
+    def test_describe(self):
+        import math
+        import statistics
+        from pyfunc import PipelineError
+        from pyfunc.backends import get_backend
+        data = [2.5, 1.0, 4.0, 7.5, 3.25]
+        stats = Pipeline(iter(data)).describe().get()
+        self.assertEqual((stats['count'], stats['sum'], stats['min'], stats['max']), (5, 18.25, 1.0, 7.5))
+        self.assertAlmostEqual(stats['mean'], statistics.fmean(data))
+        self.assertAlmostEqual(stats['stdev'], statistics.pstdev(data))
+        self.assertAlmostEqual(stats['variance'], statistics.pvariance(data))
+        quartiles = Pipeline(list(range(1, 101))).describe(percentiles=[0.25, 0.5, 0.999]).get()
+        self.assertEqual((quartiles['25%'], quartiles['50%']), (25.75, 50.5))
+        self.assertAlmostEqual(quartiles['99.9%'], 99.901)
+        self.assertEqual(quartiles['sum'], 5050)
+        empty = Pipeline([]).describe().get()
+        self.assertEqual(empty['count'], 0)
+        self.assertTrue(math.isnan(empty['mean']))
+        single = Pipeline([4.0]).describe().get()
+        self.assertEqual((single['count'], single['mean'], single['min']), (1, 4.0, 4.0))
+        self.assertTrue(math.isnan(single['stdev']) and math.isnan(single['variance']))
+        with self.assertRaises(PipelineError):
+            Pipeline(data).describe(percentiles=[50])
+
+        class BatchZig:
+            calls = 0
+            def batch_statistics(self, values):
+                BatchZig.calls += 1
+                mean = sum(values) / len(values)
+                stdev = statistics.pstdev(values)
+                return {'sum': float(sum(values)), 'mean': mean, 'min': float(min(values)),
+                        'max': float(max(values)), 'stdev': stdev}
+
+        backend = get_backend()
+        saved = backend._zig_backend, backend.zig_threshold
+        backend._zig_backend, backend.zig_threshold = BatchZig(), 100
+        try:
+            # Generators large enough for the kernel are collected once and summarized in one call
+            stats = Pipeline(x for x in range(1000)).describe().get()
+            self.assertEqual(BatchZig.calls, 1)
+            self.assertEqual((stats['count'], stats['sum'], stats['max']), (1000, 499500, 999))
+            self.assertAlmostEqual(stats['variance'], statistics.pvariance(range(1000)))
+        finally:
+            backend._zig_backend, backend.zig_threshold = saved
+
 
 if __name__ == "__main__":
     unittest.main()
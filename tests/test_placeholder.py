@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Tests for Placeholder expression trees."""
+
+import unittest
+import copy
+import pickle
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, Pipeline, Placeholder, PipelineError, _
+from pyfunc.expr import Arg, Attr, BinOp, Call, Const, Item, UnaryOp, load, simplify
+from pyfunc.placeholder import PICKLE_VERSION, _restore_placeholder
+from pyfunc.backends.cpp_backend import _lower_expression
+
+class TestExpressionTree(unittest.TestCase):
+
+    def test_nodes(self):
+        node = (_['a'] * 2 + 1)._node
+        self.assertIsInstance(node, BinOp)
+        self.assertEqual(node.op, '+')
+        self.assertEqual(node.left, BinOp('*', Item(Arg(), Const('a')), Const(2)))
+        self.assertEqual((-_.x)._node, UnaryOp('-', Attr(Arg(), 'x')))
+        self.assertEqual(_.strip()._node, Call(Attr(Arg(), 'strip')))
+        self.assertEqual(Placeholder(len)._node, Call(Const(len), (Arg(),)))
+
+    def test_structural_key_and_hash(self):
+        self.assertEqual((_ * 2 + 1)._key, (_ * 2 + 1)._key)
+        self.assertEqual(hash(_['a'] > 3), hash(_['a'] > 3))
+        self.assertNotEqual((_ + 1)._key, (_ + 1.0)._key)
+        self.assertNotEqual((_ + 1)._key, (_ + True)._key)
+        self.assertNotEqual((_ - 1)._key, (1 - _)._key)
+        cache = {(_ * 2)._key: 'double'}
+        self.assertEqual(cache[(_ * 2)._key], 'double')
+        # == still builds an expression
+        self.assertIsInstance(_ == 1, Placeholder)
+
+    def test_reverse_operators(self):
+        self.assertEqual((10 - _)._func(3), 7)
+        self.assertEqual((1 / _)._func(4), 0.25)
+        self.assertEqual((2 ** _)._func(3), 8)
+        self.assertEqual(pipe([1, 2]).map(10 - _).to_list(), [9, 8])
+
+    def test_evaluation(self):
+        self.assertEqual((_.real + _.imag)._func(3 + 4j), 7)
+        self.assertEqual(_.split(',', maxsplit=1)._func('a,b,c'), ['a', 'b,c'])
+        self.assertEqual(abs(_ - 5)._func(2), 3)
+        self.assertIs(Placeholder(len)._func, len)
+
+    def test_as_reducer(self):
+        self.assertEqual((_ + _).as_reducer()(2, 3), 5)
+        self.assertEqual((_ * 2 + _).as_reducer()(2, 3), 7)
+        self.assertEqual(pipe([1, 2, 3]).reduce(_ * _).get(), 6)
+        with self.assertRaises(TypeError):
+            _.x.as_reducer()
+
+    def test_cpp_lowering(self):
+        self.assertEqual(_lower_expression((_ * 2)._node, 'map'), 'mul_2')
+        self.assertEqual(_lower_expression((_ - 2.5)._node, 'map'), 'sub_2.5')
+        self.assertEqual(_lower_expression((3 + _)._node, 'map'), 'add_3')
+        self.assertEqual(_lower_expression((3 < _)._node, 'filter'), 'gt_3')
+        self.assertEqual(_lower_expression((_ + _)._node, 'reduce'), 'add_0')
+        # No exact native equivalent
+        self.assertIsNone(_lower_expression((3 - _)._node, 'map'))
+        self.assertIsNone(_lower_expression((_ > 3)._node, 'map'))
+        self.assertIsNone(_lower_expression((_ * 2 + 1)._node, 'map'))
+        self.assertIsNone(_lower_expression((_ + 1)._node, 'reduce'))
+        self.assertIsNone(_lower_expression((_ % 2 == 0)._node, 'filter'))
+
+
+class TestSimplify(unittest.TestCase):
+
+    def test_folding_and_identities(self):
+        cases = [
+            ((_ * 2) * 3, _ * 6),
+            (_ + 0, _),
+            (1 * _, _),
+            (-(-_), _),
+            ((_ + 1) - 1, _),
+            ((_ - 3) + 1, _ - 2),
+            (_ * (2 + 3), _ * 5),
+            (-(-_) > 2 ** 3, _ > 8),
+        ]
+        for expr, expected in cases:
+            self.assertEqual(simplify(expr._node, integral=True), expected._node)
+
+    def test_identities_need_integral(self):
+        # Without a known int argument only constants are folded
+        self.assertEqual(simplify((_ + (2 + 3))._node), (_ + 5)._node)
+        self.assertEqual(simplify((-(-_.x) > 2 ** 3)._node), (-(-_.x) > 8)._node)
+        for expr in (_ + 0, 1 * _, -(-_), ~(~_), +_, _ ** 1, (_ + 1) - 1, (_ * 2) * 3, _['k'] + 0):
+            self.assertEqual(simplify(expr._node), expr._node)
+
+    def test_untyped_pipelines_run_expressions_as_written(self):
+        # Ordinary pipelines fold constants only; the identities need a typed int pipeline
+        self.assertEqual(str(pipe([-0.0]).map(_ + 0).to_list()[0]), '0.0')
+        self.assertEqual(pipe([1e-20]).map((_ + 1) - 1).to_list(), [0.0])
+        self.assertEqual(pipe([True]).map(-(-_)).to_list(), [1])
+        self.assertIs(type(pipe([True]).map(-(-_)).to_list()[0]), int)
+        with self.assertRaises(TypeError):
+            pipe(['a']).map(_ + 0).to_list()
+        self.assertEqual(pipe([1.5, 0.5]).sort(key=(_ * 2) * 3).to_list(), [0.5, 1.5])
+        self.assertEqual(pipe([True, 2]).filter(_ * 1).to_list(), [True, 2])
+
+    def test_unsafe_rewrites_are_skipped(self):
+        for expr in ((_ * 3) * 3, _ / 1, _ + 0.0, (_ + 0.5) - 0.5, _ + True, _.x + 0, (_ / 2) + 0, _ ** -1 * 1):
+            self.assertEqual(simplify(expr._node, integral=True), expr._node)
+        # Arithmetic turns a bool into an int, so boolean operands keep it
+        for expr in ((_ > 3) + 0, 1 * (_ == 2), ((_ > 1) & (_ < 5)) * 1, ((_ > 3) + 1) - 1, -(-(_ > 3))):
+            self.assertEqual(simplify(expr._node, integral=True), expr._node)
+            self.assertIs(type(expr._func(4)), int)
+        # Constant folding never builds unbounded values
+        big = BinOp('**', Const(2), Const(10 ** 9))
+        self.assertIs(simplify(big), big)
+
+    def test_simplified_results_match(self):
+        exprs = [_ + 0, 0 + _, _ - 0, _ * 1, 1 * _, _ ** 1, +_, -(-_), ~(~_), (_ + 1) - 1, (_ * 2) * 3,
+                 _['k'] + 0, (_ + (1 + 1)) * 1]
+        values = [True, False, 'a', [1], {1}, 1e-20, 2.5, -0.0, {'k': True}, -7, 0, 10 ** 20]
+
+        def outcome(func, value):
+            try:
+                result = func(value)
+            except Exception as exc:
+                return type(exc)
+            return type(result), result
+
+        for expr in exprs:
+            for value in values:
+                with self.subTest(expr=expr._node, value=value):
+                    expected = outcome(expr._node.evaluator(), value)
+                    self.assertEqual(outcome(expr._func, value), expected)
+                    if type(value) is int:
+                        integral = simplify(expr._node, integral=True).evaluator()
+                        self.assertEqual(outcome(integral, value), expected)
+        # A new list, not the argument itself
+        data = [1]
+        self.assertIsNot(pipe([data]).map(_ * 1).to_list()[0], data)
+        self.assertEqual(pipe([True, False]).map(_ + 0).to_list(), [1, 0])
+
+    def test_accessor_chains(self):
+        data = {'a': {'b': [10, 20]}}
+        self.assertEqual(_['a']['b']._func(data), [10, 20])
+        self.assertEqual(_['a']['b'][1]._func(data), 20)
+        self.assertEqual(_.real.imag._func(3 + 4j), 0)
+        self.assertEqual(pipe([data]).map(_['a']['b'][0] + 1).to_list(), [11])
+
+
+class TestPickling(unittest.TestCase):
+
+    def test_round_trip(self):
+        exprs = [_ * 2 + 1, 10 - _, _['a']['b'][0], _.strip().split(',', maxsplit=1),
+                 -_.x ** 2, abs(_) % 3, Placeholder(len), _ >> (_ + 1)]
+        values = [4, 4, {'a': {'b': [7]}}, ' a,b,c ', type('P', (), {'x': 3}), -7, 'abc', 2]
+        for expr, value in zip(exprs, values):
+            restored = pickle.loads(pickle.dumps(expr))
+            self.assertEqual(restored._key, expr._key)
+            self.assertEqual(restored._func(value), expr._func(value))
+        self.assertEqual(load((_ + 1.5)._node.dump()), (_ + 1.5)._node)
+
+    def test_restored_expressions_are_cached(self):
+        first = pickle.loads(pickle.dumps(_ * 2))
+        self.assertIs(pickle.loads(pickle.dumps(_ * 2)), first)
+        # 2 and 2.0 pickle differently and stay apart
+        self.assertIsNot(pickle.loads(pickle.dumps(_ * 2.0)), first)
+        with self.assertRaises(PipelineError):
+            _restore_placeholder(PICKLE_VERSION + 1, pickle.dumps(ARG_DUMP))
+
+    def test_dunder_lookups_are_missing(self):
+        self.assertFalse(hasattr(_, '__wrapped__'))
+        self.assertIsNone(getattr(_ + 1, '__name__', None))
+        self.assertEqual(copy.deepcopy(_.x + 1)._key, (_.x + 1)._key)
+        self.assertIsInstance(_._private, Placeholder)
+
+    def test_pipeline_round_trip(self):
+        p = Pipeline().map(_ * 2).filter(_ > 2).map({'v': _, 'double': _ * 2}).take(2)
+        restored = pickle.loads(pickle.dumps(p))
+        self.assertEqual(list(restored([1, 2, 3])), list(p([1, 2, 3])))
+        self.assertEqual([s.op for s in restored.stages], [s.op for s in p.stages])
+        self.assertIs(pickle.loads(pickle.dumps(p)), restored)
+        with_value = pickle.loads(pickle.dumps(pipe([3, 1, 2]).sort().optimize()))
+        self.assertEqual(with_value.get(), [1, 2, 3])
+        self.assertTrue(with_value._options['optimize'])
+
+
+ARG_DUMP = Arg().dump()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Tests for pipeline plans: fusion, compilation and optimization."""
+
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections.abc import Iterator
+import operator
+
+from pyfunc import pipe, Pipeline, _
+from pyfunc.backends.backend_selector import BackendSelector
+from pyfunc.plan import SizedIterator, size_hint
+
+class TestFusion(unittest.TestCase):
+
+    def test_fused_matches_unfused(self):
+        data = list(range(100))
+        build = lambda p: (p.map(_ * 3).filter(lambda x: x % 2 == 0).skip(2)
+                            .map(lambda x: x + 1).take_while(_ < 250).take(20))
+        fused = build(pipe(data)).to_list()
+        unfused = build(pipe(data).fuse(False)).to_list()
+        self.assertEqual(fused, unfused)
+        self.assertEqual([s.op for s in build(pipe(data))._physical_stages()], ['fused'])
+
+    def test_take_stops_pulling_upstream(self):
+        for fuse in (True, False):
+            pulled = []
+            def source():
+                for i in range(10):
+                    pulled.append(i)
+                    yield i
+            result = pipe(source()).fuse(fuse).map(_ * 2).take(3).to_list()
+            self.assertEqual(result, [0, 2, 4])
+            self.assertEqual(pulled, [0, 1, 2])
+            # A failure just past the taken elements is never reached
+            self.assertEqual(pipe(range(5)).fuse(fuse).map(lambda x: 1 // (x - 3)).take(3).to_list(), [-1, -1, -1])
+
+    def test_non_iterable_input_keeps_stage_semantics(self):
+        self.assertEqual(pipe(5).map(_ * 2).to_list(), [10])
+        self.assertEqual(pipe("ab").map(str.upper).to_list(), ["AB"])
+
+
+class TestCompile(unittest.TestCase):
+
+    def test_compiled_matches_call(self):
+        p = (Pipeline().map(_ * 2 + 1).filter(_ % 3 != 0).skip(1)
+             .map(lambda v: v - 1).take(5).map(-_).take(3).sum())
+        f = p.compile()
+        for data in ([], list(range(50)), range(7)):
+            self.assertEqual(f(data), p(data))
+        self.assertIs(p.compile(), f)
+
+    def test_placeholders_are_inlined(self):
+        p = Pipeline().map(_['a'] * 2 + 1)
+        f = p.compile()
+        self.assertIn("x[('a')] * (2)", f.__pyfunc_source__)
+        self.assertEqual(list(f([{'a': 1}, {'a': 5}])), [3, 11])
+
+    def test_scalar_and_string_stages(self):
+        p = Pipeline().apply(_.strip().upper()).explode().map(_ * 2)
+        self.assertEqual(list(p.compile()("  ab ")), ['AA', 'BB'])
+        self.assertEqual(Pipeline().apply(_ * 2 + 1).compile()(4), 9)
+        self.assertEqual(list(Pipeline().map(_ + 1).compile()(4)), [5])
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def assertEquivalent(self, build, *inputs):
+        for data in inputs:
+            optimized = build(pipe(data)).optimize()
+            self.assertEqual(optimized.to_list(), build(pipe(data)).to_list())
+            self.assertEqual(optimized.fuse(False).to_list(), build(pipe(data)).to_list())
+            compiled = build(Pipeline()).optimize().compile()
+            self.assertEqual(pipe(compiled(data)).to_list(), build(pipe(data)).to_list())
+        return [s.op for s in build(Pipeline()).optimize()._optimized_stages()]
+
+    def test_filter_pushed_through_template(self):
+        calls = []
+        def expensive(x):
+            calls.append(x)
+            return x ** 3
+        build = lambda p: (p.map({'id': _ * 1, 'score': expensive, 'tag': _ % 3})
+                           .filter(_['id'] > 6).map(_['score']))
+        ops = self.assertEquivalent(build, list(range(10)), [])
+        self.assertEqual(ops, ['filter', 'map', 'map'])
+        calls.clear()
+        build(pipe(range(10))).optimize().to_list()
+        self.assertEqual(calls, [7, 8, 9])
+
+    def test_filter_reading_whole_value_stays(self):
+        build = lambda p: p.map({'id': _ * 2, 'tag': _ % 3}).filter(lambda d: d['id'] > 6)
+        self.assertEqual(self.assertEquivalent(build, list(range(10))), ['map', 'filter'])
+        build = lambda p: p.map(_ * 2).filter(_ > 6)
+        self.assertEqual(self.assertEquivalent(build, list(range(10))), ['map', 'filter'])
+
+    def test_filter_moves_ahead_of_sort(self):
+        build = lambda p: p.sort(key=-_).unique().filter(_ % 2 == 0)
+        ops = self.assertEquivalent(build, [5, 2, 8, 2, 7, 4], [])
+        self.assertEqual(ops, ['filter', 'sort', 'unique'])
+        build = lambda p: p.reverse().filter(_ > 1)
+        self.assertEqual(self.assertEquivalent(build, [1, 2, 3, 4], []), ['filter', 'reverse'])
+        self.assertEqual(pipe([1, 2, 3, 4]).reverse().filter(_ > 1).optimize().to_list(), [4, 3, 2])
+
+    def test_limits_pushed_towards_source(self):
+        build = lambda p: p.map(_ + 1).skip(2).map(str).take(5).take(3)
+        ops = self.assertEquivalent(build, list(range(20)), list(range(3)), [])
+        self.assertEqual(ops, ['take', 'map', 'skip', 'map'])
+        build = lambda p: p.filter(_ > 3).map(_ * 2).map(-_).first()
+        ops = self.assertEquivalent(build, list(range(10)), [])
+        self.assertEqual(ops, ['filter', 'take', 'map', 'map', 'first'])
+
+    def test_redundant_sort_dropped(self):
+        for terminal in ('sum', 'count', 'min', 'max'):
+            build = lambda p: getattr(p.sort(reverse=True).map(_ * 2).filter(_ > 2), terminal)()
+            ops = self.assertEquivalent(build, [4, 1, 9, 3])
+            self.assertEqual(ops, ['map', 'filter', terminal])
+        build = lambda p: p.sort().map(_ * 2).take(2).sum()
+        self.assertEqual(self.assertEquivalent(build, [4, 1, 9, 3]), ['top_k', 'map', 'sum'])
+
+    def test_disabled_by_default(self):
+        p = pipe([3, 1, 2]).sort().sum()
+        self.assertEqual([s.op for s in p._physical_stages()], ['sort', 'sum'])
+        self.assertEqual([s.op for s in p.optimize()._physical_stages()], ['sum'])
+        self.assertIn("executed: sum()", p.optimize().explain())
+
+
+class TestTopK(unittest.TestCase):
+
+    data = [(3, 'a'), (1, 'b'), (3, 'c'), (2, 'd'), (1, 'e'), (3, 'f')]
+
+    def test_sort_take_matches_full_sort(self):
+        for key, unwrapped in ((None, None), (_[0], lambda t: t[0]), (-_[0], lambda t: -t[0])):
+            for reverse in (False, True):
+                expected = sorted(self.data, key=unwrapped, reverse=reverse)
+                for k in (0, 1, 2, 4, 10):
+                    p = pipe(self.data).sort(key=key, reverse=reverse).take(k)
+                    self.assertEqual(p.to_list(), expected[:k])
+                self.assertEqual(pipe(self.data).sort(key=key, reverse=reverse).first().get(), expected[0])
+                self.assertEqual(pipe(self.data).sort(key=key, reverse=reverse).last().get(), expected[-1])
+
+    def test_rewritten_stages(self):
+        ops = lambda p: [s.op for s in p._physical_stages()]
+        self.assertEqual(ops(pipe([]).sort().take(3)), ['top_k'])
+        # The selection still comes back as an iterator, like take()'s
+        self.assertIsInstance(pipe([3, 1, 2]).sort().take(2).get(), Iterator)
+        self.assertEqual(list(pipe([3, 1, 2]).sort().take(2).get()), [1, 2])
+        self.assertIsInstance(pipe([3, 1, 2]).top_k(2).get(), list)
+        self.assertEqual(ops(pipe([]).sort(reverse=True).first()), ['sort_first'])
+        self.assertEqual(ops(pipe([]).sort().last()), ['sort_last'])
+        self.assertIsNone(pipe([]).sort().first().get())
+        self.assertIsNone(pipe(iter([])).sort().last().get())
+
+    def test_top_k(self):
+        self.assertEqual(pipe([5, 1, 9, 3, 7]).top_k(2).get(), [9, 7])
+        self.assertEqual(pipe([5, 1, 9, 3, 7]).top_k(2, reverse=False).get(), [1, 3])
+        self.assertEqual(pipe(self.data).top_k(3, key=_[0]).get(), [(3, 'a'), (3, 'c'), (3, 'f')])
+        self.assertEqual(pipe(iter(range(100000))).map(_ % 1000).top_k(3).get(), [999, 999, 999])
+
+
+class TestSizeHints(unittest.TestCase):
+
+    def hint_after(self, p):
+        return p.apply(operator.length_hint).get()
+
+    def test_hints_propagate(self):
+        for fuse in (True, False):
+            base = pipe(range(1000)).fuse(fuse)
+            self.assertEqual(self.hint_after(base.map(_ + 1)), 1000)
+            # Filters give an upper bound, which is only used as an estimate
+            self.assertEqual(self.hint_after(base.filter(_ > 5).map(_ * 2)), 0)
+            self.assertEqual(base.filter(_ > 5).map(_ * 2).apply(size_hint).get(), 1000)
+            self.assertEqual(base.filter(_ > 5).take(10).apply(size_hint).get(), 10)
+            self.assertEqual(self.hint_after(base.map(_ + 1).take(10)), 10)
+            self.assertEqual(self.hint_after(base.skip(990)), 10)
+            self.assertEqual(self.hint_after(base.chunk(64)), 16)
+            self.assertEqual(self.hint_after(base.window(10, 5)), 199)
+        # Unknown input sizes stay unknown
+        self.assertEqual(self.hint_after(pipe(x for x in range(5)).map(_ + 1)), 0)
+
+    def test_results_are_unchanged(self):
+        self.assertNotIsInstance(pipe(range(5)).map(_ + 1).get(), SizedIterator)
+        self.assertEqual(pipe(range(5)).map(_ + 1).take(3).to_list(), [1, 2, 3])
+        self.assertEqual(pipe(range(7)).chunk(3).map(len).to_list(), [3, 3, 1])
+
+    def test_dispatch_uses_hints(self):
+        selector = BackendSelector()
+        selector.rust_threshold = 100
+        selector._rust_available = True
+        lazy = pipe(range(500)).map(_ + 1).apply(lambda v: selector.should_use_rust(v, 'median'))
+        self.assertTrue(lazy.get())
+        self.assertFalse(pipe(range(50)).map(_ + 1).apply(lambda v: selector.should_use_rust(v, 'median')).get())
+        self.assertTrue(pipe(range(500)).filter(_ > 1).apply(lambda v: selector.should_use_rust(v, 'median')).get())
+        self.assertTrue(selector.may_accelerate('median', -1))
+        self.assertFalse(selector.may_accelerate('median', 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for chunked streaming into native kernels."""
+
+import unittest
+import statistics
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, _
+from pyfunc.backends import get_backend
+from pyfunc.backends.streaming import CHUNK_SIZE, fold_chunks, iter_chunks, map_chunks
+from pyfunc.statistics import merge_moments, moments
+
+
+class RecordingZig:
+    """Stands in for a loaded Zig backend and records the chunk sizes it is given."""
+
+    def __init__(self):
+        self.calls = []
+
+    def sum(self, data):
+        self.calls.append(len(data))
+        return sum(data)
+
+    def batch_statistics(self, data):
+        self.calls.append(len(data))
+        return {'mean': statistics.fmean(data), 'stdev': statistics.pstdev(data)}
+
+
+class TestChunkHelpers(unittest.TestCase):
+
+    def test_iter_chunks_reuses_one_buffer(self):
+        chunks = [(id(chunk), list(chunk)) for chunk in iter_chunks(iter(range(10)), 4)]
+        self.assertEqual([c for _i, c in chunks], [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertEqual(len({i for i, _c in chunks}), 1)
+
+    def test_fold_chunks_falls_back_per_chunk(self):
+        native = lambda chunk: sum(chunk) if len(chunk) == 4 else NotImplemented
+        self.assertEqual(fold_chunks(iter(range(10)), native, sum, lambda a, b: a + b, chunk_size=4), 45)
+        self.assertEqual(fold_chunks(iter([]), native, sum, lambda a, b: a + b, default=0), 0)
+
+    def test_map_chunks_keeps_order(self):
+        def failing(chunk):
+            raise RuntimeError("kernel failed")
+        doubled = lambda chunk: (x * 2 for x in chunk)
+        for native in (doubled, failing, None):
+            result = list(map_chunks(iter(range(10)), native, doubled, chunk_size=3))
+            self.assertEqual(result, [x * 2 for x in range(10)])
+
+    def test_merged_moments_match(self):
+        data = [1.5, 2.0, 8.25, -3.0, 4.0, 4.0, 10.5]
+        merged = merge_moments(moments(data[:3]), moments(data[3:]))
+        n, mean, m2 = moments(data)
+        self.assertEqual(merged[0], n)
+        self.assertAlmostEqual(merged[1], mean)
+        self.assertAlmostEqual(merged[2], m2)
+
+
+class TestNativeStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = get_backend()
+        self.saved = self.backend._zig_backend, self.backend.zig_threshold
+        self.zig = RecordingZig()
+        self.backend._zig_backend = self.zig
+        self.backend.zig_threshold = 1000
+
+    def tearDown(self):
+        self.backend._zig_backend, self.backend.zig_threshold = self.saved
+
+    def test_sum_streams_in_chunks(self):
+        n = 2 * CHUNK_SIZE + 500
+        self.assertEqual(pipe(x for x in range(n)).sum().get(), n * (n - 1) // 2)
+        # The short tail is below the threshold and summed in Python
+        self.assertEqual(self.zig.calls, [CHUNK_SIZE, CHUNK_SIZE])
+
+    def test_stdev_merges_chunk_moments(self):
+        data = [float(x % 97) for x in range(CHUNK_SIZE + 5000)]
+        self.assertAlmostEqual(pipe(iter(data)).stdev().get(), statistics.pstdev(data))
+        self.assertEqual(self.zig.calls, [CHUNK_SIZE, 5000])
+
+    def test_small_hinted_streams_stay_in_python(self):
+        self.assertEqual(pipe(range(500)).map(_ + 1).sum().get(), sum(range(1, 501)))
+        self.assertEqual(self.zig.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
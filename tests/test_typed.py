@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Tests for typed numeric pipelines."""
+
+import unittest
+import array
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyfunc import pipe, pipe_array, PipelineError, _
+from pyfunc.backends import get_backend
+from pyfunc.backends.zig_backend import ZigBackend
+
+
+def _wraps(value, bits=64):
+    return not -2 ** (bits - 1) <= value < 2 ** (bits - 1)
+
+
+class FakeZigLibrary:
+    """The integer kernels of the Zig library, recording which ones ran."""
+
+    def __init__(self):
+        self.calls = []
+
+    def zig_sum_i32(self, data, size):
+        self.calls.append('sum_i32')
+        return sum(data[:size])
+
+    def zig_sum_i64(self, data, size, overflow):
+        self.calls.append('sum_i64')
+        total = sum(data[:size])
+        overflow._obj.value = _wraps(total)
+        return total
+
+    def zig_max_i64(self, data, size):
+        self.calls.append('max_i64')
+        return max(data[:size])
+
+    def zig_map_add_i64(self, data, size, addend):
+        self.calls.append('map_add_i64')
+        results = [value + addend for value in data[:size]]
+        # ctypes stores the wrapped value, as the kernel would
+        data[:size] = results
+        return any(_wraps(value) for value in results)
+
+
+def _zig(has_int64=True):
+    zig = ZigBackend.__new__(ZigBackend)
+    zig._lib = FakeZigLibrary()
+    zig._available = True
+    zig._has_int64 = has_int64
+    return zig
+
+
+class TestDtypes(unittest.TestCase):
+
+    def test_inferred_from_source(self):
+        self.assertEqual(pipe_array([1, 2]).dtype, 'int64')
+        self.assertEqual(pipe_array([1, 2.5]).dtype, 'float64')
+        self.assertEqual(pipe_array(array.array('f', [1.0])).dtype, 'float32')
+        self.assertEqual(pipe_array(array.array('Q', [1])).dtype, 'uint64')
+        self.assertEqual(pipe_array(array.array('h', [1])).dtype, 'int64')
+        with self.assertRaises(PipelineError):
+            pipe_array([1], dtype='int8')
+
+    def test_propagated_through_placeholders(self):
+        ints = pipe_array([1, 2, 3])
+        self.assertEqual(ints.map(_ * 2 + 1).dtype, 'int64')
+        self.assertEqual(ints.map(_ / 2).dtype, 'float64')
+        self.assertEqual(ints.map(_ * 2.5).dtype, 'float64')
+        self.assertEqual(ints.map(-abs(_) & 6).dtype, 'int64')
+        self.assertEqual(pipe_array(array.array('f', [1.0])).map(_ * 2.5 - 1).dtype, 'float32')
+        self.assertEqual(ints.map(lambda x: x * 3).dtype, 'int64')
+        with self.assertRaises(PipelineError):
+            ints.map(_ > 1)
+        with self.assertRaises(PipelineError):
+            pipe_array([1.5]).map(_ & 1)
+        self.assertEqual(ints.map(_ > 1, dtype='int64').to_list(), [0, 1, 1])
+
+    def test_results_stay_typed(self):
+        result = pipe_array([1, 2, 3, 4]).map(_ * 10).filter(_ > 15).to_array()
+        self.assertEqual(result, array.array('q', [20, 30, 40]))
+        halves = pipe_array(array.array('f', [1.0, 3.0])).map(_ / 2).to_array()
+        self.assertEqual(halves, array.array('f', [0.5, 1.5]))
+        self.assertEqual(pipe_array(array.array('d', [1.7, -2.7])).astype('int64').to_list(), [1, -2])
+        with self.assertRaises(PipelineError):
+            pipe_array([1, 2]).map(lambda x: x / 3).to_list()
+
+    def test_out_of_range_results_raise(self):
+        with self.assertRaises(PipelineError):
+            pipe_array(array.array('Q', [0])).map(_ - 1).to_list()
+        with self.assertRaises(PipelineError):
+            pipe_array([2 ** 62]).map(_ * 4).to_list()
+        with self.assertRaises(PipelineError):
+            pipe_array([1e30]).astype('int64').to_list()
+
+    def test_source_buffer_is_read_in_place(self):
+        data = array.array('d', [4.0, 1.0, 3.0])
+        pipeline = pipe_array(data)
+        self.assertEqual(pipeline.get().obj, data)
+        self.assertEqual(pipeline.skip(1).take(1).to_list(), [1.0])
+        # Negative and oversized counts behave as on Pipeline
+        for n in (-1, 0, 2, 5):
+            self.assertEqual(pipeline.take(n).to_list(), pipe(list(data)).take(n).to_list())
+            self.assertEqual(pipeline.skip(n).to_list(), pipe(list(data)).skip(n).to_list())
+        copy = pipeline.to_array()
+        copy[0] = 0.0
+        self.assertEqual(data[0], 4.0)
+        self.assertEqual(pipeline.map(_ + 1).to_list(), [5.0, 2.0, 4.0])
+        self.assertEqual(data, array.array('d', [4.0, 1.0, 3.0]))
+
+    def test_source_buffer_is_only_borrowed_while_running(self):
+        data = array.array('q', [1, 2, 3])
+        pipeline = pipe_array(data)
+        self.assertEqual(pipeline.sum().get(), 6)
+        self.assertEqual(pipeline.skip(1).to_list(), [2, 3])
+        data.append(4)
+        self.assertEqual(pipeline.sum().get(), 10)
+        view = pipeline.take(2).get()
+        with self.assertRaises(BufferError):
+            data.append(5)
+        view.release()
+        data.append(5)
+        self.assertEqual(pipeline.map(_ * 2).to_list(), [2, 4, 6, 8, 10])
+
+    def test_reductions(self):
+        ints = pipe_array(range(1, 11))
+        self.assertEqual((ints.sum().get(), ints.min().get(), ints.max().get(), ints.count().get()), (55, 1, 10, 10))
+        self.assertEqual(ints.mean().get(), 5.5)
+        self.assertEqual(pipe_array(array.array('Q', [2 ** 63, 2 ** 63])).sum().get(), 2 ** 64)
+        with self.assertRaises(PipelineError):
+            ints.sum().map(_ + 1)
+        with self.assertRaises(ValueError):
+            pipe_array([]).max().get()
+
+
+class TestIntegerKernels(unittest.TestCase):
+
+    def test_sums_beyond_int32_are_not_truncated(self):
+        zig = _zig()
+        self.assertEqual(zig.sum([2 ** 40, 1]), 2 ** 40 + 1)
+        self.assertEqual(zig.sum(array.array('i', [1, 2])), 3)
+        self.assertEqual(zig._lib.calls, ['sum_i64', 'sum_i32'])
+        with self.assertRaises(OverflowError):
+            zig.sum([2 ** 62, 2 ** 62])
+        # Libraries without the int64 kernels refuse instead of truncating
+        with self.assertRaises(OverflowError):
+            _zig(has_int64=False).sum([2 ** 40])
+
+    def test_typed_pipelines_pick_the_int64_kernels(self):
+        backend = get_backend()
+        saved = backend._zig_backend, backend.zig_threshold
+        zig = _zig()
+        backend._zig_backend, backend.zig_threshold = zig, 3
+        try:
+            data = array.array('q', [2 ** 40, 5, 7])
+            self.assertEqual(pipe_array(data).map(_ + 1).to_array(), array.array('q', [2 ** 40 + 1, 6, 8]))
+            self.assertEqual(pipe_array(data).sum().get(), 2 ** 40 + 12)
+            self.assertEqual(pipe_array(data).max().get(), 2 ** 40)
+            self.assertEqual(zig._lib.calls, ['map_add_i64', 'sum_i64', 'max_i64'])
+            # An overflowing native sum falls back to exact Python ints
+            self.assertEqual(pipe_array([2 ** 62] * 3).sum().get(), 3 * 2 ** 62)
+        finally:
+            backend._zig_backend, backend.zig_threshold = saved
+
+
+if __name__ == "__main__":
+    unittest.main()